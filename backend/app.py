@@ -1,34 +1,117 @@
-from flask import Flask, jsonify, request, send_file
+from flask import Flask, jsonify, request, send_file, Response, stream_with_context, json, url_for
 from flask_cors import CORS
 from dotenv import load_dotenv
 import os
-import firebase_admin
-from firebase_admin import credentials, auth, firestore
+from firebase_admin import auth, firestore
+from google.api_core.exceptions import AlreadyExists, NotFound
 from functools import wraps
-from datetime import datetime, timedelta
-import schedule
+from datetime import datetime, timedelta, timezone
+import hashlib
+import hmac
+import secrets
 import time
-import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
+from cache import TTLCache
+from reports import create_report_queue
+from scheduler import FirestoreLeaseStore, Scheduler
+from reminders import ReminderEngine, event_reminders, parse_datetime, reminder_reminders, task_reminders
+from push import create_push_hub
+from mailer import create_mailer, reminder_email
+from documents import DocumentNotFound, OwnershipError, create_owned_documents
+from users import create_user_repository
+from search import SEARCH_FIELDS as NOTE_SEARCH_FIELDS, create_note_search_index
+from datastore import create_datastore, verify_local_token
+from metrics import create_metrics
+from calendar_index import INDEX_FIELD as EVENT_INDEX_FIELD, INDEX_VERSION as EVENT_INDEX_VERSION, index_buckets
+from exports import EXPORT_FORMATS, MIMETYPES as EXPORT_MIMETYPES, encode_export, export_filename, ndjson_lines, render_export
+from serialization import FastJSONEncoder
+from response_cache import ResponseCache, create_cache_backend
+from pagination import decode_watermark, encode_watermark, iter_documents, paginate, parse_fields, parse_limit
+from queries import LIST_ORDER, ListRequest, expand_events, export_document, export_event, export_query, indexed_event_queries
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Firebase Admin
-cred = credentials.Certificate("config/key.json")
-firebase_admin.initialize_app(cred)
+# Histograme pe rută, operații Firestore pe cerere și spans, expuse la /metrics
+metrics = create_metrics()
 
-# Initialize Firestore
-db = firestore.client()
+# Initialize Firestore (or the in-memory backend when DATA_BACKEND=memory)
+datastore = create_datastore(metrics=metrics)
+db = datastore.db
 
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)
+# jsonify și json.dumps folosesc orjson când e instalat, cu suport pentru tipurile Firestore
+app.json_encoder = FastJSONEncoder
+# Conexiunile /api/stream rămân deschise ore întregi, deci nu intră în histograme
+metrics.instrument_app(app, skip_endpoints={'stream_changes', 'get_metrics'})
+
+# Cache pentru token-urile deja verificate (cheie: hash-ul token-ului, expiră la `exp`)
+token_cache = TTLCache(maxsize=int(os.getenv('TOKEN_CACHE_SIZE', 1024)))
+
+# Cache pentru răspunsurile /api/analytics, invalidat la fiecare scriere a utilizatorului
+analytics_cache = ResponseCache(
+    'analytics',
+    create_cache_backend(),
+    ttl=int(os.getenv('ANALYTICS_CACHE_TTL', 300))
+)
+
+# Feed-urile .ics, randate o dată pe versiunea evenimentelor din `user_stats` (comună tuturor workerilor)
+calendar_feed_cache = ResponseCache(
+    'calendar_feed',
+    create_cache_backend(),
+    ttl=int(os.getenv('CALENDAR_FEED_TTL', 86400))
+)
+
+# Profilurile din `users`, citite prin cache și actualizate la fiecare scriere
+users = create_user_repository(db)
+
+# Coada pentru generarea asincronă a rapoartelor PDF; job-urile și fișierele sunt în Firestore
+report_jobs = create_report_queue(db, metrics=metrics)
+
+# Conexiunile /api/stream deschise în acest proces, pe utilizator
+push_hub = create_push_hub()
+
+# Emailurile de reminder, trimise de server; None când SMTP_HOST nu este setat
+mailer = create_mailer()
+
+# Indexul de căutare al notițelor, persistat pe utilizator și actualizat la fiecare scriere
+note_search = create_note_search_index(db)
+
+# Scrieri pe documentele utilizatorului fără citire prealabilă, când versiunea documentului e cunoscută
+owned_documents = create_owned_documents(db)
+
+def ownership_error_response(error, label):
+    if isinstance(error, DocumentNotFound):
+        message = f'{label} not found'
+    elif error.status_code == 403:
+        message = 'Unauthorized'
+    else:
+        message = f'{label} was modified concurrently, please retry'
+    return jsonify({
+        'status': 'error',
+        'message': message
+    }), error.status_code
+
+def verify_id_token(token):
+    if datastore.backend == 'memory':
+        return verify_local_token(token)
+    # Verifică token-ul cu check_revoked=False pentru a permite sesiuni lungi
+    return auth.verify_id_token(token, check_revoked=False)
+
+def token_cache_key(token):
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+def verify_token(token):
+    cache_key = token_cache_key(token)
+    user = token_cache.get(cache_key)
+    if user is None:
+        user = verify_id_token(token)
+        token_cache.set(cache_key, user, expires_at=user.get('exp'))
+    return user
 
 def check_token(f):
     @wraps(f)
@@ -47,8 +130,8 @@ def check_token(f):
                 }), 401
                 
             token = auth_header.split('Bearer ')[1]
-            # Verifică token-ul cu check_revoked=False pentru a permite sesiuni lungi
-            user = auth.verify_id_token(token, check_revoked=False)
+            with metrics.span('check_token'):
+                user = verify_token(token)
             request.user = user
         except Exception as e:
             return jsonify({
@@ -59,6 +142,21 @@ def check_token(f):
         return f(*args, **kwargs)
     return wrap
 
+# Utilizatorii cu acces la statisticile de proces, pe lângă cei cu claim-ul Firebase `admin`
+ADMIN_UIDS = frozenset(uid.strip() for uid in os.getenv('ADMIN_UIDS', '').split(',') if uid.strip())
+
+def require_admin(f):
+    # Se aplică după check_token: cache-urile, conexiunile și job-urile sunt comune tuturor utilizatorilor
+    @wraps(f)
+    def wrap(*args, **kwargs):
+        if not (request.user.get('admin') is True or request.user['uid'] in ADMIN_UIDS):
+            return jsonify({
+                'status': 'error',
+                'message': 'Admin access required'
+            }), 403
+        return f(*args, **kwargs)
+    return wrap
+
 @app.route('/', methods=['GET'])
 def check_server():
     return jsonify({"status": "success", "message": "Server is running"})
@@ -88,7 +186,7 @@ def register():
                 'notifications': True
             }
         }
-        db.collection('users').document(user.uid).set(user_data)
+        users.create(user.uid, user_data)
         
         return jsonify({
             'status': 'success',
@@ -107,10 +205,9 @@ def register():
 def get_user_data():
     try:
         user_id = request.user['uid']
-        user_doc = db.collection('users').document(user_id).get()
+        user_data = users.get(user_id)
         
-        if user_doc.exists:
-            user_data = user_doc.to_dict()
+        if user_data is not None:
             return jsonify({
                 'status': 'success',
                 'data': user_data
@@ -135,7 +232,7 @@ def update_user_data():
         update_data = request.json
         
         # Update user data in Firestore
-        db.collection('users').document(user_id).update(update_data)
+        users.update(user_id, update_data)
         
         return jsonify({
             'status': 'success',
@@ -165,10 +262,16 @@ def google_auth():
                 'message': 'Email and UID are required'
             }), 400
         
-        # Verify if user exists in Firestore
-        user_doc = db.collection('users').document(uid).get()
-        
-        if not user_doc.exists:
+        try:
+            # Utilizatorii existenți sunt actualizați direct, fără citirea documentului
+            users.update(uid, {
+                'lastLogin': firestore.SERVER_TIMESTAMP,
+                'email': email,
+                'displayName': display_name,
+                'photoURL': photo_url
+            })
+            print(f"Updated existing user {email}")  # Debug log
+        except NotFound:
             print(f"Creating new user document for {email}")  # Debug log
             # Create new user document if it doesn't exist
             user_data = {
@@ -182,18 +285,8 @@ def google_auth():
                     'notifications': True
                 }
             }
-            db.collection('users').document(uid).set(user_data)
+            users.create(uid, user_data)
             print(f"User document created successfully")  # Debug log
-        else:
-            print(f"Updating existing user {email}")  # Debug log
-            # Update last login for existing user
-            db.collection('users').document(uid).update({
-                'lastLogin': firestore.SERVER_TIMESTAMP,
-                'email': email,
-                'displayName': display_name,
-                'photoURL': photo_url
-            })
-            print(f"User document updated successfully")  # Debug log
         
         return jsonify({
             'status': 'success',
@@ -208,25 +301,96 @@ def google_auth():
             'message': str(e)
         }), 400
 
+# Contoarele pentru dashboard sunt păstrate în user_stats/<uid> și actualizate incremental
+TASK_COUNTER_FIELDS = ('completedTasks', 'inProgressTasks', 'upcomingTasks')
+
+def task_counter_field(task_data):
+    if task_data.get('completed', False):
+        return 'completedTasks'
+    elif task_data.get('status') == 'in-progress':
+        return 'inProgressTasks'
+    return 'upcomingTasks'
+
+def update_task_counters(user_id, before=None, after=None):
+    changes = {}
+    if before is not None:
+        field = task_counter_field(before)
+        changes[field] = changes.get(field, 0) - 1
+    if after is not None:
+        field = task_counter_field(after)
+        changes[field] = changes.get(field, 0) + 1
+    changes = {field: firestore.Increment(delta) for field, delta in changes.items() if delta}
+    if not changes:
+        return
+    # Fără countersReady, contoarele sunt recalculate la prima cerere pentru dashboard
+    db.collection('user_stats').document(user_id).set(changes, merge=True)
+
+def get_task_counters(user_id):
+    stats_ref = db.collection('user_stats').document(user_id)
+    stats_doc = stats_ref.get()
+    stats = stats_doc.to_dict() if stats_doc.exists else {}
+    if stats.get('countersReady'):
+        return {field: stats.get(field, 0) for field in TASK_COUNTER_FIELDS}
+
+    # Prima calculare: o singură scanare a task-urilor, apoi doar actualizări incrementale
+    counters = dict.fromkeys(TASK_COUNTER_FIELDS, 0)
+    tasks_ref = datastore.tasks.for_user(user_id).select(['completed', 'status']).stream()
+    for task in tasks_ref:
+        counters[task_counter_field(task.to_dict())] += 1
+    stats_ref.set({**counters, 'countersReady': True}, merge=True)
+    return counters
+
+def reconcile_task_counters(user_id=None):
+    # Recalcularea de la get_task_counters nu e atomică cu incrementele: diferențele sunt corectate noaptea
+    try:
+        tasks_query = datastore.tasks.collection
+        stats_docs = db.collection('user_stats').where('countersReady', '==', True).stream()
+        if user_id:
+            tasks_query = tasks_query.where('userId', '==', user_id)
+            stats_docs = [db.collection('user_stats').document(user_id).get()]
+        
+        computed = {}
+        for task in tasks_query.select(['userId', 'completed', 'status']).stream():
+            task_data = task.to_dict()
+            counters = computed.setdefault(task_data.get('userId'), dict.fromkeys(TASK_COUNTER_FIELDS, 0))
+            counters[task_counter_field(task_data)] += 1
+        
+        for stats_doc in stats_docs:
+            stats = stats_doc.to_dict() if stats_doc.exists else {}
+            if not stats.get('countersReady'):
+                continue
+            counters = computed.get(stats_doc.id, dict.fromkeys(TASK_COUNTER_FIELDS, 0))
+            # Corecția se aplică tot ca increment, ca să nu piardă scrierile făcute între timp
+            changes = {field: firestore.Increment(counters[field] - stats.get(field, 0))
+                       for field in TASK_COUNTER_FIELDS if counters[field] != stats.get(field, 0)}
+            if changes:
+                stats_doc.reference.set(changes, merge=True)
+        print(f"Reconciled task counters at {datetime.now()}")
+    except Exception as e:
+        print(f"Error reconciling task counters: {str(e)}")
+        raise
+
+def on_task_write(user_id, before=None, after=None):
+    # Actualizează agregatele derivate din task-uri (dashboard și analytics)
+    update_task_counters(user_id, before=before, after=after)
+    update_daily_rollup(user_id, before=before, after=after)
+    analytics_cache.invalidate(user_id)
+
 @app.route('/api/dashboard/overview', methods=['GET'])
 @check_token
 def get_dashboard_overview():
     try:
         user_id = request.user['uid']
+        counters = get_task_counters(user_id)
+        ensure_order_fields(user_id)
         
-        # Get user's tasks
-        tasks_ref = db.collection('tasks').where('userId', '==', user_id).order_by('createdAt', direction=firestore.Query.DESCENDING).stream()
-        tasks = []
-        completed_count = 0
-        in_progress_count = 0
-        upcoming_count = 0
+        # Get the most recent tasks by due date
+        tasks_ref = datastore.tasks.for_user(user_id).order_by('dueDate', direction=firestore.Query.DESCENDING).limit(5).stream()
+        recent_tasks = []
         
         for task in tasks_ref:
             task_data = task.to_dict()
-            task_data['id'] = task.id
-            
-            # Add task to recent tasks list
-            tasks.append({
+            recent_tasks.append({
                 'id': task.id,
                 'title': task_data.get('title', ''),
                 'description': task_data.get('description', ''),
@@ -236,32 +400,16 @@ def get_dashboard_overview():
                 'category': task_data.get('category', 'Altele'),
                 'completed': task_data.get('completed', False)
             })
-            
-            # Update counters
-            if task_data.get('completed', False):
-                completed_count += 1
-            elif task_data.get('status') == 'in-progress':
-                in_progress_count += 1
-            else:
-                upcoming_count += 1
-        
-        # Sort tasks by due date and get recent ones
-        recent_tasks = sorted(tasks, key=lambda x: x.get('dueDate', ''), reverse=True)[:5] if tasks else []
         
         # Get user data
-        user_doc = db.collection('users').document(user_id).get()
-        user_data = user_doc.to_dict() if user_doc.exists else {}
+        user_data = users.get(user_id) or {}
                 
         return jsonify({
             'status': 'success',
             'data': {
                 'recentTasks': recent_tasks,
                 'lastLogin': user_data.get('lastLogin', ''),
-                'stats': {
-                    'completedTasks': completed_count,
-                    'inProgressTasks': in_progress_count,
-                    'upcomingTasks': upcoming_count
-                }
+                'stats': counters
             }
         })
     except Exception as e:
@@ -272,30 +420,55 @@ def get_dashboard_overview():
             'error': str(e)
         }), 500
 
+ORDER_FIELDS_VERSION = 1
+order_fields_ready = TTLCache(maxsize=int(os.getenv('ORDER_FIELDS_CACHE_SIZE', 4096)))
+
+def with_order_field(collection, data):
+    # Un câmp lipsă devine null: documentul apare la finalul ordinii descendente, ca înainte
+    data.setdefault(LIST_ORDER[collection][0], None)
+    return data
+
+def ensure_order_fields(user_id):
+    # Documentele vechi, create fără câmpul de ordonare, îl primesc la prima listare
+    if order_fields_ready.get(user_id):
+        return
+    stats_ref = db.collection('user_stats').document(user_id)
+    stats_doc = stats_ref.get()
+    if not (stats_doc.exists and stats_doc.to_dict().get('orderFieldsVersion') == ORDER_FIELDS_VERSION):
+        writes = []
+        for collection, (order_field, _) in LIST_ORDER.items():
+            for document in datastore.repository(collection).for_user(user_id).select([order_field]).stream():
+                if order_field not in document.to_dict():
+                    owned_documents.cache.forget(document.reference.path)
+                    writes.append(lambda batch, ref=document.reference, field=order_field: batch.update(ref, {field: None}))
+        commit_in_batches(writes)
+        stats_ref.set({'orderFieldsVersion': ORDER_FIELDS_VERSION}, merge=True)
+    order_fields_ready.set(user_id, True)
+
+def wants_ndjson():
+    return (request.args.get('format') == 'ndjson'
+            or 'application/x-ndjson' in request.headers.get('Accept', ''))
+
+def list_user_documents(collection):
+    user_id = request.user['uid']
+    ensure_order_fields(user_id)
+    listing = ListRequest(datastore, collection, user_id, request.args)
+    
+    if wants_ndjson():
+        return Response(
+            stream_with_context(ndjson_lines(iter_documents(listing.stream_query(), listing.order_field, listing.fields))),
+            mimetype='application/x-ndjson'
+        )
+    
+    args, kwargs = listing.page_args()
+    return jsonify(listing.response(*paginate(*args, **kwargs)))
+
 @app.route('/api/tasks', methods=['GET'])
 @check_token
 def get_tasks():
     try:
-        user_id = request.user['uid']
-        
-        # Obține task-urile fără ordonare directă
-        tasks_ref = db.collection('tasks').where('userId', '==', user_id).stream()
-        
-        tasks = []
-        
-        # Adaugă task-urile într-o listă
-        for task in tasks_ref:
-            task_data = task.to_dict()
-            task_data['id'] = task.id
-            tasks.append(task_data)
-        
-        # Dacă `dueDate` este un string, convertește-l în datetime pentru sortare
-        tasks_sorted = sorted(tasks, key=lambda x: x.get('dueDate'), reverse=True)
-        
-        return jsonify({
-            'status': 'success',
-            'data': tasks_sorted
-        })
+        # Ordonarea după `dueDate` se face direct în Firestore
+        return list_user_documents('tasks')
     except Exception as e:
         return jsonify({
             'status': 'error',
@@ -311,9 +484,12 @@ def create_task():
         task_data['userId'] = user_id
         task_data['createdAt'] = firestore.SERVER_TIMESTAMP
         task_data['updatedAt'] = firestore.SERVER_TIMESTAMP
+        with_order_field('tasks', task_data)
         
-        task_ref = db.collection('tasks').document()
-        task_ref.set(task_data)
+        task_ref = owned_documents.create('tasks', task_data)
+        on_task_write(user_id, after=task_data)
+        reminder_engine.schedule_task(task_ref.id, task_data)
+        publish_change(user_id, 'tasks', 'upserted', [task_ref.id])
         
         return jsonify({
             'status': 'success',
@@ -330,28 +506,18 @@ def create_task():
 def update_task(task_id):
     try:
         user_id = request.user['uid']
-        task_ref = db.collection('tasks').document(task_id)
-        task = task_ref.get()
-        
-        if not task.exists:
-            return jsonify({
-                'status': 'error',
-                'message': 'Task not found'
-            }), 404
-            
-        if task.to_dict().get('userId') != user_id:
-            return jsonify({
-                'status': 'error',
-                'message': 'Unauthorized'
-            }), 403
-            
         task_data = request.json
         task_data['updatedAt'] = firestore.SERVER_TIMESTAMP
-        task_ref.update(task_data)
+        current_data, updated_data = owned_documents.update('tasks', task_id, user_id, task_data)
+        on_task_write(user_id, before=current_data, after=updated_data)
+        reminder_engine.schedule_task(task_id, updated_data)
+        publish_change(user_id, 'tasks', 'upserted', [task_id])
         
         return jsonify({
             'status': 'success'
         })
+    except OwnershipError as e:
+        return ownership_error_response(e, 'Task')
     except Exception as e:
         return jsonify({
             'status': 'error',
@@ -363,26 +529,16 @@ def update_task(task_id):
 def delete_task(task_id):
     try:
         user_id = request.user['uid']
-        task_ref = db.collection('tasks').document(task_id)
-        task = task_ref.get()
-        
-        if not task.exists:
-            return jsonify({
-                'status': 'error',
-                'message': 'Task not found'
-            }), 404
-            
-        if task.to_dict().get('userId') != user_id:
-            return jsonify({
-                'status': 'error',
-                'message': 'Unauthorized'
-            }), 403
-            
-        task_ref.delete()
+        current_data = owned_documents.delete('tasks', task_id, user_id, extra_writes=[tombstone_write('tasks', task_id, user_id)])
+        on_task_write(user_id, before=current_data)
+        reminder_engine.cancel('tasks', task_id)
+        publish_change(user_id, 'tasks', 'deleted', [task_id])
         
         return jsonify({
             'status': 'success'
         })
+    except OwnershipError as e:
+        return ownership_error_response(e, 'Task')
     except Exception as e:
         return jsonify({
             'status': 'error',
@@ -407,7 +563,7 @@ def set_goal():
             'updatedAt': firestore.SERVER_TIMESTAMP
         }
         
-        goal_ref = db.collection('goals').add(goal_data)
+        goal_ref = datastore.goals.add(goal_data)
         
         return jsonify({
             'status': 'success',
@@ -437,7 +593,8 @@ def create_reminder():
             'createdAt': firestore.SERVER_TIMESTAMP
         }
         
-        reminder_ref = db.collection('reminders').add(reminder_data)
+        reminder_ref = datastore.reminders.add(reminder_data)
+        reminder_engine.schedule_reminder(reminder_ref[1].id, reminder_data)
         
         return jsonify({
             'status': 'success',
@@ -454,19 +611,53 @@ def create_reminder():
 @app.route('/api/notes', methods=['GET'])
 @check_token
 def get_notes():
+    try:
+        return list_user_documents('notes')
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+NOTE_SEARCH_DEFAULT_LIMIT = 20
+
+def update_note_search(user_id, changes):
+    try:
+        note_search.apply(user_id, changes)
+    except Exception as e:
+        # Nota e deja salvată; indexul persistat a fost șters și se reconstruiește la următoarea căutare
+        print(f"Error updating note search index: {str(e)}")
+
+@app.route('/api/notes/search', methods=['GET'])
+@check_token
+def search_notes():
     try:
         user_id = request.user['uid']
-        notes_ref = db.collection('notes').where('userId', '==', user_id).stream()
-        notes = []
-        
-        for note in notes_ref:
-            note_data = note.to_dict()
-            note_data['id'] = note.id
-            notes.append(note_data)
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({
+                'status': 'error',
+                'message': 'q is required'
+            }), 400
+        limit = parse_limit(request.args.get('limit')) or NOTE_SEARCH_DEFAULT_LIMIT
+        
+        ranked = note_search.search(user_id, query, limit)
+        notes = {}
+        if ranked:
+            refs = [datastore.notes.document(note_id) for note_id, _ in ranked]
+            for snapshot in db.get_all(refs):
+                if snapshot.exists and snapshot.to_dict().get('userId') == user_id:
+                    notes[snapshot.id] = snapshot.to_dict()
+                    owned_documents.cache.remember_snapshot(snapshot)
+        
+        # Notele dispărute între timp sunt scoase și din index
+        missing = [note_id for note_id, _ in ranked if note_id not in notes]
+        if missing:
+            update_note_search(user_id, dict.fromkeys(missing))
         
         return jsonify({
             'status': 'success',
-            'data': notes
+            'data': [{**notes[note_id], 'id': note_id, 'score': round(score, 4)} for note_id, score in ranked if note_id in notes]
         })
     except Exception as e:
         return jsonify({
@@ -484,8 +675,9 @@ def create_note():
         note_data['createdAt'] = firestore.SERVER_TIMESTAMP
         note_data['updatedAt'] = firestore.SERVER_TIMESTAMP
         
-        note_ref = db.collection('notes').document()
-        note_ref.set(note_data)
+        note_ref = owned_documents.create('notes', note_data)
+        update_note_search(user_id, {note_ref.id: note_data})
+        publish_change(user_id, 'notes', 'upserted', [note_ref.id])
         
         return jsonify({
             'status': 'success',
@@ -502,28 +694,18 @@ def create_note():
 def update_note(note_id):
     try:
         user_id = request.user['uid']
-        note_ref = db.collection('notes').document(note_id)
-        note = note_ref.get()
-        
-        if not note.exists:
-            return jsonify({
-                'status': 'error',
-                'message': 'Note not found'
-            }), 404
-            
-        if note.to_dict().get('userId') != user_id:
-            return jsonify({
-                'status': 'error',
-                'message': 'Unauthorized'
-            }), 403
-            
         note_data = request.json
         note_data['updatedAt'] = firestore.SERVER_TIMESTAMP
-        note_ref.update(note_data)
+        _, updated_note = owned_documents.update('notes', note_id, user_id, note_data)
+        if any(field in note_data for field in NOTE_SEARCH_FIELDS):
+            update_note_search(user_id, {note_id: updated_note})
+        publish_change(user_id, 'notes', 'upserted', [note_id])
         
         return jsonify({
             'status': 'success'
         })
+    except OwnershipError as e:
+        return ownership_error_response(e, 'Note')
     except Exception as e:
         return jsonify({
             'status': 'error',
@@ -535,117 +717,254 @@ def update_note(note_id):
 def delete_note(note_id):
     try:
         user_id = request.user['uid']
-        note_ref = db.collection('notes').document(note_id)
-        note = note_ref.get()
-        
-        if not note.exists:
-            return jsonify({
-                'status': 'error',
-                'message': 'Note not found'
-            }), 404
-            
-        if note.to_dict().get('userId') != user_id:
-            return jsonify({
-                'status': 'error',
-                'message': 'Unauthorized'
-            }), 403
-            
-        note_ref.delete()
+        owned_documents.delete('notes', note_id, user_id, extra_writes=[tombstone_write('notes', note_id, user_id)])
+        update_note_search(user_id, {note_id: None})
+        publish_change(user_id, 'notes', 'deleted', [note_id])
         
         return jsonify({
             'status': 'success'
         })
+    except OwnershipError as e:
+        return ownership_error_response(e, 'Note')
     except Exception as e:
         return jsonify({
             'status': 'error',
             'message': str(e)
         }), 400
 
+# Firestore acceptă cel mult 500 de operații într-un batch
+FIRESTORE_BATCH_LIMIT = 500
+
+def commit_in_batches(writes):
+    # `writes` este o listă de funcții care adaugă câte o operație într-un batch
+    for start in range(0, len(writes), FIRESTORE_BATCH_LIMIT):
+        batch = db.batch()
+        for write in writes[start:start + FIRESTORE_BATCH_LIMIT]:
+            write(batch)
+        batch.commit()
+
+# Setări pentru curățarea săptămânală a task-urilor finalizate
+CLEANUP_PAGE_SIZE = int(os.getenv('CLEANUP_PAGE_SIZE', 240))
+CLEANUP_CONCURRENCY = int(os.getenv('CLEANUP_CONCURRENCY', 4))
+CLEANUP_MAX_DELETES_PER_SECOND = float(os.getenv('CLEANUP_MAX_DELETES_PER_SECOND', 500))
+
+def delete_completed_page(tasks):
+    # Șterge o pagină de task-uri și ajustează agregatele în aceleași batch-uri
+    deleted_per_user = {}
+    deleted_per_day = {}
+    writes = []
+    for task in tasks:
+        writes.append(lambda batch, ref=task.reference: batch.delete(ref))
+        task_data = task.to_dict()
+        user_id = task_data.get('userId')
+        if not user_id:
+            continue
+        writes.append(lambda batch, ref=tombstone_ref('tasks', task.id), data=tombstone_data('tasks', task.id, user_id): batch.set(ref, data))
+        deleted_per_user.setdefault(user_id, []).append(task.id)
+        date_str = rollup_date(task_data)
+        if date_str:
+            deleted_per_day[(user_id, date_str)] = deleted_per_day.get((user_id, date_str), 0) + 1
+    
+    # Update dashboard counters and daily rollups once per user / day
+    for user_id, task_ids in deleted_per_user.items():
+        writes.append(lambda batch, ref=db.collection('user_stats').document(user_id), count=len(task_ids): batch.set(ref, {
+            'completedTasks': firestore.Increment(-count)
+        }, merge=True))
+    for (user_id, date_str), count in deleted_per_day.items():
+        writes.append(lambda batch, ref=rollup_ref(user_id, date_str), user_id=user_id, date_str=date_str, count=count: batch.set(ref, {
+            'userId': user_id,
+            'date': date_str,
+            'total': firestore.Increment(-count),
+            'completed': firestore.Increment(-count)
+        }, merge=True))
+    
+    commit_in_batches(writes)
+    for user_id, task_ids in deleted_per_user.items():
+        analytics_cache.invalidate(user_id)
+        publish_change(user_id, 'tasks', 'deleted', task_ids)
+    return len(tasks)
+
 def clean_completed_tasks():
+    started = time.monotonic()
+    checkpoint_ref = db.collection('jobs').document('clean_completed_tasks')
     try:
-        # Get all completed tasks
-        completed_tasks = db.collection('tasks').where('completed', '==', True).stream()
+        # Reia de la ultimul checkpoint dacă rularea anterioară s-a întrerupt
+        checkpoint_doc = checkpoint_ref.get()
+        checkpoint = checkpoint_doc.to_dict() if checkpoint_doc.exists else {}
+        if checkpoint.get('status') == 'running':
+            last_doc_id = checkpoint.get('lastDocId')
+            deleted = checkpoint.get('deleted', 0)
+        else:
+            last_doc_id = None
+            deleted = 0
+        resumed_from = last_doc_id
+        checkpoint_ref.set({
+            'status': 'running',
+            'lastDocId': last_doc_id,
+            'deleted': deleted,
+            'startedAt': firestore.SERVER_TIMESTAMP
+        }, merge=True)
+        
+        pages = 0
+        submitted = 0
+        in_flight = deque()
+        
+        def complete_oldest():
+            # Checkpoint-ul avansează doar în ordinea paginilor, deci reluarea nu sare peste nimic
+            nonlocal deleted
+            future, page_last_id = in_flight.popleft()
+            deleted += future.result()
+            checkpoint_ref.update({
+                'lastDocId': page_last_id,
+                'deleted': deleted,
+                'updatedAt': firestore.SERVER_TIMESTAMP
+            })
         
-        # Delete each completed task
-        for task in completed_tasks:
-            task.reference.delete()
+        with ThreadPoolExecutor(max_workers=CLEANUP_CONCURRENCY) as executor:
+            while True:
+                query = datastore.tasks.collection.where('completed', '==', True).order_by('__name__').select(['userId', 'createdAt']).limit(CLEANUP_PAGE_SIZE)
+                if last_doc_id:
+                    query = query.start_after({'__name__': last_doc_id})
+                page = list(query.stream())
+                if not page:
+                    break
+                
+                last_doc_id = page[-1].id
+                pages += 1
+                submitted += len(page)
+                in_flight.append((executor.submit(delete_completed_page, page), last_doc_id))
+                if len(in_flight) >= CLEANUP_CONCURRENCY:
+                    complete_oldest()
+                
+                # Limitează ritmul ștergerilor pentru a nu concura cu traficul live
+                min_elapsed = submitted / CLEANUP_MAX_DELETES_PER_SECOND
+                elapsed = time.monotonic() - started
+                if min_elapsed > elapsed:
+                    time.sleep(min_elapsed - elapsed)
             
-        print(f"Cleaned completed tasks at {datetime.now()}")
+            while in_flight:
+                complete_oldest()
+        
+        duration = time.monotonic() - started
+        checkpoint_ref.set({
+            'status': 'completed',
+            'lastDocId': None,
+            'deleted': deleted,
+            'pages': pages,
+            'durationSeconds': round(duration, 3),
+            'finishedAt': firestore.SERVER_TIMESTAMP
+        }, merge=True)
+        print(f"Cleaned {deleted} completed tasks in {pages} pages ({duration:.1f}s) at {datetime.now()}"
+              + (f", resumed after {resumed_from}" if resumed_from else ""))
+        return {
+            'deleted': deleted,
+            'pages': pages,
+            'durationSeconds': round(duration, 3),
+            'resumedFrom': resumed_from
+        }
     except Exception as e:
+        # Checkpoint-ul rămâne „running”; eroarea ajunge în `lastRun` al scheduler-ului
         print(f"Error cleaning completed tasks: {str(e)}")
+        raise
 
-def run_scheduler():
-    # Schedule the cleanup for every Sunday at 23:59:59
-    schedule.every().sunday.at("23:59:59").do(clean_completed_tasks)
-    
-    while True:
-        schedule.run_pending()
-        time.sleep(60)  # Check every minute
-
-# Start the scheduler in a separate thread
-scheduler_thread = threading.Thread(target=run_scheduler)
-scheduler_thread.daemon = True
-scheduler_thread.start()
+def ensure_not_completed(task_data):
+    # Only allow marking as completed, not uncompleting
+    if task_data.get('completed', False):
+        raise ValueError('Cannot unmark a completed task')
 
 @app.route('/api/tasks/<task_id>/toggle', methods=['PUT'])
 @check_token
 def toggle_task_status(task_id):
     try:
         user_id = request.user['uid']
-        task_ref = db.collection('tasks').document(task_id)
-        task = task_ref.get()
-        
-        if not task.exists:
-            return jsonify({
-                'status': 'error',
-                'message': 'Task not found'
-            }), 404
-            
-        if task.to_dict().get('userId') != user_id:
-            return jsonify({
-                'status': 'error',
-                'message': 'Unauthorized'
-            }), 403
-        
-        # Only allow marking as completed, not uncompleting
-        current_status = task.to_dict().get('completed', False)
-        if current_status:
-            return jsonify({
-                'status': 'error',
-                'message': 'Cannot unmark a completed task'
-            }), 400
-            
-        task_ref.update({
+        current_data, updated_data = owned_documents.update('tasks', task_id, user_id, {
             'completed': True,
-            'completedAt': firestore.SERVER_TIMESTAMP
-        })
+            'completedAt': firestore.SERVER_TIMESTAMP,
+            'updatedAt': firestore.SERVER_TIMESTAMP
+        }, check=ensure_not_completed)
+        on_task_write(user_id, before=current_data, after=updated_data)
+        reminder_engine.cancel('tasks', task_id)
+        publish_change(user_id, 'tasks', 'upserted', [task_id])
         
         return jsonify({
             'status': 'success'
         })
+    except OwnershipError as e:
+        return ownership_error_response(e, 'Task')
     except Exception as e:
         return jsonify({
             'status': 'error',
             'message': str(e)
         }), 400
 
+# Fereastra maximă pentru /api/events?from=&to=
+EVENT_RANGE_MAX_DAYS = int(os.getenv('EVENT_RANGE_MAX_DAYS', 400))
+
+# Utilizatorii ale căror evenimente au deja indexul pe luni (verificat o dată per proces)
+event_index_ready = TTLCache(maxsize=int(os.getenv('EVENT_INDEX_CACHE_SIZE', 4096)))
+
+def event_index(event_data, before=None):
+    # Lunile atinse de eveniment, după aplicarea modificărilor peste documentul curent
+    return {EVENT_INDEX_FIELD: index_buckets({**(before or {}), **event_data})}
+
+def ensure_event_index(user_id):
+    # Evenimentele create înainte de index îl primesc la prima interogare pe interval
+    if event_index_ready.get(user_id):
+        return
+    stats_ref = db.collection('user_stats').document(user_id)
+    stats_doc = stats_ref.get()
+    if not (stats_doc.exists and stats_doc.to_dict().get('eventIndexVersion') == EVENT_INDEX_VERSION):
+        writes = []
+        for event in datastore.events.for_user(user_id).select(['startDate', 'endDate', 'recurrence', EVENT_INDEX_FIELD]).stream():
+            event_data = event.to_dict()
+            index = event_index(event_data)
+            if event_data.get(EVENT_INDEX_FIELD) != index[EVENT_INDEX_FIELD]:
+                owned_documents.cache.forget(event.reference.path)
+                writes.append(lambda batch, ref=event.reference, index=index: batch.update(ref, index))
+        commit_in_batches(writes)
+        stats_ref.set({'eventIndexVersion': EVENT_INDEX_VERSION}, merge=True)
+    event_index_ready.set(user_id, True)
+
+def parse_event_window(args):
+    window_start = parse_datetime(args.get('from'))
+    window_end = parse_datetime(args.get('to'))
+    if window_start is None or window_end is None:
+        raise ValueError('from and to must be ISO 8601 dates')
+    if window_end <= window_start:
+        raise ValueError('to must be after from')
+    if window_end - window_start > timedelta(days=EVENT_RANGE_MAX_DAYS):
+        raise ValueError(f'The range can span at most {EVENT_RANGE_MAX_DAYS} days')
+    return window_start, window_end
+
+def iter_indexed_events(user_id, window_start, window_end):
+    ensure_event_index(user_id)
+    for query, keep in indexed_event_queries(datastore, user_id, window_start, window_end):
+        for event in query.stream():
+            event_data = event.to_dict()
+            if keep(event_data):
+                yield event.id, event_data
+
+def list_events_in_range(user_id, window_start, window_end):
+    return jsonify({
+        'status': 'success',
+        'data': expand_events(iter_indexed_events(user_id, window_start, window_end), window_start, window_end)
+    })
+
+def bump_events_version(user_id):
+    # Orice scriere pe evenimente creează o versiune nouă a feed-ului .ics, pe toate workerele
+    db.collection('user_stats').document(user_id).set({
+        'eventsVersion': firestore.Increment(1),
+        'eventsUpdatedAt': firestore.SERVER_TIMESTAMP
+    }, merge=True)
+
 @app.route('/api/events', methods=['GET'])
 @check_token
 def get_events():
     try:
-        user_id = request.user['uid']
-        events_ref = db.collection('events').where('userId', '==', user_id).stream()
-        events = []
-        
-        for event in events_ref:
-            event_data = event.to_dict()
-            event_data['id'] = event.id
-            events.append(event_data)
-        
-        return jsonify({
-            'status': 'success',
-            'data': events
-        })
+        if 'from' in request.args or 'to' in request.args:
+            window_start, window_end = parse_event_window(request.args)
+            return list_events_in_range(request.user['uid'], window_start, window_end)
+        return list_user_documents('events')
     except Exception as e:
         return jsonify({
             'status': 'error',
@@ -661,10 +980,15 @@ def create_event():
         event_data['userId'] = user_id
         event_data['createdAt'] = firestore.SERVER_TIMESTAMP
         event_data['updatedAt'] = firestore.SERVER_TIMESTAMP
+        with_order_field('events', event_data)
+        event_data.update(event_index(event_data))
         
         # Add the event to Firestore
-        event_ref = db.collection('events').document()
-        event_ref.set(event_data)
+        event_ref = owned_documents.create('events', event_data)
+        analytics_cache.invalidate(user_id)
+        bump_events_version(user_id)
+        reminder_engine.schedule_event(event_ref.id, event_data)
+        publish_change(user_id, 'events', 'upserted', [event_ref.id])
         
         return jsonify({
             'status': 'success',
@@ -681,28 +1005,19 @@ def create_event():
 def update_event(event_id):
     try:
         user_id = request.user['uid']
-        event_ref = db.collection('events').document(event_id)
-        event = event_ref.get()
-        
-        if not event.exists:
-            return jsonify({
-                'status': 'error',
-                'message': 'Event not found'
-            }), 404
-            
-        if event.to_dict().get('userId') != user_id:
-            return jsonify({
-                'status': 'error',
-                'message': 'Unauthorized'
-            }), 403
-            
         event_data = request.json
         event_data['updatedAt'] = firestore.SERVER_TIMESTAMP
-        event_ref.update(event_data)
+        _, updated_data = owned_documents.update('events', event_id, user_id, event_data, derive=event_index)
+        analytics_cache.invalidate(user_id)
+        bump_events_version(user_id)
+        reminder_engine.schedule_event(event_id, updated_data)
+        publish_change(user_id, 'events', 'upserted', [event_id])
         
         return jsonify({
             'status': 'success'
         })
+    except OwnershipError as e:
+        return ownership_error_response(e, 'Event')
     except Exception as e:
         return jsonify({
             'status': 'error',
@@ -714,25 +1029,236 @@ def update_event(event_id):
 def delete_event(event_id):
     try:
         user_id = request.user['uid']
-        event_ref = db.collection('events').document(event_id)
-        event = event_ref.get()
-        
-        if not event.exists:
+        owned_documents.delete('events', event_id, user_id, extra_writes=[tombstone_write('events', event_id, user_id)])
+        analytics_cache.invalidate(user_id)
+        bump_events_version(user_id)
+        reminder_engine.cancel('events', event_id)
+        publish_change(user_id, 'events', 'deleted', [event_id])
+
+        return jsonify({
+            'status': 'success'
+        })
+    except OwnershipError as e:
+        return ownership_error_response(e, 'Event')
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+# Scrieri în bloc: create/update/delete pentru task-uri, notițe și evenimente într-o singură cerere
+BATCH_COLLECTIONS = ('tasks', 'notes', 'events')
+BATCH_OPERATIONS = ('create', 'update', 'delete')
+BATCH_MAX_OPERATIONS = int(os.getenv('BATCH_MAX_OPERATIONS', 500))
+
+def validate_batch_operation(operation):
+    if not isinstance(operation, dict):
+        return 'Operation must be an object'
+    if operation.get('op') not in BATCH_OPERATIONS:
+        return 'op must be one of: ' + ', '.join(BATCH_OPERATIONS)
+    if operation.get('collection') not in BATCH_COLLECTIONS:
+        return 'collection must be one of: ' + ', '.join(BATCH_COLLECTIONS)
+    if operation['op'] != 'create' and not isinstance(operation.get('id'), str):
+        return 'id is required'
+    if operation['op'] != 'delete' and not isinstance(operation.get('data'), dict):
+        return 'data must be an object'
+    return None
+
+class BatchChunk:
+    # Operațiile unui batch Firestore, împreună cu agregatele task-urilor pe care le modifică
+    def __init__(self):
+        self.items = []
+        self.writes = []
+        self.counters = {}
+        self.rollups = {}
+    
+    def size(self):
+        return len(self.writes) + len(self.rollups) + (1 if self.counters else 0)
+    
+    def add(self, index, ref, writes, task_before=None, task_after=None, task_changed=False):
+        self.items.append((index, ref))
+        self.writes.extend(writes)
+        if not task_changed:
+            return
+        if task_before is not None:
+            field = task_counter_field(task_before)
+            self.counters[field] = self.counters.get(field, 0) - 1
+        if task_after is not None:
+            field = task_counter_field(task_after)
+            self.counters[field] = self.counters.get(field, 0) + 1
+        for data, total, completed in ((task_before, -1, -1), (task_after, 1, 1)):
+            date_str = rollup_date(data) if data is not None else None
+            if not date_str:
+                continue
+            rollup = self.rollups.setdefault(date_str, {'total': 0, 'completed': 0})
+            rollup['total'] += total
+            if data.get('completed', False):
+                rollup['completed'] += completed
+    
+    def commit(self, user_id):
+        batch = db.batch()
+        for write in self.writes:
+            write(batch)
+        counters = {field: firestore.Increment(delta) for field, delta in self.counters.items() if delta}
+        if counters:
+            batch.set(db.collection('user_stats').document(user_id), counters, merge=True)
+        for date_str, rollup in self.rollups.items():
+            if rollup['total'] or rollup['completed']:
+                batch.set(rollup_ref(user_id, date_str), {
+                    'userId': user_id,
+                    'date': date_str,
+                    'total': firestore.Increment(rollup['total']),
+                    'completed': firestore.Increment(rollup['completed'])
+                }, merge=True)
+        batch.commit()
+
+@app.route('/api/batch', methods=['POST'])
+@check_token
+def batch_write():
+    try:
+        user_id = request.user['uid']
+        operations = (request.json or {}).get('operations')
+        if not isinstance(operations, list) or not operations:
             return jsonify({
                 'status': 'error',
-                'message': 'Event not found'
-            }), 404
-            
-        if event.to_dict().get('userId') != user_id:
+                'message': 'operations must be a non-empty list'
+            }), 400
+        if len(operations) > BATCH_MAX_OPERATIONS:
             return jsonify({
                 'status': 'error',
-                'message': 'Unauthorized'
-            }), 403
+                'message': f'At most {BATCH_MAX_OPERATIONS} operations per request'
+            }), 400
+        
+        results = [None] * len(operations)
+        for index, operation in enumerate(operations):
+            error = validate_batch_operation(operation)
+            if error:
+                results[index] = {'index': index, 'status': 'error', 'code': 400, 'message': error}
+        
+        # Verificarea proprietarului: o singură citire pentru toate documentele existente
+        refs = {}
+        for index, operation in enumerate(operations):
+            if results[index] is None and operation['op'] != 'create':
+                ref = datastore.repository(operation['collection']).document(operation['id'])
+                refs[ref.path] = ref
+        current = {}
+        if refs:
+            for snapshot in db.get_all(list(refs.values())):
+                if snapshot.exists:
+                    current[snapshot.reference.path] = snapshot.to_dict()
+                    owned_documents.cache.remember_snapshot(snapshot)
+        
+        chunks = [BatchChunk()]
+        changed = {}
+        events = {}
+        tasks = {}
+        notes = {}
+        for index, operation in enumerate(operations):
+            if results[index] is not None:
+                continue
+            collection = operation['collection']
+            if operation['op'] == 'create':
+                ref = datastore.repository(collection).document()
+            else:
+                ref = refs[datastore.repository(collection).document(operation['id']).path]
+                before = current.get(ref.path)
+                if before is None:
+                    results[index] = {'index': index, 'status': 'error', 'code': 404, 'message': 'Document not found'}
+                    continue
+                if before.get('userId') != user_id:
+                    results[index] = {'index': index, 'status': 'error', 'code': 403, 'message': 'Unauthorized'}
+                    continue
+            
+            before = current.get(ref.path)
+            if operation['op'] == 'create':
+                data = {**operation['data'], 'userId': user_id,
+                        'createdAt': firestore.SERVER_TIMESTAMP, 'updatedAt': firestore.SERVER_TIMESTAMP}
+                with_order_field(collection, data)
+                if collection == 'events':
+                    data.update(event_index(data))
+                after = data
+                writes = [lambda batch, ref=ref, data=data: batch.set(ref, data)]
+            elif operation['op'] == 'update':
+                data = {key: value for key, value in operation['data'].items() if key != 'userId'}
+                data['updatedAt'] = firestore.SERVER_TIMESTAMP
+                if collection == 'events':
+                    data.update(event_index(data, before))
+                after = {**before, **data}
+                writes = [lambda batch, ref=ref, data=data: batch.update(ref, data)]
+            else:
+                after = None
+                writes = [
+                    lambda batch, ref=ref: batch.delete(ref),
+                    lambda batch, ref=tombstone_ref(collection, ref.id), data=tombstone_data(collection, ref.id, user_id): batch.set(ref, data)
+                ]
             
-        event_ref.delete()
+            # Operațiile ulterioare pe același document văd starea de după aceasta
+            if after is None:
+                current.pop(ref.path, None)
+            else:
+                current[ref.path] = after
+            
+            # Fiecare operație poate adăuga până la 2 scrieri și 2 rollup-uri, plus contorul
+            if chunks[-1].size() + 5 > FIRESTORE_BATCH_LIMIT:
+                chunks.append(BatchChunk())
+            chunks[-1].add(index, ref, writes, task_before=before, task_after=after, task_changed=collection == 'tasks')
+            changed.setdefault((collection, 'deleted' if after is None else 'upserted'), []).append(ref.id)
+            if collection == 'events':
+                events[ref.id] = after
+            elif collection == 'tasks':
+                tasks[ref.id] = after
+            elif collection == 'notes':
+                notes[ref.id] = after
+        
+        failed_chunk = None
+        for chunk in chunks:
+            if failed_chunk is None:
+                try:
+                    chunk.commit(user_id)
+                except Exception as e:
+                    failed_chunk = str(e)
+            for index, ref in chunk.items:
+                if failed_chunk is None:
+                    # Versiunea din cache nu mai e actuală după scriere
+                    owned_documents.cache.forget(ref.path)
+                    results[index] = {'index': index, 'status': 'success', 'id': ref.id}
+                else:
+                    # Batch-urile deja scrise rămân; restul operațiilor nu au fost aplicate
+                    results[index] = {'index': index, 'status': 'error', 'code': 500, 'id': ref.id, 'message': failed_chunk}
+        
+        succeeded = [result for result in results if result['status'] == 'success']
+        if succeeded:
+            committed = {result['id'] for result in succeeded}
+            analytics_cache.invalidate(user_id)
+            for (collection, action), ids in changed.items():
+                ids = [doc_id for doc_id in ids if doc_id in committed]
+                if ids:
+                    publish_change(user_id, collection, action, ids)
+            if committed.intersection(events):
+                bump_events_version(user_id)
+            for event_id, event_data in events.items():
+                if event_id not in committed:
+                    continue
+                if event_data is None:
+                    reminder_engine.cancel('events', event_id)
+                else:
+                    reminder_engine.schedule_event(event_id, event_data)
+            for task_id, task_data in tasks.items():
+                if task_id not in committed:
+                    continue
+                if task_data is None:
+                    reminder_engine.cancel('tasks', task_id)
+                else:
+                    reminder_engine.schedule_task(task_id, task_data)
+            notes = {note_id: note_data for note_id, note_data in notes.items() if note_id in committed}
+            if notes:
+                update_note_search(user_id, notes)
         
         return jsonify({
-            'status': 'success'
+            'status': 'success',
+            'succeeded': len(succeeded),
+            'failed': len(results) - len(succeeded),
+            'results': results
         })
     except Exception as e:
         return jsonify({
@@ -740,96 +1266,733 @@ def delete_event(event_id):
             'message': str(e)
         }), 400
 
-@app.route('/api/analytics', methods=['GET'])
+# Reminder-ele pentru evenimente, task-uri și `reminders` sunt trimise de server, o singură dată
+REMINDER_HORIZON = timedelta(hours=int(os.getenv('REMINDER_HORIZON_HOURS', 48)))
+
+# Cum se calculează reminder-ele fiecărei colecții sursă
+REMINDER_SOURCES = {
+    'events': event_reminders,
+    'tasks': task_reminders,
+    'reminders': reminder_reminders
+}
+
+def deliver_reminder(reminder):
+    # Documentul sursă poate fi modificat de alt proces: reminder-ul se livrează doar dacă mai e valabil
+    source_doc = datastore.repository(reminder['source']).document(reminder['sourceId']).get()
+    if not source_doc.exists:
+        return False
+    expand = REMINDER_SOURCES[reminder['source']]
+    if reminder['key'] not in [current['key'] for current in expand(source_doc.id, source_doc.to_dict())]:
+        return False
+    
+    # Id-ul notificării este cheia reminder-ului, deci create() eșuează dacă a fost deja livrat
+    try:
+        db.collection('notifications').document(reminder['key']).create({
+            'userId': reminder['userId'],
+            'type': 'reminder',
+            'source': reminder['source'],
+            'sourceId': reminder['sourceId'],
+            'title': reminder['title'],
+            'description': reminder['description'],
+            'startsAt': reminder['startsAt'],
+            'leadSeconds': reminder['leadSeconds'],
+            'channels': reminder['channels'],
+            'read': False,
+            'createdAt': firestore.SERVER_TIMESTAMP
+        })
+    except AlreadyExists:
+        return False
+    push_hub.publish(reminder['userId'], 'reminder', {
+        'id': reminder['key'],
+        'source': reminder['source'],
+        'sourceId': reminder['sourceId'],
+        'title': reminder['title'],
+        'description': reminder['description'],
+        'startsAt': reminder['startsAt'].isoformat(),
+        'leadSeconds': reminder['leadSeconds'],
+        'channels': reminder['channels']
+    })
+    if 'email' in reminder['channels']:
+        send_reminder_email(reminder)
+    return True
+
+def send_reminder_email(reminder):
+    # Emailul pleacă o singură dată, din procesul care a creat notificarea, oricâte tab-uri sunt deschise
+    if mailer is None:
+        return
+    profile = users.get(reminder['userId']) or {}
+    if not profile.get('email') or (profile.get('settings') or {}).get('emailNotifications') is False:
+        return
+    try:
+        mailer.send(profile['email'], *reminder_email(reminder))
+    except Exception as e:
+        # Notificarea e deja înregistrată; o nouă încercare ar putea trimite emailul de două ori
+        print(f"Error sending reminder email: {str(e)}")
+
+def load_upcoming_reminders(engine):
+    now = datetime.now(timezone.utc)
+    # Datele sunt stocate ca text ISO, cu sau fără fus orar: se citește cu o zi de marjă
+    lower = (now - timedelta(days=1)).strftime('%Y-%m-%d')
+    upper = (now + engine.horizon + timedelta(days=1)).strftime('%Y-%m-%d')
+    
+    events_ref = datastore.events.collection.where('startDate', '>=', lower).where('startDate', '<', upper).stream()
+    for event in events_ref:
+        engine.schedule_event(event.id, event.to_dict())
+    
+    tasks_ref = datastore.tasks.collection.where('dueDate', '>=', lower).where('dueDate', '<', upper).stream()
+    for task in tasks_ref:
+        engine.schedule_task(task.id, task.to_dict())
+    
+    reminders_ref = datastore.reminders.collection.where('status', '==', 'active').where('reminderDate', '>=', lower).where('reminderDate', '<', upper).stream()
+    for reminder in reminders_ref:
+        engine.schedule_reminder(reminder.id, reminder.to_dict())
+
+reminder_engine = ReminderEngine(deliver_reminder, loader=load_upcoming_reminders, horizon=REMINDER_HORIZON)
+
+@app.route('/api/notifications', methods=['GET'])
 @check_token
-def get_analytics_data():
+def get_notifications():
     try:
         user_id = request.user['uid']
-        time_range = request.args.get('timeRange', 'week')
+        notifications_ref = db.collection('notifications').where('userId', '==', user_id).order_by('createdAt', direction=firestore.Query.DESCENDING).limit(50).stream()
+        notifications = []
+        
+        for notification in notifications_ref:
+            notification_data = notification.to_dict()
+            notification_data['id'] = notification.id
+            notifications.append(notification_data)
         
-        # Calculate the date range
-        now = datetime.now()
-        if time_range == 'week':
-            start_date = now - timedelta(days=7)
-        elif time_range == 'month':
-            start_date = now - timedelta(days=30)
-        else:  # year
-            start_date = now - timedelta(days=365)
+        return jsonify({
+            'status': 'success',
+            'data': notifications
+        })
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+# Notificări în timp real: fiecare scriere anunță clientul, care aduce apoi modificările prin /api/sync
+PUSH_HEARTBEAT_SECONDS = int(os.getenv('PUSH_HEARTBEAT_SECONDS', 15))
+
+def publish_change(user_id, collection, action, ids):
+    try:
+        push_hub.publish(user_id, 'change', {
+            'collection': collection,
+            'action': action,
+            'ids': ids
+        })
+    except Exception as e:
+        # Scrierea a reușit deja; clientul recuperează la următorul sync
+        print(f"Error publishing change: {str(e)}")
+
+@app.route('/api/stream', methods=['GET'])
+@check_token
+def stream_changes():
+    user_id = request.user['uid']
+    subscription = push_hub.subscribe(user_id)
+    
+    def generate():
+        try:
+            yield 'retry: 5000\n\n'
+            yield f'event: ready\ndata: {json.dumps({"userId": user_id})}\n\n'
+            for message in subscription.stream(heartbeat=PUSH_HEARTBEAT_SECONDS):
+                yield message
+        finally:
+            push_hub.unsubscribe(subscription)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/stream/stats', methods=['GET'])
+@check_token
+@require_admin
+def stream_stats():
+    return jsonify({
+        'status': 'success',
+        'data': push_hub.stats()
+    })
+
+# Sincronizare incrementală: documente modificate după `updatedAt` și tombstone-uri pentru ștergeri
+SYNC_COLLECTIONS = ('tasks', 'notes', 'events')
+TOMBSTONE_RETENTION_DAYS = int(os.getenv('TOMBSTONE_RETENTION_DAYS', 30))
+
+def tombstone_ref(collection, doc_id):
+    return db.collection('tombstones').document(f'{collection}_{doc_id}')
+
+def tombstone_data(collection, doc_id, user_id):
+    return {
+        'userId': user_id,
+        'collection': collection,
+        'docId': doc_id,
+        'deletedAt': firestore.SERVER_TIMESTAMP
+    }
+
+def tombstone_write(collection, doc_id, user_id):
+    # Se adaugă în același batch cu ștergerea, ca ambele să fie scrise atomic
+    return lambda batch: batch.set(tombstone_ref(collection, doc_id), tombstone_data(collection, doc_id, user_id))
+
+def purge_tombstones():
+    try:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=TOMBSTONE_RETENTION_DAYS)
+        expired = db.collection('tombstones').where('deletedAt', '<', cutoff).select([]).stream()
+        writes = [lambda batch, ref=tombstone.reference: batch.delete(ref) for tombstone in expired]
+        commit_in_batches(writes)
+        print(f"Purged {len(writes)} tombstones at {datetime.now()}")
+    except Exception as e:
+        print(f"Error purging tombstones: {str(e)}")
+        raise
+
+@app.route('/api/sync', methods=['GET'])
+@check_token
+def sync_changes():
+    try:
+        user_id = request.user['uid']
+        collections = parse_fields(request.args.get('collections')) or list(SYNC_COLLECTIONS)
+        if any(collection not in SYNC_COLLECTIONS for collection in collections):
+            return jsonify({
+                'status': 'error',
+                'message': f'collections must be a subset of {", ".join(SYNC_COLLECTIONS)}'
+            }), 400
+        
+        since_token = request.args.get('since')
+        since = decode_watermark(since_token) if since_token else None
+        # Momentul citirii, luat înaintea tuturor interogărilor, este și token-ul următor:
+        # o scriere cu timestamp până la el e deja vizibilă, iar una ulterioară intră în sync-ul următor
+        read_time = datetime.now(timezone.utc)
+        retention_start = read_time - timedelta(days=TOMBSTONE_RETENTION_DAYS)
+        # Fără token sau cu un token mai vechi decât tombstone-urile păstrate, clientul primește tot
+        reset = since is None or since < retention_start
+        
+        changes = {}
+        for collection in collections:
+            # La reset se citește tot; documentele scrise după read_time vin din nou la sync-ul următor
+            query = datastore.repository(collection).for_user(user_id)
+            if not reset:
+                query = query.where('updatedAt', '>', since).where('updatedAt', '<=', read_time).order_by('updatedAt')
             
-        # Get tasks within the date range
-        tasks_ref = db.collection('tasks').where('userId', '==', user_id).where('createdAt', '>=', start_date).stream()
+            upserted = []
+            for doc in query.stream():
+                doc_data = doc.to_dict()
+                owned_documents.cache.remember(doc.reference.path, dict(doc_data), doc.update_time)
+                doc_data['id'] = doc.id
+                upserted.append(doc_data)
+            changes[collection] = {
+                'upserted': upserted,
+                'deleted': []
+            }
         
-        total_tasks = 0
-        completed_tasks = 0
-        pending_tasks = 0
+        if not reset:
+            tombstones_ref = (db.collection('tombstones').where('userId', '==', user_id)
+                              .where('deletedAt', '>', since).where('deletedAt', '<=', read_time).stream())
+            for doc in tombstones_ref:
+                tombstone = doc.to_dict()
+                if tombstone.get('collection') in changes:
+                    changes[tombstone['collection']]['deleted'].append(tombstone['docId'])
+        
+        return jsonify({
+            'status': 'success',
+            'reset': reset,
+            'data': changes,
+            'nextToken': encode_watermark(read_time)
+        })
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+# Rollup-uri zilnice per utilizator (total / completed), după ziua creării task-ului
+ROLLUP_WINDOW_DAYS = 366
+
+def rollup_date(task_data):
+    created_at = task_data.get('createdAt')
+    if created_at is firestore.SERVER_TIMESTAMP:
+        return datetime.utcnow().strftime('%Y-%m-%d')
+    if isinstance(created_at, datetime):
+        return created_at.strftime('%Y-%m-%d')
+    return None
+
+def rollup_ref(user_id, date_str):
+    return db.collection('analytics_rollups').document(f'{user_id}_{date_str}')
+
+def update_daily_rollup(user_id, before=None, after=None):
+    date_str = rollup_date(after if after is not None else before)
+    total_delta = (after is not None) - (before is not None)
+    completed_delta = (bool(after and after.get('completed', False))
+                       - bool(before and before.get('completed', False)))
+    if not date_str or (not total_delta and not completed_delta):
+        return
+    rollup_ref(user_id, date_str).set({
+        'userId': user_id,
+        'date': date_str,
+        'total': firestore.Increment(total_delta),
+        'completed': firestore.Increment(completed_delta)
+    }, merge=True)
+
+def write_rollups(computed, existing):
+    # Scrie doar rollup-urile modificate și le șterge pe cele care nu mai au task-uri
+    changed_users = set()
+    writes = []
+    for (user_id, date_str), counts in computed.items():
+        if existing.pop((user_id, date_str), None) == counts:
+            continue
+        changed_users.add(user_id)
+        writes.append(lambda batch, ref=rollup_ref(user_id, date_str), data={'userId': user_id, 'date': date_str, **counts}: batch.set(ref, data))
+    for user_id, date_str in existing:
+        changed_users.add(user_id)
+        writes.append(lambda batch, ref=rollup_ref(user_id, date_str): batch.delete(ref))
+    commit_in_batches(writes)
+    return changed_users
+
+def reconcile_daily_rollups(user_id=None):
+    try:
+        start_date = datetime.utcnow() - timedelta(days=ROLLUP_WINDOW_DAYS)
+        start_str = start_date.strftime('%Y-%m-%d')
         
-        # Daily progress data
-        progress_data = {}
+        tasks_query = datastore.tasks.collection
+        rollups_query = db.collection('analytics_rollups')
+        if user_id:
+            tasks_query = tasks_query.where('userId', '==', user_id)
+            rollups_query = rollups_query.where('userId', '==', user_id)
         
-        for task in tasks_ref:
+        computed = {}
+        for task in tasks_query.where('createdAt', '>=', start_date).select(['userId', 'createdAt', 'completed']).stream():
             task_data = task.to_dict()
-            total_tasks += 1
-            
-            created_date = task_data.get('createdAt').date()
-            date_str = created_date.strftime('%Y-%m-%d')
-            
+            key = (task_data.get('userId'), rollup_date(task_data))
+            if not all(key):
+                continue
+            counts = computed.setdefault(key, {'total': 0, 'completed': 0})
+            counts['total'] += 1
             if task_data.get('completed', False):
-                completed_tasks += 1
-            else:
-                pending_tasks += 1
-                
-            # Update progress data
-            if date_str not in progress_data:
-                progress_data[date_str] = {'total': 0, 'completed': 0}
-            progress_data[date_str]['total'] += 1
-            if task_data.get('completed', False):
-                progress_data[date_str]['completed'] += 1
-        
-        # Calculate productivity score (completed tasks / total tasks * 100)
-        productivity_score = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-        
-        # Get recent activity
-        activities_ref = db.collection('activities').where('userId', '==', user_id).order_by('timestamp', direction=firestore.Query.DESCENDING).limit(10).stream()
-        recent_activity = []
-        
-        for activity in activities_ref:
-            activity_data = activity.to_dict()
-            recent_activity.append({
-                'id': activity.id,
-                'type': activity_data.get('type'),
-                'description': activity_data.get('description'),
-                'time': activity_data.get('timestamp').strftime('%Y-%m-%d %H:%M:%S')
-            })
-            
-        # Format progress data for the chart
-        formatted_progress = []
-        for date_str, data in progress_data.items():
-            completion_rate = (data['completed'] / data['total'] * 100) if data['total'] > 0 else 0
-            formatted_progress.append({
-                'label': datetime.strptime(date_str, '%Y-%m-%d').strftime('%a'),
-                'value': round(completion_rate),
-                'height': round(completion_rate)
-            })
-            
+                counts['completed'] += 1
+        
+        existing = {}
+        for rollup in rollups_query.where('date', '>=', start_str).stream():
+            rollup_data = rollup.to_dict()
+            existing[(rollup_data.get('userId'), rollup_data.get('date'))] = {
+                'total': rollup_data.get('total', 0),
+                'completed': rollup_data.get('completed', 0)
+            }
+        
+        for changed_user in write_rollups(computed, existing):
+            analytics_cache.invalidate(changed_user)
+        print(f"Reconciled daily rollups at {datetime.now()}")
+    except Exception as e:
+        # Fără `raise`, ensure_daily_rollups ar marca rollup-urile ca gata după un eșec
+        print(f"Error reconciling daily rollups: {str(e)}")
+        raise
+
+def ensure_daily_rollups(user_id):
+    # Utilizatorii existenți primesc rollup-urile la prima cerere de analytics
+    stats_ref = db.collection('user_stats').document(user_id)
+    stats_doc = stats_ref.get()
+    if stats_doc.exists and stats_doc.to_dict().get('rollupsReady'):
+        return
+    reconcile_daily_rollups(user_id)
+    stats_ref.set({'rollupsReady': True}, merge=True)
+
+def build_analytics_data(user_id, time_range):
+    # Calculate the date range
+    now = datetime.now()
+    if time_range == 'week':
+        start_date = now - timedelta(days=7)
+    elif time_range == 'month':
+        start_date = now - timedelta(days=30)
+    else:  # year
+        start_date = now - timedelta(days=365)
+    
+    ensure_daily_rollups(user_id)
+    
+    # Get daily rollups within the date range
+    rollups_ref = db.collection('analytics_rollups').where('userId', '==', user_id).where('date', '>=', start_date.strftime('%Y-%m-%d')).order_by('date').stream()
+    
+    total_tasks = 0
+    completed_tasks = 0
+    
+    # Daily progress data
+    progress_data = {}
+    
+    for rollup in rollups_ref:
+        rollup_data = rollup.to_dict()
+        if rollup_data.get('total', 0) <= 0:
+            continue
+        total_tasks += rollup_data['total']
+        completed_tasks += rollup_data.get('completed', 0)
+        progress_data[rollup_data['date']] = {
+            'total': rollup_data['total'],
+            'completed': rollup_data.get('completed', 0)
+        }
+    
+    pending_tasks = total_tasks - completed_tasks
+    
+    # Calculate productivity score (completed tasks / total tasks * 100)
+    productivity_score = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
+    
+    # Get recent activity
+    activities_ref = datastore.activities.for_user(user_id).order_by('timestamp', direction=firestore.Query.DESCENDING).limit(10).stream()
+    recent_activity = []
+    
+    for activity in activities_ref:
+        activity_data = activity.to_dict()
+        recent_activity.append({
+            'id': activity.id,
+            'type': activity_data.get('type'),
+            'description': activity_data.get('description'),
+            'time': activity_data.get('timestamp').strftime('%Y-%m-%d %H:%M:%S')
+        })
+        
+    # Format progress data for the chart
+    formatted_progress = []
+    for date_str, data in progress_data.items():
+        completion_rate = (data['completed'] / data['total'] * 100) if data['total'] > 0 else 0
+        formatted_progress.append({
+            'label': datetime.strptime(date_str, '%Y-%m-%d').strftime('%a'),
+            'value': round(completion_rate),
+            'height': round(completion_rate)
+        })
+        
+    return {
+        'stats': {
+            'totalTasks': total_tasks,
+            'completedTasks': completed_tasks,
+            'pendingTasks': pending_tasks,
+            'productivityScore': round(productivity_score)
+        },
+        'progressData': formatted_progress[-7:],  # Last 7 days
+        'recentActivity': recent_activity
+    }
+
+def cached_response(entry, mimetype='application/json'):
+    # Dacă clientul are deja versiunea curentă, răspunde cu 304 fără corp
+    modified = entry.get('modified')
+    if request.if_none_match:
+        fresh = request.if_none_match.contains(entry['etag'])
+    else:
+        # If-Modified-Since contează doar când clientul nu trimite If-None-Match
+        fresh = (modified is not None and request.if_modified_since is not None
+                 and int(modified) <= request.if_modified_since.timestamp())
+    response = Response(status=304) if fresh else Response(entry['body'], mimetype=mimetype)
+    response.set_etag(entry['etag'])
+    if modified is not None:
+        response.last_modified = datetime.fromtimestamp(int(modified), timezone.utc)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@app.route('/api/analytics', methods=['GET'])
+@check_token
+def get_analytics_data():
+    try:
+        user_id = request.user['uid']
+        time_range = request.args.get('timeRange', 'week')
+        if time_range not in ('week', 'month'):
+            time_range = 'year'
+        
+        cache_key = analytics_cache.key(user_id, time_range)
+        entry = analytics_cache.get(cache_key)
+        if entry is None:
+            body = json.dumps({
+                'status': 'success',
+                'data': build_analytics_data(user_id, time_range)
+            }).encode('utf-8')
+            entry = analytics_cache.set(cache_key, body)
+        return cached_response(entry)
+        
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@app.route('/api/cache/stats', methods=['GET'])
+@check_token
+@require_admin
+def get_cache_stats():
+    return jsonify({
+        'status': 'success',
+        'data': {
+            'tokens': token_cache.stats(),
+            'analytics': analytics_cache.stats(),
+            'calendarFeed': calendar_feed_cache.stats(),
+            'documents': owned_documents.cache.stats(),
+            'userProfiles': users.stats(),
+            'noteSearch': note_search.stats()
+        }
+    })
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    # Dacă METRICS_TOKEN este setat, scraper-ul trebuie să-l trimită ca Bearer token
+    metrics_token = os.getenv('METRICS_TOKEN')
+    if metrics_token and request.headers.get('Authorization') != f'Bearer {metrics_token}':
+        return jsonify({
+            'status': 'error',
+            'message': 'Unauthorized'
+        }), 401
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+def iter_export_documents(user_id, collection, window=None):
+    if collection == 'events' and window is not None:
+        for event_id, event_data in iter_indexed_events(user_id, *window):
+            document = export_event(event_id, event_data, window)
+            if document is not None:
+                yield document
+        return
+    
+    ensure_order_fields(user_id)
+    query, order_field = export_query(datastore, collection, user_id)
+    for document in iter_documents(query, order_field):
+        if export_document(document, order_field, window) is not None:
+            yield document
+
+def parse_export_args(collection, args):
+    export_format = args.get('format') or EXPORT_FORMATS[collection][0]
+    if export_format not in EXPORT_FORMATS[collection]:
+        raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS[collection])}")
+    window = parse_event_window(args) if 'from' in args or 'to' in args else None
+    include_completed = args.get('includeCompleted', 'true') != 'false'
+    include_archived = args.get('includeArchived', 'true') != 'false'
+    
+    def keep(document):
+        return ((include_completed or not document.get('completed'))
+                and (include_archived or not document.get('archived')))
+    return export_format, window, keep
+
+def export_headers(collection, export_format, window, compress):
+    headers = {
+        'Content-Disposition': f'attachment; filename="{export_filename(collection, export_format, window)}"',
+        'Cache-Control': 'no-store',
+        'Vary': 'Accept-Encoding'
+    }
+    if compress:
+        headers['Content-Encoding'] = 'gzip'
+    return headers
+
+def guarded_export(chunks, user_id, collection):
+    try:
+        yield from chunks
+    except Exception as e:
+        # Statusul a plecat deja; conexiunea se închide ca fișierul trunchiat să nu pară complet
+        print(f"Error exporting {collection} for {user_id}: {str(e)}")
+        raise
+
+@app.route('/api/export/<collection>', methods=['GET'])
+@check_token
+def export_collection(collection):
+    try:
+        if collection not in EXPORT_FORMATS:
+            return jsonify({
+                'status': 'error',
+                'message': f'Unknown collection: {collection}'
+            }), 404
+        user_id = request.user['uid']
+        export_format, window, keep = parse_export_args(collection, request.args)
+        documents = filter(keep, iter_export_documents(user_id, collection, window))
+        # Fișierul e generat pe măsură ce se citesc documentele, fără a ține colecția în memorie
+        compress = bool(request.accept_encodings['gzip'])
+        chunks = encode_export(render_export(collection, export_format, documents), compress=compress)
+        headers = export_headers(collection, export_format, window, compress)
+        
+        return Response(
+            stream_with_context(guarded_export(chunks, user_id, collection)),
+            mimetype=EXPORT_MIMETYPES[export_format],
+            headers=headers
+        )
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+def calendar_feed_url(user_id, secret):
+    return url_for('get_calendar_feed', token=f'{user_id}.{secret}', _external=True)
+
+@app.route('/api/calendar/feed', methods=['GET'])
+@check_token
+def get_calendar_feed_settings():
+    try:
+        user_id = request.user['uid']
+        secret = (users.get(user_id) or {}).get('calendarFeedSecret')
         return jsonify({
             'status': 'success',
-            'data': {
-                'stats': {
-                    'totalTasks': total_tasks,
-                    'completedTasks': completed_tasks,
-                    'pendingTasks': pending_tasks,
-                    'productivityScore': round(productivity_score)
-                },
-                'progressData': formatted_progress[-7:],  # Last 7 days
-                'recentActivity': recent_activity
-            }
+            'url': calendar_feed_url(user_id, secret) if secret else None
         })
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+@app.route('/api/calendar/feed', methods=['POST'])
+@check_token
+def rotate_calendar_feed():
+    try:
+        user_id = request.user['uid']
+        # Un secret nou invalidează adresa veche a feed-ului
+        secret = secrets.token_urlsafe(24)
+        users.update(user_id, {'calendarFeedSecret': secret})
+        return jsonify({
+            'status': 'success',
+            'url': calendar_feed_url(user_id, secret)
+        })
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+@app.route('/api/calendar/feed', methods=['DELETE'])
+@check_token
+def disable_calendar_feed():
+    try:
+        users.update(request.user['uid'], {'calendarFeedSecret': None})
+        return jsonify({
+            'status': 'success'
+        })
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+# Adresa feed-ului e publică: un secret greșit recitește profilul cel mult o dată pe interval, per utilizator
+CALENDAR_FEED_REFRESH_SECONDS = int(os.getenv('CALENDAR_FEED_REFRESH_SECONDS', 30))
+calendar_feed_refreshes = TTLCache(maxsize=int(os.getenv('CALENDAR_FEED_REFRESH_CACHE_SIZE', 4096)))
+
+def calendar_feed_secret_matches(user_id, secret):
+    def matches(profile):
+        expected = (profile or {}).get('calendarFeedSecret')
+        return isinstance(expected, str) and hmac.compare_digest(expected.encode('utf-8'), secret.encode('utf-8'))
+    if matches(users.get(user_id)):
+        return True
+    # Secretul poate fi fost schimbat pe alt worker; copia din cache rămâne până la recitire
+    if calendar_feed_refreshes.get(user_id):
+        return False
+    calendar_feed_refreshes.set(user_id, True, expires_at=time.time() + CALENDAR_FEED_REFRESH_SECONDS)
+    return matches(users.refresh(user_id))
+
+@app.route('/api/calendar/feed/<token>.ics', methods=['GET'])
+def get_calendar_feed(token):
+    try:
+        # Adresa conține utilizatorul și secretul lui; profilul vine din cache-ul `users`
+        user_id, _, secret = token.rpartition('.')
+        if not user_id or not calendar_feed_secret_matches(user_id, secret):
+            return jsonify({
+                'status': 'error',
+                'message': 'Calendar feed not found'
+            }), 404
+        
+        # Sondările fără modificări citesc doar versiunea și primesc 304 din cache
+        stats_doc = db.collection('user_stats').document(user_id).get(field_paths=['eventsVersion', 'eventsUpdatedAt'])
+        stats = (stats_doc.to_dict() or {}) if stats_doc.exists else {}
+        cache_key = calendar_feed_cache.key(user_id, f"ics:{stats.get('eventsVersion', 0)}")
+        entry = calendar_feed_cache.get(cache_key)
+        if entry is None:
+            # Cu același DTSTAMP, fiecare worker randează același corp, deci același ETag
+            updated_at = stats.get('eventsUpdatedAt')
+            stamp = updated_at if isinstance(updated_at, datetime) else datetime.now(timezone.utc)
+            pieces = render_export('events', 'ics', iter_export_documents(user_id, 'events'), stamp=stamp)
+            entry = calendar_feed_cache.set(cache_key, b''.join(encode_export(pieces)), modified=stamp.timestamp())
+        return cached_response(entry, mimetype='text/calendar')
+    except Exception as e:
+        print(f"Error rendering calendar feed: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': 'Failed to render calendar feed'
+        }), 500
+
+def report_job_response(job):
+    return {
+        'jobId': job['id'],
+        'jobStatus': job['status'],
+        'error': job['error'],
+        'createdAt': datetime.fromtimestamp(job['createdAt']).isoformat(),
+        'finishedAt': datetime.fromtimestamp(job['finishedAt']).isoformat() if job['finishedAt'] else None
+    }
+
+def get_user_report_job(job_id):
+    job = report_jobs.get(job_id)
+    if job is None or job['userId'] != request.user['uid']:
+        return None
+    return job
+
+@app.route('/api/reports', methods=['POST'])
+@check_token
+def create_report_job():
+    try:
+        user_id = request.user['uid']
+        report_data = request.json.get('reportData')
+        
+        if not report_data:
+            return jsonify({
+                'status': 'error',
+                'message': 'Report data is required'
+            }), 400
+        
+        job = report_jobs.submit(user_id, report_data)
+        return jsonify({
+            'status': 'success',
+            **report_job_response(job)
+        }), 202
         
     except Exception as e:
         return jsonify({
             'status': 'error',
             'message': str(e)
+        }), 400
+
+@app.route('/api/reports/<job_id>', methods=['GET'])
+@check_token
+def get_report_job(job_id):
+    job = get_user_report_job(job_id)
+    if job is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Report job not found'
+        }), 404
+    
+    return jsonify({
+        'status': 'success',
+        **report_job_response(job)
+    })
+
+@app.route('/api/reports/<job_id>/download', methods=['GET'])
+@check_token
+def download_report(job_id):
+    job = get_user_report_job(job_id)
+    if job is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Report job not found'
+        }), 404
+    
+    if job['status'] == 'failed':
+        return jsonify({
+            'status': 'error',
+            'message': job['error']
         }), 500
+    
+    if job['status'] != 'done':
+        return jsonify({
+            'status': 'pending',
+            **report_job_response(job)
+        }), 202
+    
+    pdf = report_jobs.result(job)
+    if pdf is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Report expired, please generate it again'
+        }), 410
+    
+    return send_file(
+        BytesIO(pdf),
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name='analytics_report.pdf'
+    )
 
 @app.route('/api/reports/generate', methods=['POST'])
 @check_token
@@ -844,110 +2007,13 @@ def generate_report():
                 'message': 'Report data is required'
             }), 400
 
-        # Create a buffer for the PDF
-        buffer = BytesIO()
-        
-        # Create the PDF document
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=letter,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=72
-        )
-
-        # Get styles
-        styles = getSampleStyleSheet()
-        title_style = styles['Heading1']
-        heading_style = styles['Heading2']
-        normal_style = styles['Normal']
-
-        # Create the story (content) for the PDF
-        story = []
-
-        # Add title
-        story.append(Paragraph('Analytics Report', title_style))
-        story.append(Spacer(1, 12))
-        story.append(Paragraph(f'Generated on: {report_data["generatedAt"]}', normal_style))
-        story.append(Spacer(1, 24))
-
-        # Add Statistics Section
-        story.append(Paragraph('Statistics Overview', heading_style))
-        story.append(Spacer(1, 12))
-
-        # Create statistics table data
-        stats_data = [
-            ['Metric', 'Value'],
-            ['Total Tasks', str(report_data['stats']['totalTasks'])],
-            ['Completed Tasks', str(report_data['stats']['completedTasks'])],
-            ['Pending Tasks', str(report_data['stats']['pendingTasks'])],
-            ['Productivity Score', f"{report_data['stats']['productivityScore']}%"],
-            ['Current Month Events', str(report_data['stats']['monthTotalEvents'])],
-            ['Past Events', str(report_data['stats']['monthPastEvents'])]
-        ]
-
-        # Create and style the statistics table
-        stats_table = Table(stats_data, colWidths=[4*inch, 2*inch])
-        stats_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 14),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        story.append(stats_table)
-        story.append(Spacer(1, 24))
-
-        # Add Progress Data Section
-        if report_data['progressData']:
-            story.append(Paragraph('Task Completion Progress', heading_style))
-            story.append(Spacer(1, 12))
-            
-            progress_data = [['Date', 'Completion Rate']]
-            for item in report_data['progressData']:
-                progress_data.append([item['label'], f"{item['value']}%"])
-
-            progress_table = Table(progress_data, colWidths=[4*inch, 2*inch])
-            progress_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 14),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 12),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            story.append(progress_table)
-            story.append(Spacer(1, 24))
-
-        # Add Recent Activity Section
-        if report_data['recentActivity']:
-            story.append(Paragraph('Recent Activity', heading_style))
-            story.append(Spacer(1, 12))
-            
-            for activity in report_data['recentActivity']:
-                activity_text = f"{activity['description']} - {activity['time']}"
-                story.append(Paragraph(activity_text, normal_style))
-                story.append(Spacer(1, 6))
-
-        # Build the PDF document
-        doc.build(story)
+        # Randarea trece prin aceeași coadă, deci rapoartele identice vin din cache
+        with metrics.span('pdf'):
+            pdf = report_jobs.render(user_id, report_data)
         
         # Prepare the response
-        buffer.seek(0)
         return send_file(
-            buffer,
+            BytesIO(pdf),
             mimetype='application/pdf',
             as_attachment=True,
             download_name='analytics_report.pdf'
@@ -960,6 +2026,40 @@ def generate_report():
             'message': str(e)
         }), 500
 
+# Job-urile programate rulează pe o singură instanță, pe baza unui lease în Firestore
+scheduler = Scheduler(FirestoreLeaseStore(db))
+# Curățarea task-urilor finalizate, duminica la 23:59
+scheduler.register('clean_completed_tasks', '59 23 * * 0', clean_completed_tasks)
+# Recalculează rollup-urile zilnice pentru analytics în fiecare noapte
+scheduler.register('reconcile_daily_rollups', '0 3 * * *', reconcile_daily_rollups)
+# Corectează contoarele task-urilor din dashboard
+scheduler.register('reconcile_task_counters', '15 3 * * *', reconcile_task_counters)
+# Șterge tombstone-urile mai vechi decât perioada de retenție pentru /api/sync
+scheduler.register('purge_tombstones', '30 3 * * *', purge_tombstones)
+
+@app.route('/api/scheduler/status', methods=['GET'])
+@check_token
+@require_admin
+def get_scheduler_status():
+    try:
+        return jsonify({
+            'status': 'success',
+            'data': scheduler.status()
+        })
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+# Start the scheduler in a separate thread (fiecare job rulează o singură dată între toate procesele)
+if os.getenv('SCHEDULER_ENABLED', '1') == '1':
+    scheduler.start()
+
+# Fiecare proces își ține propriul index de reminder-e; livrarea rămâne unică prin Firestore
+if os.getenv('REMINDERS_ENABLED', '1') == '1':
+    reminder_engine.start()
+
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
     app.run(host='localhost', port=port, debug=True) 
\ No newline at end of file
@@ -0,0 +1,233 @@
+"""ASGI entry point, served with `uvicorn asgi:app`.
+
+The read and streaming routes are handled here with the async Firestore client,
+so a slow query does not hold a thread. The remaining routes fall through to the
+Flask app, which runs on a bounded thread pool, so the event loop never blocks.
+"""
+import asyncio
+import os
+from functools import partial, wraps
+
+from a2wsgi import WSGIMiddleware
+from flask import json
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Mount, Route
+from werkzeug.http import parse_accept_header
+
+import app as wsgi
+from datastore import create_async_datastore
+from exports import EXPORT_FORMATS, MIMETYPES as EXPORT_MIMETYPES, ChunkEncoder, export_writer
+from pagination import iter_documents_async, paginate_async
+from queries import ListRequest, expand_events, export_document, export_event, export_query, indexed_event_queries
+from serialization import FastJSONEncoder
+
+datastore = create_async_datastore(wsgi.datastore)
+
+# Același encoder ca în Flask; metricile Prometheus acoperă doar rutele servite de Flask
+dumps = partial(json.dumps, app=wsgi.app, cls=FastJSONEncoder)
+
+
+def json_response(data, status_code=200):
+    return Response(dumps(data) + '\n', status_code=status_code, media_type='application/json')
+
+
+def error_response(message, status_code, **extra):
+    return json_response({'status': 'error', 'message': message, **extra}, status_code)
+
+
+async def verify_token(token):
+    user = wsgi.token_cache.get(wsgi.token_cache_key(token))
+    if user is None:
+        # Verificarea Firebase poate descărca cheile publice, deci rulează în afara buclei
+        user = await run_in_threadpool(wsgi.verify_token, token)
+    return user
+
+
+def check_token(f):
+    @wraps(f)
+    async def wrap(request):
+        auth_header = request.headers.get('Authorization')
+        if not auth_header:
+            return error_response('No token provided', 401)
+        if not auth_header.startswith('Bearer '):
+            return error_response('Invalid token format', 401)
+        try:
+            request.state.user = await verify_token(auth_header.split('Bearer ')[1])
+        except Exception as e:
+            return error_response('Invalid token provided', 401, error=str(e))
+        return await f(request)
+    return wrap
+
+
+def wants_ndjson(request):
+    return (request.query_params.get('format') == 'ndjson'
+            or 'application/x-ndjson' in request.headers.get('Accept', ''))
+
+
+async def ndjson_lines(documents):
+    async for document in documents:
+        yield dumps(document) + '\n'
+
+
+async def ensure_order_fields(user_id):
+    if not wsgi.order_fields_ready.get(user_id):
+        # Completarea câmpurilor lipsă scrie în Firestore o singură dată, pe un thread de lucru
+        await run_in_threadpool(wsgi.ensure_order_fields, user_id)
+
+
+async def list_user_documents(request, collection):
+    user_id = request.state.user['uid']
+    await ensure_order_fields(user_id)
+    listing = ListRequest(datastore, collection, user_id, request.query_params)
+
+    if wants_ndjson(request):
+        return StreamingResponse(
+            ndjson_lines(iter_documents_async(listing.stream_query(), listing.order_field, listing.fields)),
+            media_type='application/x-ndjson'
+        )
+
+    args, kwargs = listing.page_args()
+    return json_response(listing.response(*await paginate_async(*args, **kwargs)))
+
+
+@check_token
+async def get_tasks(request):
+    try:
+        return await list_user_documents(request, 'tasks')
+    except Exception as e:
+        return error_response(str(e), 400)
+
+
+@check_token
+async def get_notes(request):
+    try:
+        return await list_user_documents(request, 'notes')
+    except Exception as e:
+        return error_response(str(e), 400)
+
+
+async def iter_indexed_events(user_id, window_start, window_end):
+    if not wsgi.event_index_ready.get(user_id):
+        # Indexarea evenimentelor vechi scrie în Firestore o singură dată, pe un thread de lucru
+        await run_in_threadpool(wsgi.ensure_event_index, user_id)
+
+    for query, keep in indexed_event_queries(datastore, user_id, window_start, window_end):
+        async for event in query.stream():
+            event_data = event.to_dict()
+            if keep(event_data):
+                yield event.id, event_data
+
+
+@check_token
+async def get_events(request):
+    try:
+        if 'from' in request.query_params or 'to' in request.query_params:
+            window_start, window_end = wsgi.parse_event_window(request.query_params)
+            events = [event async for event in iter_indexed_events(request.state.user['uid'], window_start, window_end)]
+            return json_response({
+                'status': 'success',
+                'data': expand_events(events, window_start, window_end)
+            })
+        return await list_user_documents(request, 'events')
+    except Exception as e:
+        return error_response(str(e), 400)
+
+
+async def iter_export_documents(user_id, collection, window=None):
+    if collection == 'events' and window is not None:
+        async for event_id, event_data in iter_indexed_events(user_id, *window):
+            document = export_event(event_id, event_data, window)
+            if document is not None:
+                yield document
+        return
+
+    await ensure_order_fields(user_id)
+    query, order_field = export_query(datastore, collection, user_id)
+    async for document in iter_documents_async(query, order_field):
+        if export_document(document, order_field, window) is not None:
+            yield document
+
+
+async def render_export(writer, documents, keep):
+    yield writer.head()
+    async for document in documents:
+        if keep(document):
+            yield writer.row(document)
+    yield writer.tail()
+
+
+async def encode_export(pieces, compress, user_id, collection):
+    encoder = ChunkEncoder(compress=compress)
+    try:
+        async for piece in pieces:
+            chunk = encoder.feed(piece)
+            if chunk:
+                yield chunk
+        chunk = encoder.close()
+        if chunk:
+            yield chunk
+    except Exception as e:
+        # Statusul a plecat deja; conexiunea se închide ca fișierul trunchiat să nu pară complet
+        print(f"Error exporting {collection} for {user_id}: {str(e)}")
+        raise
+
+
+@check_token
+async def export_collection(request):
+    collection = request.path_params['collection']
+    try:
+        if collection not in EXPORT_FORMATS:
+            return error_response(f'Unknown collection: {collection}', 404)
+        user_id = request.state.user['uid']
+        export_format, window, keep = wsgi.parse_export_args(collection, request.query_params)
+        documents = iter_export_documents(user_id, collection, window)
+        compress = bool(parse_accept_header(request.headers.get('Accept-Encoding'))['gzip'])
+        pieces = render_export(export_writer(collection, export_format, dumps=dumps), documents, keep)
+
+        return StreamingResponse(
+            encode_export(pieces, compress, user_id, collection),
+            media_type=EXPORT_MIMETYPES[export_format],
+            headers=wsgi.export_headers(collection, export_format, window, compress)
+        )
+    except Exception as e:
+        return error_response(str(e), 400)
+
+
+@check_token
+async def stream_changes(request):
+    user_id = request.state.user['uid']
+
+    async def generate():
+        # Mesajele publicate din thread-urile Flask ajung în coada din această buclă
+        subscription = wsgi.push_hub.subscribe(user_id, loop=asyncio.get_running_loop())
+        try:
+            yield 'retry: 5000\n\n'
+            yield f'event: ready\ndata: {dumps({"userId": user_id})}\n\n'
+            async for message in subscription.stream(heartbeat=wsgi.PUSH_HEARTBEAT_SECONDS):
+                yield message
+        finally:
+            wsgi.push_hub.unsubscribe(subscription)
+
+    return StreamingResponse(generate(), media_type='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+routes = [
+    Route('/api/tasks', get_tasks, methods=['GET']),
+    Route('/api/notes', get_notes, methods=['GET']),
+    Route('/api/events', get_events, methods=['GET']),
+    Route('/api/export/{collection}', export_collection, methods=['GET']),
+    Route('/api/stream', stream_changes, methods=['GET']),
+    # Restul rutelor (și scrierile pe căile de mai sus) ajung la Flask, pe un pool de thread-uri
+    Mount('/', app=WSGIMiddleware(wsgi.app, workers=int(os.getenv('ASGI_WSGI_THREADS', 32))))
+]
+
+app = Starlette(routes=routes, middleware=[
+    Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])
+])
@@ -0,0 +1,205 @@
+"""Compare how many concurrent connections the WSGI and ASGI servers sustain.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_asgi --modes threaded,gevent,asgi --concurrency 10,100,500 --streams 200
+
+Each mode starts a server process on the in-memory data backend, with simulated
+latency per data-store call, and drives GET /api/tasks from asyncio clients
+while --streams idle /api/stream connections are held open.
+"""
+import argparse
+import asyncio
+import os
+import resource
+import secrets
+import subprocess
+import sys
+import time
+
+MODES = ('threaded', 'gevent', 'asgi')
+TASKS_PATH = '/api/tasks?limit=50'
+REQUEST_TIMEOUT = 10
+
+
+def configure_environment(args):
+    # Trebuie setate înainte de importul aplicației, în serverul pornit pentru fiecare mod
+    os.environ['DATA_BACKEND'] = 'memory'
+    os.environ['MEMORY_STORE_LATENCY'] = str(args.rpc_latency_ms / 1000)
+    os.environ.setdefault('LOCAL_AUTH_SECRET', secrets.token_hex(16))
+    os.environ.setdefault('SCHEDULER_ENABLED', '0')
+    os.environ.setdefault('REMINDERS_ENABLED', '0')
+
+
+def raise_file_limit():
+    # Fiecare conexiune deschisă ține un descriptor, de ambele părți
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def serve(args):
+    raise_file_limit()
+    if args.serve == 'gevent':
+        from gevent import monkey
+        monkey.patch_all()
+
+    import logging
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    import app as app_module
+    from benchmarks.dataset import seed_dataset
+    seed_dataset(app_module.db, users=args.users, tasks=args.tasks, events=10, notes=10)
+
+    if args.serve == 'threaded':
+        from werkzeug.serving import run_simple
+        run_simple('127.0.0.1', args.port, app_module.app, threaded=True)
+    elif args.serve == 'gevent':
+        from gevent.pywsgi import WSGIServer
+        WSGIServer(('127.0.0.1', args.port), app_module.app, log=None).serve_forever()
+    else:
+        import uvicorn
+        import asgi
+        uvicorn.run(asgi.app, host='127.0.0.1', port=args.port, log_level='warning')
+
+
+async def fetch(port, path, headers=None):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        lines = [f'GET {path} HTTP/1.1', 'Host: 127.0.0.1', 'Connection: close']
+        lines.extend(f'{name}: {value}' for name, value in (headers or {}).items())
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('ascii'))
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def hold_stream(port, headers, opened, done):
+    # O conexiune SSE inactivă: primește antetele, apoi rămâne deschisă până la final
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection('127.0.0.1', port), REQUEST_TIMEOUT)
+    except (OSError, asyncio.TimeoutError):
+        return
+    try:
+        lines = ['GET /api/stream HTTP/1.1', 'Host: 127.0.0.1', f"Authorization: {headers['Authorization']}"]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('ascii'))
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)
+        if status_line.split()[1:2] == [b'200']:
+            opened.append(1)
+        await done.wait()
+    except (OSError, IndexError, asyncio.TimeoutError):
+        pass
+    finally:
+        writer.close()
+
+
+def percentile(durations, fraction):
+    return durations[min(len(durations) - 1, int(len(durations) * fraction))] if durations else 0.0
+
+
+async def run_level(port, headers, concurrency, duration):
+    durations = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def client(index):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                status = await asyncio.wait_for(fetch(port, TASKS_PATH, headers[index % len(headers)]), REQUEST_TIMEOUT)
+            except (OSError, ValueError, IndexError, asyncio.TimeoutError):
+                status = None
+            if status == 200:
+                durations.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(index) for index in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    durations.sort()
+    return {
+        'throughput': len(durations) / elapsed,
+        'p50_ms': percentile(durations, 0.50) * 1000,
+        'p95_ms': percentile(durations, 0.95) * 1000,
+        'errors': errors
+    }
+
+
+async def wait_until_ready(port, process, timeout=60):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'server exited with code {process.returncode}')
+        try:
+            if await fetch(port, '/') == 200:
+                return
+        except (OSError, ValueError, IndexError):
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError('server did not start in time')
+
+
+async def run_mode(mode, args, headers):
+    command = [sys.executable, '-m', 'benchmarks.bench_asgi', '--serve', mode, '--port', str(args.port),
+               '--users', str(args.users), '--tasks', str(args.tasks)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    results = []
+    try:
+        await wait_until_ready(args.port, process)
+        done = asyncio.Event()
+        opened = []
+        streams = [asyncio.ensure_future(hold_stream(args.port, headers[index % len(headers)], opened, done))
+                   for index in range(args.streams)]
+        await asyncio.sleep(1 if streams else 0)
+        for concurrency in args.concurrency:
+            result = await run_level(args.port, headers, concurrency, args.duration)
+            result.update({'mode': mode, 'concurrency': concurrency, 'streams': len(opened)})
+            results.append(result)
+        done.set()
+        await asyncio.gather(*streams)
+    finally:
+        process.terminate()
+        process.wait()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modes', default=','.join(MODES), help='comma-separated subset of ' + ', '.join(MODES))
+    parser.add_argument('--concurrency', default='10,100,500', help='comma-separated concurrent client counts')
+    parser.add_argument('--streams', type=int, default=0, help='idle /api/stream connections held during the run')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per concurrency level')
+    parser.add_argument('--users', type=int, default=20, help='synthetic users')
+    parser.add_argument('--tasks', type=int, default=200, help='tasks per user')
+    parser.add_argument('--rpc-latency-ms', type=float, default=20.0, help='simulated latency per data-store call')
+    parser.add_argument('--port', type=int, default=8765, help='port for the server under test')
+    parser.add_argument('--serve', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    configure_environment(args)
+    if args.serve:
+        serve(args)
+        return 0
+
+    raise_file_limit()
+    from datastore import issue_local_token
+    headers = [{'Authorization': f'Bearer {issue_local_token(f"bench-user-{index:04d}")}'} for index in range(args.users)]
+    args.concurrency = [int(value) for value in args.concurrency.split(',') if value.strip()]
+
+    results = []
+    for mode in [name.strip() for name in args.modes.split(',') if name.strip()]:
+        results.extend(asyncio.run(run_mode(mode, args, headers)))
+
+    print(f"{'mode':<10}{'clients':>8}{'streams':>9}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+    for result in results:
+        print(f"{result['mode']:<10}{result['concurrency']:>8}{result['streams']:>9}{result['throughput']:>10.1f}"
+              f"{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['errors']:>8}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""Measure JSON serialization of large task lists with the stdlib and fast encoders.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_json --tasks 10000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import Flask, json, jsonify
+from flask.json import JSONEncoder
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+
+from benchmarks.dataset import generate_tasks
+from serialization import FastJSONEncoder, orjson
+
+
+def task_payload(count, seed=1):
+    # Documentele au aceleași tipuri ca cele citite din Firestore
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    tasks = generate_tasks('bench-user', count, rng, now)
+    for index, task in enumerate(tasks):
+        created_at = now - timedelta(days=rng.uniform(0, 90))
+        task['id'] = f'task-{index:06d}'
+        task['createdAt'] = DatetimeWithNanoseconds.from_rfc3339(created_at.strftime('%Y-%m-%dT%H:%M:%S.%fZ'))
+        task['updatedAt'] = task['createdAt']
+    return {'status': 'success', 'data': tasks}
+
+
+def measure(encoder, payload, iterations):
+    app = Flask(__name__)
+    app.json_encoder = encoder
+    with app.app_context():
+        body = jsonify(payload).get_data()  # warm-up
+        durations = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            jsonify(payload).get_data()
+            durations.append(time.perf_counter() - start)
+    durations.sort()
+    return body, {
+        'mean_ms': sum(durations) / len(durations) * 1000,
+        'p95_ms': durations[max(0, int(len(durations) * 0.95) - 1)] * 1000,
+        'kib': len(body) / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=10000, help='tasks in the payload')
+    parser.add_argument('--iterations', type=int, default=20, help='responses serialized per encoder')
+    args = parser.parse_args()
+
+    payload = task_payload(args.tasks)
+    stdlib_body, stdlib = measure(JSONEncoder, payload, args.iterations)
+    fast_body, fast = measure(FastJSONEncoder, payload, args.iterations)
+    if json.loads(stdlib_body) != json.loads(fast_body):
+        raise SystemExit('encoders produced different documents')
+
+    print(f"{'encoder':<32}{'mean ms':>10}{'p95 ms':>10}{'KiB':>10}")
+    print(f"{'flask JSONEncoder':<32}{stdlib['mean_ms']:>10.2f}{stdlib['p95_ms']:>10.2f}{stdlib['kib']:>10.1f}")
+    name = 'FastJSONEncoder (orjson)' if orjson is not None else 'FastJSONEncoder (stdlib)'
+    print(f"{name:<32}{fast['mean_ms']:>10.2f}{fast['p95_ms']:>10.2f}{fast['kib']:>10.1f}")
+    print(f"speed-up: {stdlib['mean_ms'] / fast['mean_ms']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Measure PDF report rendering time and memory.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_reports --reports 500
+"""
+import argparse
+import time
+import tracemalloc
+
+from reports import REPORT_TEMPLATES, build_report_pdf, build_report_templates
+
+
+def sample_report_data(days=30, activities=10):
+    return {
+        'generatedAt': '2024-01-31 18:00:00',
+        'stats': {
+            'totalTasks': 120,
+            'completedTasks': 87,
+            'pendingTasks': 33,
+            'productivityScore': 73,
+            'monthTotalEvents': 18,
+            'monthPastEvents': 11
+        },
+        'progressData': [{'label': f'Day {day + 1}', 'value': (day * 7) % 100} for day in range(days)],
+        'recentActivity': [
+            {'description': f'Task {index} completed', 'time': f'2024-01-{index + 1:02d} 10:00:00'}
+            for index in range(activities)
+        ]
+    }
+
+
+def render_with_fresh_templates(report_data):
+    # Comportamentul anterior: stiluri și TableStyle construite la fiecare raport
+    return build_report_pdf(report_data, templates=build_report_templates())
+
+
+def render_with_shared_templates(report_data):
+    return build_report_pdf(report_data, templates=REPORT_TEMPLATES)
+
+
+def measure(render, report_data, reports):
+    render(report_data)  # warm-up
+
+    durations = []
+    for _ in range(reports):
+        start = time.perf_counter()
+        render(report_data)
+        durations.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    for _ in range(min(reports, 50)):
+        render(report_data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    durations.sort()
+    return {
+        'mean_ms': sum(durations) / len(durations) * 1000,
+        'p95_ms': durations[int(len(durations) * 0.95) - 1] * 1000,
+        'peak_kib': peak / 1024
+    }
+
+
+def measure_template_setup(iterations):
+    # Costul evitat la fiecare raport prin registrul de stiluri
+    start = time.perf_counter()
+    for _ in range(iterations):
+        build_report_templates()
+    duration = (time.perf_counter() - start) / iterations
+
+    tracemalloc.start()
+    templates = build_report_templates()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del templates
+    return duration * 1000, allocated / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reports', type=int, default=200, help='reports rendered per variant')
+    parser.add_argument('--days', type=int, default=30, help='rows in the progress table')
+    args = parser.parse_args()
+
+    report_data = sample_report_data(days=args.days)
+    results = {
+        'before (per-report styles)': measure(render_with_fresh_templates, report_data, args.reports),
+        'after (shared templates)': measure(render_with_shared_templates, report_data, args.reports)
+    }
+
+    setup_ms, setup_kib = measure_template_setup(args.reports)
+
+    print(f"{'variant':<30}{'mean ms':>10}{'p95 ms':>10}{'peak KiB':>12}")
+    for name, result in results.items():
+        print(f"{name:<30}{result['mean_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['peak_kib']:>12.1f}")
+    print(f"style setup avoided per report: {setup_ms:.3f} ms, {setup_kib:.1f} KiB allocated")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Synthetic users, tasks, events and notes for local load tests."""
+import random
+from datetime import datetime, timedelta, timezone
+
+from seed_events import generate_events
+from seed_notes import generate_notes
+
+TASK_TITLES = [
+    "Raport săptămânal", "Review cod", "Pregătire prezentare", "Actualizare documentație",
+    "Plan sprint", "Răspuns emailuri", "Testare funcționalitate", "Curățenie backlog"
+]
+TASK_CATEGORIES = ["work", "personal", "learning", "Altele"]
+TASK_PRIORITIES = ["low", "medium", "high"]
+
+BATCH_SIZE = 500
+
+
+def generate_tasks(user_id, count, rng=random, now=None):
+    now = now or datetime.now(timezone.utc)
+    tasks = []
+    for index in range(count):
+        completed = rng.random() < 0.4
+        tasks.append({
+            "title": f"{rng.choice(TASK_TITLES)} #{index}",
+            "description": "",
+            "category": rng.choice(TASK_CATEGORIES),
+            "priority": rng.choice(TASK_PRIORITIES),
+            "status": "completed" if completed else rng.choice(["pending", "pending", "in-progress"]),
+            "completed": completed,
+            "dueDate": (now + timedelta(days=rng.randint(-30, 30))).strftime('%Y-%m-%d'),
+            "userId": user_id
+        })
+    return tasks
+
+
+def _with_history(documents, rng, now, days=90):
+    # Datele de creare sunt împrăștiate în ultimele `days` zile, pentru rollup-uri realiste
+    for document in documents:
+        created_at = now - timedelta(days=rng.uniform(0, days))
+        document["createdAt"] = created_at
+        document["updatedAt"] = created_at
+        if document.get("completed"):
+            document["completedAt"] = created_at + timedelta(hours=rng.uniform(1, 72))
+    return documents
+
+
+def _write(db, collection, documents):
+    for start in range(0, len(documents), BATCH_SIZE):
+        batch = db.batch()
+        for document in documents[start:start + BATCH_SIZE]:
+            batch.set(db.collection(collection).document(), document)
+        batch.commit()
+
+
+def seed_dataset(db, users=10, tasks=200, events=50, notes=20, seed=1):
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    user_ids = [f"bench-user-{index:04d}" for index in range(users)]
+    for user_id in user_ids:
+        db.collection('users').document(user_id).set({
+            "email": f"{user_id}@example.com",
+            "displayName": user_id,
+            "createdAt": now - timedelta(days=90),
+            "lastLogin": now,
+            "settings": {"theme": "light", "notifications": True}
+        })
+        _write(db, 'tasks', _with_history(generate_tasks(user_id, tasks, rng, now), rng, now))
+        _write(db, 'events', _with_history(generate_events(user_id, events, rng), rng, now))
+        _write(db, 'notes', _with_history(generate_notes(user_id, notes), rng, now))
+    return user_ids
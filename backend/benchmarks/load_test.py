@@ -0,0 +1,183 @@
+"""Load-test the hot API endpoints against the in-memory data backend.
+
+Run from the backend directory:
+
+    python -m benchmarks.load_test --users 20 --tasks 500 --concurrency 8
+    python -m benchmarks.load_test --save-baseline
+
+Results are compared with benchmarks/baselines/load_test.json when it was
+recorded with the same dataset and concurrency; the exit code is 1 when a
+scenario regresses by more than --tolerance.
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baselines', 'load_test.json')
+SCENARIOS = ('tasks', 'dashboard', 'analytics', 'report')
+TIME_RANGES = ('week', 'month', 'year')
+
+
+def configure_environment(args):
+    # Trebuie setate înainte de importul aplicației
+    os.environ['DATA_BACKEND'] = 'memory'
+    os.environ['MEMORY_STORE_LATENCY'] = str(args.rpc_latency_ms / 1000)
+    os.environ.setdefault('SCHEDULER_ENABLED', '0')
+    os.environ.setdefault('REMINDERS_ENABLED', '0')
+
+
+def build_requests(scenario, headers, report_data):
+    if scenario == 'tasks':
+        return lambda index: ('GET', '/api/tasks', {})
+    if scenario == 'dashboard':
+        return lambda index: ('GET', '/api/dashboard/overview', {})
+    if scenario == 'analytics':
+        return lambda index: ('GET', f'/api/analytics?timeRange={TIME_RANGES[index % len(TIME_RANGES)]}', {})
+    if scenario == 'report':
+        return lambda index: ('POST', '/api/reports/generate', {'json': {'reportData': report_data[index % len(report_data)]}})
+    raise ValueError(f'Unknown scenario: {scenario}')
+
+
+def percentile(durations, fraction):
+    return durations[min(len(durations) - 1, int(len(durations) * fraction))]
+
+
+def run_scenario(client, scenario, headers, report_data, requests, concurrency):
+    make_request = build_requests(scenario, headers, report_data)
+    local = threading.local()
+    errors = []
+
+    def call(index):
+        # Fiecare thread își păstrează propriul client de test
+        if not hasattr(local, 'client'):
+            local.client = client.application.test_client()
+        method, url, kwargs = make_request(index)
+        start = time.perf_counter()
+        response = local.client.open(url, method=method, headers=headers[index % len(headers)], **kwargs)
+        duration = time.perf_counter() - start
+        if response.status_code != 200:
+            errors.append(response.status_code)
+        response.close()
+        return duration
+
+    # Încălzire: o cerere pentru fiecare utilizator
+    for index in range(len(headers)):
+        call(index)
+    errors.clear()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        durations = sorted(pool.map(call, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        'requests': requests,
+        'errors': len(errors),
+        'throughput': round(requests / elapsed, 2),
+        'p50_ms': round(percentile(durations, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(durations, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(durations, 0.99) * 1000, 3)
+    }
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for scenario, result in results.items():
+        reference = baseline.get(scenario)
+        if not reference:
+            continue
+        if result['p95_ms'] > reference['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{scenario}: p95 {result['p95_ms']:.2f} ms vs baseline {reference['p95_ms']:.2f} ms")
+        if result['throughput'] < reference['throughput'] * (1 - tolerance):
+            regressions.append(f"{scenario}: throughput {result['throughput']:.1f}/s vs baseline {reference['throughput']:.1f}/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=10, help='synthetic users')
+    parser.add_argument('--tasks', type=int, default=200, help='tasks per user')
+    parser.add_argument('--events', type=int, default=50, help='events per user')
+    parser.add_argument('--notes', type=int, default=20, help='notes per user')
+    parser.add_argument('--requests', type=int, default=500, help='requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent clients')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='comma-separated subset of ' + ', '.join(SCENARIOS))
+    parser.add_argument('--rpc-latency-ms', type=float, default=0.0, help='simulated latency per data-store call')
+    parser.add_argument('--trace-memory', action='store_true', help='report the Python heap peak (slower)')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline file')
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative regression')
+    args = parser.parse_args()
+
+    configure_environment(args)
+    import app as app_module
+    from datastore import issue_local_token
+    from benchmarks.bench_reports import sample_report_data
+    from benchmarks.dataset import seed_dataset
+
+    seed_started = time.perf_counter()
+    user_ids = seed_dataset(app_module.db, users=args.users, tasks=args.tasks, events=args.events, notes=args.notes)
+    print(f"seeded {len(user_ids)} users x {args.tasks} tasks / {args.events} events / {args.notes} notes "
+          f"in {time.perf_counter() - seed_started:.1f} s")
+
+    headers = [{'Authorization': f'Bearer {issue_local_token(user_id)}'} for user_id in user_ids]
+    report_data = []
+    for user_id in user_ids:
+        data = sample_report_data()
+        data['generatedAt'] = f'{user_id} 18:00:00'
+        report_data.append(data)
+
+    client = app_module.app.test_client()
+    results = {}
+    for scenario in [name.strip() for name in args.scenarios.split(',') if name.strip()]:
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if args.trace_memory:
+            tracemalloc.start()
+        result = run_scenario(client, scenario, headers, report_data, args.requests, args.concurrency)
+        if args.trace_memory:
+            result['heap_peak_kib'] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+            tracemalloc.stop()
+        result['rss_growth_kib'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+        results[scenario] = result
+
+    print(f"{'scenario':<12}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}{'RSS+ KiB':>10}")
+    for scenario, result in results.items():
+        print(f"{scenario:<12}{result['throughput']:>10.1f}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+              f"{result['p99_ms']:>10.2f}{result['errors']:>8}{result['rss_growth_kib']:>10}")
+    print(f"peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss} KiB")
+
+    config = {
+        'users': args.users, 'tasks': args.tasks, 'events': args.events, 'notes': args.notes,
+        'requests': args.requests, 'concurrency': args.concurrency, 'rpcLatencyMs': args.rpc_latency_ms
+    }
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump({'config': config, 'results': results}, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write('\n')
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    if baseline.get('config') != config:
+        print("baseline was recorded with a different configuration; skipping comparison")
+        return 0
+    regressions = compare(results, baseline['results'], args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print(f"no regressions beyond {args.tolerance:.0%} of the baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
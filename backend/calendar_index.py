@@ -0,0 +1,156 @@
+import calendar
+from datetime import datetime, timedelta
+
+from reminders import DEFAULT_TIMEZONE, parse_datetime
+
+# Câmpul cu lunile ('YYYY-MM') atinse de un eveniment, interogat cu array_contains_any
+INDEX_FIELD = 'indexMonths'
+# Schimbă versiunea când se schimbă modul de calcul, ca indexul să fie reconstruit
+INDEX_VERSION = 1
+
+RECURRING_BUCKET = 'recurring'
+LONG_BUCKET = 'long'
+# Evenimentele mai lungi de atâtea luni merg în LONG_BUCKET, nu în fiecare lună
+MAX_INDEXED_MONTHS = 24
+# Limita Firestore pentru valorile unui filtru array_contains_any
+QUERY_BUCKET_LIMIT = 10
+
+RECURRENCES = ('daily', 'weekly', 'monthly', 'yearly')
+MAX_OCCURRENCES = 1000
+
+
+def event_interval(event):
+    # Intervalul evenimentului în fusul aplicației; lipsa lui endDate înseamnă durată zero
+    start = parse_datetime(event.get('startDate'))
+    if start is None:
+        return None
+    end = parse_datetime(event.get('endDate')) or start
+    start = start.astimezone(DEFAULT_TIMEZONE)
+    return start, max(end.astimezone(DEFAULT_TIMEZONE), start)
+
+
+def month_keys(start, end):
+    keys = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        keys.append(f'{year:04d}-{month:02d}')
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return keys
+
+
+def index_buckets(event):
+    if event.get('recurrence') in RECURRENCES:
+        return [RECURRING_BUCKET]
+    interval = event_interval(event)
+    if interval is None:
+        return []
+    start, end = interval
+    if (end.year - start.year) * 12 + end.month - start.month >= MAX_INDEXED_MONTHS:
+        return [LONG_BUCKET]
+    return month_keys(start, end)
+
+
+def query_buckets(window_start, window_end):
+    # Seriile recurente și evenimentele lungi pot cădea în orice fereastră
+    months = month_keys(window_start.astimezone(DEFAULT_TIMEZONE), window_end.astimezone(DEFAULT_TIMEZONE))
+    buckets = [RECURRING_BUCKET, LONG_BUCKET] + months
+    return [buckets[offset:offset + QUERY_BUCKET_LIMIT] for offset in range(0, len(buckets), QUERY_BUCKET_LIMIT)]
+
+
+def first_group(event, groups, position):
+    # Un eveniment prins de mai multe grupuri de luni e emis doar de primul dintre ele
+    earlier = set().union(*groups[:position])
+    return not earlier.intersection(event.get(INDEX_FIELD) or ())
+
+
+def _overlaps(start, end, window_start, window_end):
+    return start < window_end and (end > window_start or start >= window_start)
+
+
+def _shift(start, recurrence, steps):
+    # Repetarea păstrează ora din calendar (și peste schimbarea orei de vară)
+    local = start.replace(tzinfo=None)
+    if recurrence == 'daily':
+        moment = local + timedelta(days=steps)
+    elif recurrence == 'weekly':
+        moment = local + timedelta(weeks=steps)
+    else:
+        months = steps * (12 if recurrence == 'yearly' else 1)
+        year, month = divmod(local.month - 1 + months, 12)
+        year += local.year
+        if local.day > calendar.monthrange(year, month + 1)[1]:
+            # Ca în RFC 5545: 31 ianuarie nu are apariție în februarie
+            return None
+        moment = local.replace(year=year, month=month + 1)
+    return moment.replace(tzinfo=start.tzinfo)
+
+
+def _first_step(start, duration, recurrence, window_start):
+    # Sare direct la apariția dinaintea ferestrei, fără a parcurge istoricul seriei
+    earliest = (window_start - duration).replace(tzinfo=None) - start.replace(tzinfo=None)
+    if recurrence == 'daily':
+        steps = earliest.days
+    elif recurrence == 'weekly':
+        steps = earliest.days // 7
+    else:
+        target = window_start - duration
+        steps = (target.year - start.year) * 12 + target.month - start.month
+        if recurrence == 'yearly':
+            steps //= 12
+    return max(0, steps - 1)
+
+
+def occurrences(event, window_start, window_end, limit=MAX_OCCURRENCES):
+    """(start, end) of each occurrence of `event` that overlaps the window."""
+    interval = event_interval(event)
+    if interval is None:
+        return []
+    start, end = interval
+    window_start = window_start.astimezone(DEFAULT_TIMEZONE)
+    window_end = window_end.astimezone(DEFAULT_TIMEZONE)
+    recurrence = event.get('recurrence')
+    if recurrence not in RECURRENCES:
+        return [(start, end)] if _overlaps(start, end, window_start, window_end) else []
+
+    duration = end - start
+    found = []
+    step = _first_step(start, duration, recurrence, window_start)
+    while len(found) < limit:
+        occurrence = _shift(start, recurrence, step)
+        step += 1
+        if occurrence is None:
+            continue
+        if occurrence >= window_end:
+            break
+        if _overlaps(occurrence, occurrence + duration, window_start, window_end):
+            found.append((occurrence, occurrence + duration))
+    return found
+
+
+def _format_like(moment, original):
+    # Aparițiile păstrează formatul câmpului original (cu sau fără fus orar, cu sau fără secunde)
+    if isinstance(original, datetime):
+        return moment
+    try:
+        aware = datetime.fromisoformat(original.replace('Z', '+00:00')).tzinfo is not None
+    except (AttributeError, ValueError):
+        aware = False
+    if aware:
+        return moment.isoformat()
+    local = moment.replace(tzinfo=None)
+    return local.isoformat(timespec='minutes') if isinstance(original, str) and len(original) == 16 else local.isoformat()
+
+
+def expand_event(event_id, event, window_start, window_end):
+    expanded = []
+    for start, end in occurrences(event, window_start, window_end):
+        item = {key: value for key, value in event.items() if key != INDEX_FIELD}
+        item['id'] = event_id
+        if event.get('recurrence') in RECURRENCES:
+            item['occurrenceId'] = f"{event_id}_{start.strftime('%Y%m%dT%H%M')}"
+            item['seriesStartDate'] = event.get('startDate')
+            item['seriesEndDate'] = event.get('endDate')
+            item['startDate'] = _format_like(start, event.get('startDate'))
+            item['endDate'] = _format_like(end, event.get('endDate') or event.get('startDate'))
+        expanded.append((start, item))
+    return expanded
@@ -0,0 +1,111 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import time
+
+COLLECTIONS = ('tasks', 'notes', 'events', 'users', 'goals', 'reminders', 'activities')
+
+
+class Repository:
+    """Access to one user-owned collection, independent of the backing client."""
+
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+
+    @property
+    def collection(self):
+        return self.db.collection(self.name)
+
+    def document(self, doc_id=None):
+        return self.collection.document(doc_id) if doc_id else self.collection.document()
+
+    def for_user(self, user_id):
+        return self.collection.where('userId', '==', user_id)
+
+    def add(self, data):
+        return self.collection.add(data)
+
+
+class DataStore:
+    def __init__(self, db, backend, client=None):
+        self.db = db
+        self.backend = backend
+        # Clientul fără instrumentare, pentru vederile care trebuie să-i partajeze datele
+        self.client = client or db
+        self._repositories = {name: Repository(db, name) for name in COLLECTIONS}
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__['_repositories'][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def repository(self, name):
+        return self._repositories[name]
+
+
+def create_client(backend):
+    if backend == 'memory':
+        from memory_store import MemoryClient
+        return MemoryClient(
+            latency=float(os.getenv('MEMORY_STORE_LATENCY', 0)),
+            indexed_fields=('userId', 'indexMonths')
+        )
+    if backend == 'firestore':
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+        if not firebase_admin._apps:
+            cred = credentials.Certificate(os.getenv('FIREBASE_CREDENTIALS', 'config/key.json'))
+            firebase_admin.initialize_app(cred)
+        return firestore.client()
+    raise ValueError(f'Unknown DATA_BACKEND: {backend}')
+
+
+def create_datastore(backend=None, metrics=None):
+    # DATA_BACKEND=memory rulează aplicația fără Firebase (benchmark-uri, teste de încărcare)
+    backend = backend or os.getenv('DATA_BACKEND', 'firestore')
+    client = create_client(backend)
+    db = metrics.instrument_client(client) if metrics is not None else client
+    return DataStore(db, backend, client)
+
+
+def create_async_datastore(datastore):
+    # Aceleași colecții, citite prin clientul asincron; necesită create_datastore înainte
+    if datastore.backend == 'memory':
+        from memory_store import AsyncMemoryClient
+        return DataStore(AsyncMemoryClient(datastore.client), 'memory')
+    import firebase_admin
+    from google.cloud import firestore
+    app = firebase_admin.get_app()
+    client = firestore.AsyncClient(project=app.project_id, credentials=app.credential.get_credential())
+    return DataStore(client, datastore.backend)
+
+
+# Token-uri locale pentru backend-ul `memory`, unde Firebase Auth nu este disponibil
+_local_secret = None
+
+
+def _sign(payload):
+    global _local_secret
+    if _local_secret is None:
+        _local_secret = os.getenv('LOCAL_AUTH_SECRET') or secrets.token_hex(32)
+    digest = hmac.new(_local_secret.encode('utf-8'), payload.encode('utf-8'), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).decode('ascii').rstrip('=')
+
+
+def issue_local_token(uid, ttl=3600):
+    payload = f'{uid}:{int(time.time() + ttl)}'
+    return f'{payload}:{_sign(payload)}'
+
+
+def verify_local_token(token):
+    payload, _, signature = token.rpartition(':')
+    uid, _, expires = payload.rpartition(':')
+    if not uid or not hmac.compare_digest(signature, _sign(payload)):
+        raise ValueError('Invalid local token')
+    if int(expires) <= time.time():
+        raise ValueError('Local token expired')
+    return {'uid': uid, 'exp': int(expires)}
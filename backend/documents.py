@@ -0,0 +1,145 @@
+import os
+import time
+
+from google.api_core.exceptions import FailedPrecondition, NotFound
+from google.cloud.firestore import SERVER_TIMESTAMP
+
+from cache import TTLCache
+
+
+class OwnershipError(Exception):
+    status_code = 400
+
+
+class DocumentNotFound(OwnershipError):
+    status_code = 404
+
+
+class NotOwner(OwnershipError):
+    status_code = 403
+
+
+class ConcurrentModification(OwnershipError):
+    status_code = 409
+
+
+def _resolve_server_timestamps(data, commit_time):
+    # Firestore completează SERVER_TIMESTAMP cu momentul commit-ului, adică update_time
+    return {key: commit_time if value is SERVER_TIMESTAMP else value for key, value in data.items()}
+
+
+class DocumentVersionCache:
+    """Last known content and update_time of documents, keyed by document path.
+
+    Entries are only a hint: every write made from them carries a last_update_time
+    precondition, so a stale entry costs one failed write and a fresh read.
+    """
+
+    def __init__(self, maxsize=10000, ttl=300):
+        self._cache = TTLCache(maxsize=maxsize)
+        self.ttl = ttl
+        self.retries = 0
+
+    def get(self, path):
+        return self._cache.get(path)
+
+    def remember(self, path, data, update_time):
+        if update_time is None:
+            return
+        self._cache.set(path, (data, update_time), expires_at=time.time() + self.ttl)
+
+    def remember_snapshot(self, snapshot):
+        if snapshot.exists:
+            self.remember(snapshot.reference.path, snapshot.to_dict(), snapshot.update_time)
+
+    def forget(self, path):
+        self._cache.pop(path)
+
+    def stats(self):
+        return {**self._cache.stats(), 'retries': self.retries}
+
+
+class OwnedDocuments:
+    """Mutations on documents that belong to a user.
+
+    With a cached version the write is a single request guarded by last_update_time;
+    otherwise (or when that version is stale) the document is read first.
+    """
+
+    def __init__(self, db, cache):
+        self.db = db
+        self.cache = cache
+
+    def _load(self, ref, user_id, use_cache=True):
+        cached = self.cache.get(ref.path) if use_cache else None
+        if cached is None:
+            snapshot = ref.get()
+            if not snapshot.exists:
+                self.cache.forget(ref.path)
+                raise DocumentNotFound(ref.path)
+            cached = (snapshot.to_dict(), snapshot.update_time)
+            self.cache.remember(ref.path, *cached)
+        data, update_time = cached
+        # userId nu se schimbă niciodată, deci și o versiune veche răspunde corect la verificare
+        if data.get('userId') != user_id:
+            raise NotOwner(ref.path)
+        return data, update_time
+
+    def _attempts(self, ref, user_id):
+        # Prima încercare folosește cache-ul, a doua citește documentul din Firestore
+        yield self._load(ref, user_id)
+        self.cache.retries += 1
+        yield self._load(ref, user_id, use_cache=False)
+
+    def get(self, collection, doc_id, user_id):
+        ref = self.db.collection(collection).document(doc_id)
+        return self._load(ref, user_id)[0]
+
+    def update(self, collection, doc_id, user_id, changes, check=None, derive=None):
+        ref = self.db.collection(collection).document(doc_id)
+        changes = {key: value for key, value in changes.items() if key != 'userId'}
+        for before, update_time in self._attempts(ref, user_id):
+            if check is not None:
+                # `check` poate refuza modificarea pe baza stării curente (ridică o excepție)
+                check(before)
+            writes = changes
+            if derive is not None:
+                # `derive` adaugă câmpuri calculate din documentul rezultat (de ex. indexuri)
+                writes = {**changes, **derive({**before, **changes})}
+            try:
+                result = ref.update(writes, option=self.db.write_option(last_update_time=update_time))
+            except (FailedPrecondition, NotFound):
+                continue
+            after = {**before, **_resolve_server_timestamps(writes, result.update_time)}
+            self.cache.remember(ref.path, after, result.update_time)
+            return before, after
+        raise ConcurrentModification(ref.path)
+
+    def delete(self, collection, doc_id, user_id, extra_writes=()):
+        ref = self.db.collection(collection).document(doc_id)
+        for before, update_time in self._attempts(ref, user_id):
+            batch = self.db.batch()
+            batch.delete(ref, option=self.db.write_option(last_update_time=update_time))
+            for write in extra_writes:
+                write(batch)
+            try:
+                batch.commit()
+            except (FailedPrecondition, NotFound):
+                continue
+            self.cache.forget(ref.path)
+            return before
+        raise ConcurrentModification(ref.path)
+
+    def create(self, collection, data):
+        ref = self.db.collection(collection).document()
+        result = ref.set(data)
+        self.cache.remember(ref.path, _resolve_server_timestamps(data, result.update_time), result.update_time)
+        return ref
+
+
+def create_owned_documents(db):
+    cache = DocumentVersionCache(
+        maxsize=int(os.getenv('DOCUMENT_CACHE_SIZE', 10000)),
+        ttl=int(os.getenv('DOCUMENT_CACHE_TTL', 300))
+    )
+    return OwnedDocuments(db, cache)
@@ -0,0 +1,375 @@
+import calendar
+import csv
+import io
+import zlib
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+
+from flask import json
+
+from calendar_index import RECURRENCES, event_interval
+from reminders import DEFAULT_TIMEZONE, parse_datetime
+
+# Formatele suportate pentru fiecare colecție; primul este implicit
+EXPORT_FORMATS = {
+    'tasks': ('csv', 'ndjson'),
+    'events': ('ics', 'csv', 'ndjson'),
+    'notes': ('txt', 'md', 'ndjson')
+}
+MIMETYPES = {
+    'csv': 'text/csv',
+    'ics': 'text/calendar',
+    'txt': 'text/plain',
+    'md': 'text/markdown',
+    'ndjson': 'application/x-ndjson'
+}
+
+# Bucățile mici sunt unite în blocuri de atâția octeți înainte de a fi trimise
+CHUNK_SIZE = 64 * 1024
+ICS_LINE_LIMIT = 75
+
+WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+MONTHS = ('January', 'February', 'March', 'April', 'May', 'June', 'July',
+          'August', 'September', 'October', 'November', 'December')
+ICS_WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+RECURRENCE_LABELS = {'daily': 'Daily', 'weekly': 'Weekly', 'monthly': 'Monthly', 'yearly': 'Yearly'}
+
+
+def friendly_date(value, include_time=False):
+    # Același format ca în Export.vue: „Monday, 5 February 2024 at 09:30”
+    moment = parse_datetime(value)
+    if moment is None:
+        return ''
+    local = moment.astimezone(DEFAULT_TIMEZONE)
+    text = f'{WEEKDAYS[local.weekday()]}, {local.day} {MONTHS[local.month - 1]} {local.year}'
+    return f'{text} at {local.hour:02d}:{local.minute:02d}' if include_time else text
+
+
+def notifications_text(notifications):
+    notifications = notifications or {}
+    types = [label for key, label in (('email', 'Email'), ('push', 'Push notification')) if notifications.get(key)]
+    return ', '.join(types) or 'No notifications'
+
+
+def ics_escape(text):
+    return (str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def ics_line(line):
+    # RFC 5545: liniile de peste 75 de octeți continuă pe rândul următor, după un spațiu
+    if len(line.encode('utf-8')) <= ICS_LINE_LIMIT:
+        return line + '\r\n'
+    parts, current, size, limit = [], [], 0, ICS_LINE_LIMIT
+    for char in line:
+        width = len(char.encode('utf-8'))
+        if size + width > limit:
+            parts.append(''.join(current))
+            current, size, limit = [], 0, ICS_LINE_LIMIT - 1
+        current.append(char)
+        size += width
+    parts.append(''.join(current))
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def ics_utc(moment):
+    return moment.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def ics_offset(offset):
+    minutes = int(offset.total_seconds() // 60)
+    sign = '-' if minutes < 0 else '+'
+    return f'{sign}{abs(minutes) // 60:02d}{abs(minutes) % 60:02d}'
+
+
+def zone_transitions(zone, year):
+    # Momentele UTC din `year` în care fusul își schimbă decalajul, căutate zi cu zi, apoi prin bisecție
+    moment = datetime(year, 1, 1, tzinfo=timezone.utc)
+    end = datetime(year + 1, 1, 1, tzinfo=timezone.utc)
+    transitions = []
+    while moment < end:
+        following = moment + timedelta(days=1)
+        if following.astimezone(zone).utcoffset() != moment.astimezone(zone).utcoffset():
+            low, high = moment, following
+            while high - low > timedelta(seconds=1):
+                middle = low + (high - low) / 2
+                if middle.astimezone(zone).utcoffset() == low.astimezone(zone).utcoffset():
+                    low = middle
+                else:
+                    high = middle
+            transitions.append(high.replace(microsecond=0))
+        moment = following
+    return transitions
+
+
+def _nth_weekday(year, month, weekday, ordinal):
+    last_day = calendar.monthrange(year, month)[1]
+    if ordinal < 0:
+        return last_day - (date(year, month, last_day).weekday() - weekday) % 7
+    return 1 + (weekday - date(year, month, 1).weekday()) % 7 + 7 * (ordinal - 1)
+
+
+@lru_cache(maxsize=16)
+def vtimezone_lines(zone, year):
+    """VTIMEZONE for `zone`, with the DST rules in force in `year` repeated yearly from 1970."""
+    lines = ['BEGIN:VTIMEZONE', f'TZID:{zone.key}']
+    transitions = zone_transitions(zone, year)
+    if not transitions:
+        local = datetime(year, 1, 1, tzinfo=timezone.utc).astimezone(zone)
+        offset = ics_offset(local.utcoffset())
+        lines += ['BEGIN:STANDARD', 'DTSTART:19700101T000000', f'TZOFFSETFROM:{offset}',
+                  f'TZOFFSETTO:{offset}', f'TZNAME:{local.tzname()}', 'END:STANDARD']
+    for moment in transitions:
+        before = (moment - timedelta(seconds=1)).astimezone(zone)
+        after = moment.astimezone(zone)
+        kind = 'DAYLIGHT' if after.dst() else 'STANDARD'
+        # Ora de început se scrie în decalajul de dinainte de schimbare (RFC 5545, 3.6.5)
+        onset = (moment + before.utcoffset()).replace(tzinfo=None)
+        # Regulile de tipul „ultima duminică din martie” se scriu cu BYDAY=-1SU
+        ordinal = -1 if onset.day + 7 > calendar.monthrange(onset.year, onset.month)[1] else (onset.day - 1) // 7 + 1
+        first = onset.replace(year=1970, day=_nth_weekday(1970, onset.month, onset.weekday(), ordinal))
+        lines += [
+            f'BEGIN:{kind}',
+            f"DTSTART:{first.strftime('%Y%m%dT%H%M%S')}",
+            f'RRULE:FREQ=YEARLY;BYMONTH={onset.month};BYDAY={ordinal}{ICS_WEEKDAYS[onset.weekday()]}',
+            f'TZOFFSETFROM:{ics_offset(before.utcoffset())}',
+            f'TZOFFSETTO:{ics_offset(after.utcoffset())}',
+            f'TZNAME:{after.tzname()}',
+            f'END:{kind}'
+        ]
+    lines.append('END:VTIMEZONE')
+    return tuple(lines)
+
+
+def ics_event(event, stamp):
+    interval = event_interval(event)
+    if interval is None:
+        return ''
+    start, end = interval
+    updated_at = event.get('updatedAt')
+    lines = [
+        'BEGIN:VEVENT',
+        f"UID:{event['id']}@momentum",
+        f'DTSTAMP:{ics_utc(updated_at if isinstance(updated_at, datetime) else stamp)}'
+    ]
+    recurrence = event.get('recurrence')
+    if recurrence in RECURRENCES:
+        # Seriile păstrează ora locală peste schimbarea orei de vară, deci au fusul aplicației
+        zone = DEFAULT_TIMEZONE.key
+        lines.append(f"DTSTART;TZID={zone}:{start.strftime('%Y%m%dT%H%M%S')}")
+        lines.append(f"DTEND;TZID={zone}:{end.strftime('%Y%m%dT%H%M%S')}")
+        lines.append(f'RRULE:FREQ={recurrence.upper()}')
+    else:
+        lines.append(f'DTSTART:{ics_utc(start)}')
+        lines.append(f'DTEND:{ics_utc(end)}')
+    lines.append(f"SUMMARY:{ics_escape(event.get('title') or '')}")
+    if event.get('description'):
+        lines.append(f"DESCRIPTION:{ics_escape(event['description'])}")
+    if event.get('category'):
+        lines.append(f"CATEGORIES:{ics_escape(event['category'])}")
+    lines.append('END:VEVENT')
+    return ''.join(ics_line(line) for line in lines)
+
+
+class ExportWriter(ABC):
+    """Renders an export file piece by piece: `head()`, one `row()` per document, `tail()`.
+
+    The same writer serves the WSGI generators and the ASGI async iterators.
+    """
+
+    def head(self):
+        return ''
+
+    @abstractmethod
+    def row(self, document):
+        pass
+
+    def tail(self):
+        return ''
+
+
+class CsvWriter(ExportWriter):
+    header = ()
+
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def _line(self, values):
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._writer.writerow(values)
+        return self._buffer.getvalue()
+
+    def head(self):
+        return self._line(self.header)
+
+    def row(self, document):
+        return self._line(self.values(document))
+
+
+class TasksCsvWriter(CsvWriter):
+    header = ('Title', 'Description', 'Priority', 'Category', 'Due Date', 'Status', 'Created', 'Updated')
+
+    def values(self, task):
+        return [
+            task.get('title') or '',
+            task.get('description') or '',
+            task.get('priority') or '',
+            task.get('category') or '',
+            friendly_date(task.get('dueDate')),
+            'Completed' if task.get('completed') else 'In Progress',
+            friendly_date(task.get('createdAt')),
+            friendly_date(task.get('updatedAt'))
+        ]
+
+
+class EventsCsvWriter(CsvWriter):
+    header = ('Title', 'Description', 'Start', 'End', 'Category', 'Recurrence', 'Notifications')
+
+    def values(self, event):
+        return [
+            event.get('title') or '',
+            event.get('description') or '',
+            friendly_date(event.get('startDate'), include_time=True),
+            friendly_date(event.get('endDate'), include_time=True),
+            event.get('category') or '',
+            RECURRENCE_LABELS.get(event.get('recurrence'), 'No recurrence'),
+            notifications_text(event.get('notifications'))
+        ]
+
+
+class IcsWriter(ExportWriter):
+    def __init__(self, name='Momentum Calendar', stamp=None):
+        self.name = name
+        # DTSTAMP pentru evenimentele fără `updatedAt`; un feed îl fixează ca randările să fie identice
+        self.stamp = stamp or datetime.now(timezone.utc)
+
+    def head(self):
+        return ''.join(ics_line(line) for line in (
+            'BEGIN:VCALENDAR',
+            'VERSION:2.0',
+            'PRODID:-//Momentum//Calendar//EN',
+            'CALSCALE:GREGORIAN',
+            'METHOD:PUBLISH',
+            f'X-WR-CALNAME:{ics_escape(self.name)}',
+            f'X-WR-TIMEZONE:{DEFAULT_TIMEZONE.key}',
+            # Seriile recurente folosesc TZID, deci calendarul trebuie să definească fusul
+            *vtimezone_lines(DEFAULT_TIMEZONE, self.stamp.year)
+        ))
+
+    def row(self, event):
+        return ics_event(event, self.stamp)
+
+    def tail(self):
+        return ics_line('END:VCALENDAR')
+
+
+class NotesTxtWriter(ExportWriter):
+    def __init__(self):
+        # Notele sunt separate printr-un rând gol, ca în exportul vechi din browser
+        self.separator = ''
+
+    def row(self, note):
+        title = note.get('title') or ''
+        text = (f"{self.separator}{title}\n{'-' * len(title)}\n"
+                f"Category: {note.get('category') or ''}\n"
+                f"Created: {friendly_date(note.get('createdAt'))}\n"
+                f"Updated: {friendly_date(note.get('updatedAt'))}\n"
+                f"\n{note.get('content') or ''}\n\n{'=' * 80}\n")
+        self.separator = '\n'
+        return text
+
+
+class NotesMdWriter(NotesTxtWriter):
+    def row(self, note):
+        text = (f"{self.separator}# {note.get('title') or ''}\n\n"
+                f"> **Category:** {note.get('category') or ''}  \n"
+                f"> **Created:** {friendly_date(note.get('createdAt'))}  \n"
+                f"> **Updated:** {friendly_date(note.get('updatedAt'))}\n\n"
+                f"{note.get('content') or ''}\n\n---\n")
+        self.separator = '\n'
+        return text
+
+
+class NdjsonWriter(ExportWriter):
+    def __init__(self, dumps=json.dumps):
+        self.dumps = dumps
+
+    def row(self, document):
+        return self.dumps(document) + '\n'
+
+
+def ndjson_lines(documents):
+    # Un document pe linie, emis pe măsură ce vine din iteratorul Firestore
+    for document in documents:
+        yield json.dumps(document) + '\n'
+
+
+WRITERS = {
+    ('tasks', 'csv'): TasksCsvWriter,
+    ('events', 'csv'): EventsCsvWriter,
+    ('events', 'ics'): IcsWriter,
+    ('notes', 'txt'): NotesTxtWriter,
+    ('notes', 'md'): NotesMdWriter
+}
+
+
+def export_writer(collection, export_format, dumps=json.dumps, **options):
+    if export_format == 'ndjson':
+        return NdjsonWriter(dumps)
+    return WRITERS[(collection, export_format)](**options)
+
+
+def render_export(collection, export_format, documents, **options):
+    """Text pieces of the export file, produced as `documents` are consumed."""
+    writer = export_writer(collection, export_format, **options)
+    yield writer.head()
+    for document in documents:
+        yield writer.row(document)
+    yield writer.tail()
+
+
+def export_filename(collection, export_format, window=None):
+    if window is None:
+        return f'{collection}.{export_format}'
+    start, end = (moment.astimezone(DEFAULT_TIMEZONE).strftime('%d_%m_%Y') for moment in window)
+    return f'{collection}_{start}_{end}.{export_format}'
+
+
+class ChunkEncoder:
+    """Joins text pieces into blocks of about `size` bytes, gzip-compressed when `compress` is set."""
+
+    def __init__(self, compress=False, size=CHUNK_SIZE, level=6):
+        self.size = size
+        self._buffer = []
+        self._length = 0
+        # wbits=31 produce antetul gzip, deci fișierul poate fi comprimat bloc cu bloc
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31) if compress else None
+
+    def feed(self, piece):
+        self._buffer.append(piece)
+        self._length += len(piece)
+        return self._emit() if self._length >= self.size else b''
+
+    def close(self):
+        return self._emit(final=True)
+
+    def _emit(self, final=False):
+        data = ''.join(self._buffer).encode('utf-8')
+        self._buffer, self._length = [], 0
+        if self._compressor is not None:
+            data = self._compressor.compress(data) + (self._compressor.flush() if final else b'')
+        return data
+
+
+def encode_export(pieces, compress=False):
+    encoder = ChunkEncoder(compress=compress)
+    for piece in pieces:
+        chunk = encoder.feed(piece)
+        if chunk:
+            yield chunk
+    chunk = encoder.close()
+    if chunk:
+        yield chunk
@@ -0,0 +1,24 @@
+import os
+
+# Conexiunile /api/stream stau deschise: un worker gevent le ține ca greenlet-uri, nu ca thread-uri
+bind = os.getenv('BIND', '0.0.0.0:5000')
+# Fără Redis, PushHub livrează doar clienților conectați la workerul care a făcut scrierea
+push_shared = os.getenv('PUSH_BACKEND') == 'redis'
+workers = int(os.getenv('WEB_CONCURRENCY', 2 if push_shared else 1))
+if workers > 1 and not push_shared:
+    raise RuntimeError('WEB_CONCURRENCY > 1 requires PUSH_BACKEND=redis, otherwise live updates miss clients on other workers')
+worker_class = 'gevent'
+worker_connections = int(os.getenv('WORKER_CONNECTIONS', 1000))
+timeout = 120
+# După monkey-patching, thread-urile unui ThreadPoolExecutor devin greenlet-uri în bucla workerului.
+# Randarea PDF ține CPU-ul ocupat și ar bloca toate cererile și conexiunile /api/stream ale workerului,
+# așa că rapoartele se randează implicit în procese separate (REPORT_EXECUTOR=thread revine la thread-uri)
+os.environ.setdefault('REPORT_EXECUTOR', 'process')
+
+
+def post_fork(server, worker):
+    # gRPC (clientul Firestore) trebuie să folosească bucla gevent după monkey-patching
+    from gevent import monkey
+    monkey.patch_all()
+    from grpc.experimental import gevent as grpc_gevent
+    grpc_gevent.init_gevent()
@@ -0,0 +1,87 @@
+import os
+import smtplib
+from email.message import EmailMessage
+from html import escape
+
+from reminders import DEFAULT_TIMEZONE
+
+
+class SmtpMailer:
+    """Sends HTML emails through the SMTP server configured by the `SMTP_*` variables."""
+
+    def __init__(self, host, port, user=None, password=None, secure=False, sender=None, timeout=10):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.secure = secure
+        self.sender = sender or user
+        self.timeout = timeout
+        self.sent = 0
+        self.failed = 0
+
+    def send(self, to, subject, html):
+        message = EmailMessage()
+        message['From'] = f'"Momentum" <{self.sender}>'
+        message['To'] = to
+        message['Subject'] = subject
+        message.set_content(html, subtype='html')
+        # SMTP_SECURE=true înseamnă TLS de la conectare (portul 465), altfel STARTTLS dacă serverul îl oferă
+        connection = smtplib.SMTP_SSL if self.secure else smtplib.SMTP
+        try:
+            with connection(self.host, self.port, timeout=self.timeout) as client:
+                if not self.secure and client.has_extn('starttls'):
+                    client.starttls()
+                if self.user:
+                    client.login(self.user, self.password)
+                client.send_message(message)
+        except Exception:
+            self.failed += 1
+            raise
+        self.sent += 1
+
+
+def reminder_email(reminder):
+    # Același conținut ca șablonul trimis până acum din browser
+    title = escape(reminder['title'] or '')
+    starts_at = reminder['startsAt'].astimezone(DEFAULT_TIMEZONE).strftime('%d.%m.%Y, %H:%M:%S')
+    description = f"<p>{escape(reminder['description'])}</p>" if reminder.get('description') else ''
+    if reminder['source'] == 'events':
+        subject = f"Reminder: {reminder['title']} începe în curând"
+        heading, label = 'Reminder pentru eveniment', 'Începe la'
+    elif reminder['source'] == 'tasks':
+        subject = f"Reminder: termenul pentru {reminder['title']} se apropie"
+        heading, label = 'Reminder pentru task', 'Termen limită'
+    else:
+        subject = f"Reminder: {reminder['title']}"
+        heading, label = 'Reminder', 'Programat la'
+    html = f'''
+      <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+        <h2 style="color: #315659;">{heading}</h2>
+        <div style="background: #f5f5f5; padding: 20px; border-radius: 8px;">
+          <h3 style="color: #2978A0;">{title}</h3>
+          {description}
+          <p><strong>{label}:</strong> {starts_at}</p>
+        </div>
+        <p style="color: #666; font-size: 14px; margin-top: 20px;">
+          Acest email a fost trimis automat de aplicația Momentum.
+        </p>
+      </div>
+    '''
+    return subject, html
+
+
+def create_mailer():
+    # Fără SMTP_HOST, reminder-ele se livrează doar ca notificări în aplicație
+    host = os.getenv('SMTP_HOST')
+    if not host:
+        return None
+    secure = os.getenv('SMTP_SECURE') == 'true'
+    return SmtpMailer(
+        host,
+        int(os.getenv('SMTP_PORT', 465 if secure else 587)),
+        user=os.getenv('SMTP_USER'),
+        password=os.getenv('SMTP_PASS'),
+        secure=secure,
+        sender=os.getenv('SMTP_FROM')
+    )
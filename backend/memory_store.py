@@ -0,0 +1,697 @@
+import asyncio
+import copy
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition, NotFound
+from google.cloud.firestore_v1 import transforms
+from google.cloud.firestore_v1.base_query import BaseQuery
+
+ASCENDING = BaseQuery.ASCENDING
+DESCENDING = BaseQuery.DESCENDING
+
+_MISSING = object()
+_clock_lock = threading.Lock()
+_last_update_time = None
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _next_update_time():
+    # Timpii de actualizare trebuie să fie unici pentru precondițiile last_update_time
+    global _last_update_time
+    with _clock_lock:
+        now = _now()
+        if _last_update_time is not None and now <= _last_update_time:
+            now = _last_update_time + timedelta(microseconds=1)
+        _last_update_time = now
+        return now
+
+
+def _comparable(value):
+    # Firestore întoarce datele ca UTC; datele naive sunt tratate tot ca UTC
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _type_rank(value):
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, datetime):
+        return 3
+    if isinstance(value, str):
+        return 4
+    if isinstance(value, bytes):
+        return 5
+    if isinstance(value, MemoryDocumentReference):
+        return 6
+    if isinstance(value, (list, tuple)):
+        return 8
+    return 9
+
+
+def _sort_key(value):
+    value = _comparable(value)
+    if isinstance(value, MemoryDocumentReference):
+        value = value.path
+    if isinstance(value, dict):
+        value = sorted(value.items())
+    return (_type_rank(value), value)
+
+
+def _get_path(data, path):
+    current = data
+    for part in path.split('.'):
+        if not isinstance(current, dict) or part not in current:
+            return _MISSING
+        current = current[part]
+    return current
+
+
+def _resolve(value, current, commit_time):
+    # Ca în Firestore, SERVER_TIMESTAMP primește momentul commit-ului (update_time)
+    if value is transforms.SERVER_TIMESTAMP:
+        return commit_time
+    if isinstance(value, transforms.Increment):
+        base = current if isinstance(current, (int, float)) and not isinstance(current, bool) else 0
+        return base + value.value
+    if isinstance(value, transforms.ArrayUnion):
+        base = list(current) if isinstance(current, list) else []
+        return base + [v for v in value.values if v not in base]
+    if isinstance(value, transforms.ArrayRemove):
+        base = list(current) if isinstance(current, list) else []
+        return [v for v in base if v not in value.values]
+    if isinstance(value, dict):
+        existing = current if isinstance(current, dict) else {}
+        return {k: _resolve(v, existing.get(k), commit_time) for k, v in value.items() if v is not transforms.DELETE_FIELD}
+    return copy.deepcopy(value)
+
+
+def _apply_path(data, path, value, commit_time=None):
+    parts = path.split('.')
+    current = data
+    for part in parts[:-1]:
+        if not isinstance(current.get(part), dict):
+            current[part] = {}
+        current = current[part]
+    if value is transforms.DELETE_FIELD:
+        current.pop(parts[-1], None)
+    else:
+        current[parts[-1]] = _resolve(value, current.get(parts[-1]), commit_time)
+
+
+def _merge(target, updates, commit_time):
+    for key, value in updates.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value, commit_time)
+        elif value is transforms.DELETE_FIELD:
+            target.pop(key, None)
+        else:
+            target[key] = _resolve(value, target.get(key), commit_time)
+
+
+def _hashable(value):
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def _matches(data, field, op, value):
+    current = _get_path(data, field)
+    if current is _MISSING:
+        # Ca în Firestore, un document fără câmp nu corespunde niciunui filtru, nici `!=` sau `not-in`
+        return False
+    current = _comparable(current)
+    value = _comparable(value)
+    try:
+        if op == '==':
+            return current == value
+        if op == '!=':
+            return current != value and current is not None
+        if op in ('<', '<=', '>', '>='):
+            if _type_rank(current) != _type_rank(value):
+                return False
+            return {'<': current < value, '<=': current <= value,
+                    '>': current > value, '>=': current >= value}[op]
+        if op == 'in':
+            return current in value
+        if op == 'not-in':
+            return current not in value and current is not None
+        if op == 'array_contains':
+            return isinstance(current, list) and value in current
+        if op == 'array_contains_any':
+            return isinstance(current, list) and any(v in current for v in value)
+    except TypeError:
+        return False
+    raise ValueError(f'Unsupported operator: {op}')
+
+
+class MemoryDocumentSnapshot:
+    def __init__(self, reference, data, create_time=None, update_time=None):
+        self.reference = reference
+        self._data = data
+        self.create_time = create_time
+        self.update_time = update_time
+
+    @property
+    def id(self):
+        return self.reference.id
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field_path):
+        value = _get_path(self._data or {}, field_path)
+        if value is _MISSING:
+            raise KeyError(field_path)
+        return copy.deepcopy(value)
+
+
+class MemoryDocumentReference:
+    def __init__(self, client, collection_name, doc_id):
+        self._client = client
+        self._collection = collection_name
+        self.id = doc_id
+
+    @property
+    def path(self):
+        return f'{self._collection}/{self.id}'
+
+    @property
+    def parent(self):
+        return self._client.collection(self._collection)
+
+    def __eq__(self, other):
+        return isinstance(other, MemoryDocumentReference) and other.path == self.path
+
+    def __hash__(self):
+        return hash(self.path)
+
+    def _store(self):
+        return self._client._collections.setdefault(self._collection, {})
+
+    def get(self, field_paths=None, transaction=None):
+        self._client._latency()
+        return self._get(field_paths)
+
+    def _get(self, field_paths=None):
+        with self._client._lock:
+            entry = self._store().get(self.id)
+            if entry is None:
+                return MemoryDocumentSnapshot(self, None)
+            data = copy.deepcopy(entry['data'])
+            if field_paths is not None:
+                data = {k: v for k, v in data.items() if k in field_paths}
+            return MemoryDocumentSnapshot(self, data, entry['create_time'], entry['update_time'])
+
+    def _check_option(self, entry, option):
+        if option is None:
+            return
+        last_update_time = getattr(option, '_last_update_time', None)
+        exists = getattr(option, '_exists', None)
+        if last_update_time is not None and (entry is None or entry['update_time'] != last_update_time):
+            raise FailedPrecondition('Document was modified')
+        if exists is True and entry is None:
+            raise NotFound(f'No document to update: {self.path}')
+        if exists is False and entry is not None:
+            raise AlreadyExists(f'Document already exists: {self.path}')
+
+    def _write(self, data, merge=False, option=None, now=None):
+        store = self._store()
+        entry = store.get(self.id)
+        self._check_option(entry, option)
+        now = now or _next_update_time()
+        old_keys = self._client._index_keys(entry)
+        if entry is None or not merge:
+            new_data = {}
+            create_time = entry['create_time'] if entry else now
+        else:
+            new_data = entry['data']
+            create_time = entry['create_time']
+        _merge(new_data, data, now)
+        store[self.id] = {'data': new_data, 'create_time': create_time, 'update_time': now}
+        self._client._reindex(self._collection, self.id, old_keys, store[self.id])
+        return now
+
+    def _update(self, data, option=None, now=None):
+        store = self._store()
+        entry = store.get(self.id)
+        if entry is None:
+            raise NotFound(f'No document to update: {self.path}')
+        self._check_option(entry, option)
+        now = now or _next_update_time()
+        old_keys = self._client._index_keys(entry)
+        for path, value in data.items():
+            _apply_path(entry['data'], path, value, now)
+        entry['update_time'] = now
+        self._client._reindex(self._collection, self.id, old_keys, entry)
+        return now
+
+    def _create(self, data, now=None):
+        if self.id in self._store():
+            raise AlreadyExists(f'Document already exists: {self.path}')
+        return self._write(data, now=now)
+
+    def _delete(self, option=None, now=None):
+        entry = self._store().get(self.id)
+        self._check_option(entry, option)
+        old_keys = self._client._index_keys(entry)
+        self._store().pop(self.id, None)
+        self._client._reindex(self._collection, self.id, old_keys, None)
+        return now or _next_update_time()
+
+    def _restore(self, entry):
+        store = self._store()
+        old_keys = self._client._index_keys(store.get(self.id))
+        if entry is None:
+            store.pop(self.id, None)
+        else:
+            store[self.id] = entry
+        self._client._reindex(self._collection, self.id, old_keys, entry)
+
+    def set(self, document_data, merge=False):
+        self._client._latency()
+        with self._client._lock:
+            return _WriteResult(self._write(document_data, merge=merge))
+
+    def create(self, document_data):
+        self._client._latency()
+        with self._client._lock:
+            return _WriteResult(self._create(document_data))
+
+    def update(self, field_updates, option=None):
+        self._client._latency()
+        with self._client._lock:
+            return _WriteResult(self._update(field_updates, option=option))
+
+    def delete(self, option=None):
+        self._client._latency()
+        with self._client._lock:
+            return self._delete(option=option)
+
+    def collection(self, name):
+        return self._client.collection(f'{self.path}/{name}')
+
+
+class _WriteResult:
+    def __init__(self, update_time):
+        self.update_time = update_time
+
+
+class MemoryQuery:
+    def __init__(self, client, collection_name, filters=(), orders=(), limit=None,
+                 limit_to_last=False, offset=0, start=None, end=None, projection=None):
+        self._client = client
+        self._collection = collection_name
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._limit = limit
+        self._limit_to_last = limit_to_last
+        self._offset = offset
+        self._start = start
+        self._end = end
+        self._projection = projection
+
+    def _copy(self, **changes):
+        params = {
+            'filters': self._filters, 'orders': self._orders, 'limit': self._limit,
+            'limit_to_last': self._limit_to_last, 'offset': self._offset,
+            'start': self._start, 'end': self._end, 'projection': self._projection
+        }
+        params.update(changes)
+        return MemoryQuery(self._client, self._collection, **params)
+
+    def where(self, field_path=None, op_string=None, value=None, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path, direction=ASCENDING):
+        return self._copy(orders=self._orders + ((field_path, direction),))
+
+    def limit(self, count):
+        return self._copy(limit=count, limit_to_last=False)
+
+    def limit_to_last(self, count):
+        return self._copy(limit=count, limit_to_last=True)
+
+    def offset(self, num_to_skip):
+        return self._copy(offset=num_to_skip)
+
+    def select(self, field_paths):
+        return self._copy(projection=tuple(field_paths))
+
+    def start_after(self, document_fields_or_snapshot):
+        return self._copy(start=(document_fields_or_snapshot, False))
+
+    def start_at(self, document_fields_or_snapshot):
+        return self._copy(start=(document_fields_or_snapshot, True))
+
+    def end_before(self, document_fields_or_snapshot):
+        return self._copy(end=(document_fields_or_snapshot, False))
+
+    def end_at(self, document_fields_or_snapshot):
+        return self._copy(end=(document_fields_or_snapshot, True))
+
+    def _effective_orders(self):
+        orders = list(self._orders)
+        # Firestore adaugă implicit ordonarea după câmpurile cu inegalitate și după __name__
+        inequality = [f for f, op, _ in self._filters if op in ('<', '<=', '>', '>=', '!=', 'not-in')]
+        if inequality and not any(f == inequality[0] for f, _ in orders):
+            orders.insert(0, (inequality[0], ASCENDING))
+        if not any(f == '__name__' for f, _ in orders):
+            direction = orders[-1][1] if orders else ASCENDING
+            orders.append(('__name__', direction))
+        return orders
+
+    def _cursor_values(self, cursor, orders):
+        if isinstance(cursor, MemoryDocumentSnapshot):
+            data = cursor.to_dict() or {}
+            data['__name__'] = cursor.id
+            cursor = data
+        if isinstance(cursor, dict):
+            values = []
+            for field, _ in orders:
+                if field == '__name__' and field not in cursor:
+                    break
+                value = cursor.get(field, _MISSING) if field in cursor else _get_path(cursor, field)
+                if value is _MISSING:
+                    raise ValueError(f'Cursor is missing order field {field}')
+                values.append(value)
+            cursor = values
+        values = []
+        for value in cursor:
+            if isinstance(value, MemoryDocumentReference):
+                value = value.id
+            values.append(value)
+        return values
+
+    def _compare_to_cursor(self, row, cursor_values, orders):
+        for (field, direction), value in zip(orders, cursor_values):
+            current = row['__name__'] if field == '__name__' else _get_path(row['data'], field)
+            left, right = _sort_key(current), _sort_key(value)
+            if left == right:
+                continue
+            result = -1 if left < right else 1
+            return result if direction == ASCENDING else -result
+        return 0
+
+    def _rows(self):
+        with self._client._lock:
+            store = self._client._collections.get(self._collection, {})
+            candidates = self._client._candidates(self._collection, self._filters)
+            if candidates is None:
+                rows = [{'__name__': doc_id, 'data': entry['data'], 'entry': entry} for doc_id, entry in store.items()]
+            else:
+                rows = [{'__name__': doc_id, 'data': store[doc_id]['data'], 'entry': store[doc_id]}
+                        for doc_id in candidates if doc_id in store]
+            for field, op, value in self._filters:
+                rows = [row for row in rows if _matches(row['data'], field, op, value)]
+            orders = self._effective_orders()
+            for field, _ in orders:
+                if field != '__name__':
+                    rows = [row for row in rows if _get_path(row['data'], field) is not _MISSING]
+            for field, direction in reversed(orders):
+                rows.sort(
+                    key=lambda row: _sort_key(row['__name__'] if field == '__name__' else _get_path(row['data'], field)),
+                    reverse=direction == DESCENDING
+                )
+            if self._start is not None:
+                cursor, inclusive = self._start
+                values = self._cursor_values(cursor, orders)
+                rows = [row for row in rows
+                        if self._compare_to_cursor(row, values, orders) > (-1 if inclusive else 0)]
+            if self._end is not None:
+                cursor, inclusive = self._end
+                values = self._cursor_values(cursor, orders)
+                rows = [row for row in rows
+                        if self._compare_to_cursor(row, values, orders) < (1 if inclusive else 0)]
+            if self._offset:
+                rows = rows[self._offset:]
+            if self._limit is not None:
+                rows = rows[-self._limit:] if self._limit_to_last else rows[:self._limit]
+            # Se copiază doar documentele rămase după filtrare și limită
+            for row in rows:
+                row['data'] = copy.deepcopy(row['data'])
+                row['update_time'] = row['entry']['update_time']
+                row['create_time'] = row['entry']['create_time']
+        return rows
+
+    def stream(self, transaction=None):
+        self._client._latency()
+        yield from self._snapshots()
+
+    def _snapshots(self):
+        for row in self._rows():
+            data = row['data']
+            if self._projection is not None:
+                data = {}
+                for path in self._projection:
+                    value = _get_path(row['data'], path)
+                    if value is not _MISSING:
+                        _apply_path(data, path, value)
+            reference = MemoryDocumentReference(self._client, self._collection, row['__name__'])
+            yield MemoryDocumentSnapshot(reference, data, row['create_time'], row['update_time'])
+
+    def get(self, transaction=None):
+        return list(self.stream())
+
+
+class MemoryCollectionReference(MemoryQuery):
+    def __init__(self, client, name):
+        super().__init__(client, name)
+
+    @property
+    def id(self):
+        return self._collection.rsplit('/', 1)[-1]
+
+    def document(self, document_id=None):
+        return MemoryDocumentReference(self._client, self._collection, document_id or uuid.uuid4().hex[:20])
+
+    def add(self, document_data, document_id=None):
+        reference = self.document(document_id)
+        result = reference.create(document_data)
+        return result.update_time, reference
+
+    def list_documents(self):
+        with self._client._lock:
+            ids = list(self._client._collections.get(self._collection, {}))
+        return [self.document(doc_id) for doc_id in ids]
+
+
+class MemoryWriteBatch:
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def __len__(self):
+        return len(self._writes)
+
+    def set(self, reference, document_data, merge=False):
+        self._writes.append((reference, reference._write, (document_data,), {'merge': merge}))
+
+    def create(self, reference, document_data):
+        self._writes.append((reference, reference._create, (document_data,), {}))
+
+    def update(self, reference, field_updates, option=None):
+        self._writes.append((reference, reference._update, (field_updates,), {'option': option}))
+
+    def delete(self, reference, option=None):
+        self._writes.append((reference, reference._delete, (), {'option': option}))
+
+    def commit(self):
+        self._client._latency()
+        with self._client._lock:
+            # Scrierile dintr-un batch sunt atomice și au același moment de commit
+            now = _next_update_time()
+            undo = []
+            try:
+                for reference, write, args, kwargs in self._writes:
+                    entry = reference._store().get(reference.id)
+                    undo.append((reference, copy.deepcopy(entry)))
+                    write(*args, now=now, **kwargs)
+            except Exception:
+                for reference, entry in reversed(undo):
+                    reference._restore(entry)
+                raise
+        results = [_WriteResult(now) for _ in self._writes]
+        self._writes = []
+        return results
+
+
+class _WriteOption:
+    def __init__(self, last_update_time=None, exists=None):
+        self._last_update_time = last_update_time
+        self._exists = exists
+
+
+class MemoryClient:
+    """In-memory stand-in for the Firestore client, with the same query semantics.
+
+    Covers the subset of the API used by the app (queries, cursors, projections,
+    batches, transforms and write preconditions). Equality filters on
+    `indexed_fields` are served from an index instead of a collection scan.
+    """
+
+    def __init__(self, latency=0.0, indexed_fields=('userId',)):
+        self._collections = {}
+        self._indexes = {}
+        self._lock = threading.RLock()
+        self.latency = latency
+        self.indexed_fields = tuple(indexed_fields)
+
+    def _latency(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    async def _async_latency(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def _index_keys(self, entry):
+        if entry is None:
+            return ()
+        keys = []
+        for field in self.indexed_fields:
+            value = _get_path(entry['data'], field)
+            if isinstance(value, list):
+                # Fiecare element al unei liste e indexat separat, pentru array_contains(_any)
+                keys.extend(('contains', field, element) for element in dict.fromkeys(filter(_hashable, value)))
+            elif value is not _MISSING and _hashable(value):
+                keys.append((field, value))
+        return keys
+
+    def _reindex(self, collection, doc_id, old_keys, entry):
+        indexes = self._indexes.setdefault(collection, {})
+        new_keys = self._index_keys(entry)
+        for key in old_keys:
+            if key not in new_keys:
+                ids = indexes.get(key)
+                if ids is not None:
+                    ids.discard(doc_id)
+                    if not ids:
+                        del indexes[key]
+        for key in new_keys:
+            indexes.setdefault(key, set()).add(doc_id)
+
+    def _candidates(self, collection, filters):
+        # Filtrele pe câmpuri indexate restrâng documentele de verificat; se păstrează cel mai mic set
+        indexes = self._indexes.get(collection, {})
+        best = None
+        for field, op, value in filters:
+            if field not in self.indexed_fields:
+                continue
+            if op == '==' and _hashable(value):
+                ids = indexes.get((field, value), set())
+            elif op == 'array_contains' and _hashable(value):
+                ids = indexes.get(('contains', field, value), set())
+            elif op == 'array_contains_any' and all(_hashable(element) for element in value):
+                ids = set().union(*(indexes.get(('contains', field, element), ()) for element in value))
+            else:
+                continue
+            if best is None or len(ids) < len(best):
+                best = ids
+        return best
+
+    def collection(self, name):
+        return MemoryCollectionReference(self, name)
+
+    def document(self, path):
+        collection_name, doc_id = path.rsplit('/', 1)
+        return MemoryDocumentReference(self, collection_name, doc_id)
+
+    def batch(self):
+        return MemoryWriteBatch(self)
+
+    def get_all(self, references, field_paths=None, transaction=None):
+        self._latency()
+        for reference in references:
+            yield reference.get(field_paths=field_paths)
+
+    @staticmethod
+    def write_option(**kwargs):
+        return _WriteOption(**kwargs)
+
+    def reset(self):
+        with self._lock:
+            self._collections = {}
+            self._indexes = {}
+
+
+_QUERY_BUILDERS = frozenset((
+    'where', 'order_by', 'limit', 'limit_to_last', 'offset', 'select',
+    'start_at', 'start_after', 'end_at', 'end_before'
+))
+
+
+class AsyncMemoryQuery:
+    def __init__(self, query):
+        self._query = query
+
+    def __getattr__(self, name):
+        attr = getattr(self._query, name)
+        if name in _QUERY_BUILDERS:
+            return lambda *args, **kwargs: AsyncMemoryQuery(attr(*args, **kwargs))
+        return attr
+
+    async def stream(self, transaction=None):
+        await self._query._client._async_latency()
+        for snapshot in self._query._snapshots():
+            yield snapshot
+
+    async def get(self, transaction=None):
+        return [snapshot async for snapshot in self.stream()]
+
+
+class AsyncMemoryCollectionReference(AsyncMemoryQuery):
+    def document(self, document_id=None):
+        return AsyncMemoryDocumentReference(self._query.document(document_id))
+
+
+class AsyncMemoryDocumentReference:
+    def __init__(self, reference):
+        self._reference = reference
+
+    def __getattr__(self, name):
+        return getattr(self._reference, name)
+
+    async def get(self, field_paths=None, transaction=None):
+        await self._reference._client._async_latency()
+        return self._reference._get(field_paths)
+
+
+class AsyncMemoryClient:
+    """Read-only view of a MemoryClient with the `firestore.AsyncClient` query API.
+
+    It shares the wrapped client's documents, so the ASGI routes and the WSGI app
+    mounted next to them see the same data. Simulated latency is awaited, not slept.
+    """
+
+    def __init__(self, client):
+        self._client = client
+
+    def collection(self, name):
+        return AsyncMemoryCollectionReference(self._client.collection(name))
+
+    def document(self, path):
+        return AsyncMemoryDocumentReference(self._client.document(path))
+
+    async def get_all(self, references, field_paths=None, transaction=None):
+        await self._client._async_latency()
+        for reference in references:
+            yield reference._reference._get(field_paths)
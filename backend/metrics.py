@@ -0,0 +1,338 @@
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, request
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+OPERATIONS = ('reads', 'writes', 'round_trips')
+INFINITY_BUCKET = 'le="+Inf"'
+
+# Munca făcută în afara unei cereri (scheduler, reminder-e, coada de rapoarte)
+BACKGROUND = 'background'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_labels(self.label_names, labels)} {_number(value)}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for labels, (counts, total, count) in sorted(self._values.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    bucket = _labels(self.label_names, labels, f'le="{_number(bound)}"')
+                    lines.append(f'{self.name}_bucket{bucket} {bucket_count}')
+                lines.append(f'{self.name}_bucket{_labels(self.label_names, labels, INFINITY_BUCKET)} {count}')
+                lines.append(f'{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}')
+                lines.append(f'{self.name}_count{_labels(self.label_names, labels)} {count}')
+        return lines
+
+
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.operations = dict.fromkeys(OPERATIONS, 0)
+        self.spans = {}
+
+
+_current = contextvars.ContextVar('request_stats', default=None)
+
+
+class Metrics:
+    """Per-route latency histograms, data-store operation counts and timing spans.
+
+    Operations and spans recorded while a request is active are attributed to its
+    route; everything else is reported under the `background` route.
+    """
+
+    def __init__(self, slow_request_seconds=None):
+        self.slow_request_seconds = slow_request_seconds
+        self.requests = Histogram(
+            'momentum_request_duration_seconds', 'Request latency by route.', ('route', 'method', 'status'))
+        self.spans = Histogram(
+            'momentum_span_duration_seconds', 'Time spent in a span, summed per request.', ('route', 'span'))
+        self.operations = Counter(
+            'momentum_datastore_operations_total', 'Data-store reads, writes and round trips.', ('route', 'operation'))
+        self.operations_per_request = Histogram(
+            'momentum_datastore_operations_per_request', 'Data-store operations made by one request.',
+            ('route', 'operation'), buckets=COUNT_BUCKETS)
+        self.slow_requests = Counter(
+            'momentum_slow_requests_total', 'Requests slower than SLOW_REQUEST_MS.', ('route',))
+
+    def record(self, operation, amount=1):
+        stats = _current.get()
+        if stats is None:
+            self.operations.inc((BACKGROUND, operation), amount)
+        else:
+            stats.operations[operation] += amount
+
+    def add_time(self, name, seconds):
+        stats = _current.get()
+        if stats is None:
+            self.spans.observe((BACKGROUND, name), seconds)
+        else:
+            stats.spans[name] = stats.spans.get(name, 0.0) + seconds
+
+    @contextmanager
+    def span(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def begin(self):
+        stats = RequestStats()
+        return stats, _current.set(stats)
+
+    def finish(self, stats, token, route, method, status):
+        try:
+            _current.reset(token)
+        except ValueError:
+            # Răspunsurile în flux se pot închide dintr-un alt context decât cel al cererii
+            _current.set(None)
+        duration = time.perf_counter() - stats.started
+        self.requests.observe((route, method, str(status)), duration)
+        for name, seconds in stats.spans.items():
+            self.spans.observe((route, name), seconds)
+        for operation, amount in stats.operations.items():
+            self.operations.inc((route, operation), amount)
+            self.operations_per_request.observe((route, operation), amount)
+        if self.slow_request_seconds is not None and duration >= self.slow_request_seconds:
+            self.slow_requests.inc((route,))
+            spans = ', '.join(f'{name} {seconds * 1000:.1f} ms' for name, seconds in sorted(stats.spans.items()))
+            operations = ' '.join(f'{operation}={amount}' for operation, amount in stats.operations.items())
+            print(f"Slow request: {method} {route} {status} {duration * 1000:.1f} ms ({spans or 'no spans'}; {operations})")
+
+    def render(self):
+        lines = []
+        for metric in (self.requests, self.spans, self.operations, self.operations_per_request, self.slow_requests):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def instrument_client(self, client):
+        return InstrumentedClient(client, self)
+
+    def instrument_app(self, app, skip_endpoints=()):
+        metrics = self
+
+        class TimedJSONEncoder(app.json_encoder):
+            def encode(self, o):
+                with metrics.span('serialization'):
+                    return super().encode(o)
+
+        app.json_encoder = TimedJSONEncoder
+
+        @app.before_request
+        def begin_request_metrics():
+            if request.endpoint not in skip_endpoints:
+                g.request_metrics = metrics.begin()
+
+        @app.after_request
+        def finish_request_metrics(response):
+            pending = g.pop('request_metrics', None)
+            if pending is None:
+                return response
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            args = (*pending, route, request.method, response.status_code)
+            if response.is_streamed:
+                # Corpul se generează după after_request; măsurarea se încheie la închiderea răspunsului
+                response.call_on_close(lambda: metrics.finish(*args))
+            else:
+                metrics.finish(*args)
+            return response
+
+
+def _unwrap(value):
+    return value._target if isinstance(value, _Instrumented) else value
+
+
+class _Instrumented:
+    def __init__(self, target, metrics):
+        self._target = target
+        self._metrics = metrics
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+    def _timed_stream(self, snapshots, span):
+        metrics = self._metrics
+        metrics.record('round_trips')
+        iterator = iter(snapshots)
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    snapshot = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    metrics.add_time(span, time.perf_counter() - started)
+                metrics.record('reads')
+                yield snapshot
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+
+    def _timed_write(self, method, *args, **kwargs):
+        self._metrics.record('round_trips')
+        self._metrics.record('writes')
+        with self._metrics.span('datastore_write'):
+            return method(*args, **kwargs)
+
+
+_QUERY_METHODS = frozenset((
+    'where', 'order_by', 'limit', 'limit_to_last', 'offset', 'select',
+    'start_at', 'start_after', 'end_at', 'end_before'
+))
+
+
+class InstrumentedQuery(_Instrumented):
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if name in _QUERY_METHODS:
+            return lambda *args, **kwargs: InstrumentedQuery(attr(*args, **kwargs), self._metrics)
+        return attr
+
+    def stream(self, *args, **kwargs):
+        return self._timed_stream(self._target.stream(*args, **kwargs), 'datastore_stream')
+
+    def get(self, *args, **kwargs):
+        return list(self.stream(*args, **kwargs))
+
+
+class InstrumentedCollection(InstrumentedQuery):
+    def document(self, *args, **kwargs):
+        return InstrumentedDocument(self._target.document(*args, **kwargs), self._metrics)
+
+    def add(self, *args, **kwargs):
+        return self._timed_write(self._target.add, *args, **kwargs)
+
+
+class InstrumentedDocument(_Instrumented):
+    def get(self, *args, **kwargs):
+        self._metrics.record('round_trips')
+        self._metrics.record('reads')
+        with self._metrics.span('datastore_get'):
+            return self._target.get(*args, **kwargs)
+
+    def set(self, *args, **kwargs):
+        return self._timed_write(self._target.set, *args, **kwargs)
+
+    def create(self, *args, **kwargs):
+        return self._timed_write(self._target.create, *args, **kwargs)
+
+    def update(self, *args, **kwargs):
+        return self._timed_write(self._target.update, *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self._timed_write(self._target.delete, *args, **kwargs)
+
+    def collection(self, *args, **kwargs):
+        return InstrumentedCollection(self._target.collection(*args, **kwargs), self._metrics)
+
+
+class InstrumentedBatch(_Instrumented):
+    def __init__(self, target, metrics):
+        super().__init__(target, metrics)
+        self._writes = 0
+
+    def _stage(self, method, reference, *args, **kwargs):
+        self._writes += 1
+        return method(_unwrap(reference), *args, **kwargs)
+
+    def set(self, reference, *args, **kwargs):
+        return self._stage(self._target.set, reference, *args, **kwargs)
+
+    def create(self, reference, *args, **kwargs):
+        return self._stage(self._target.create, reference, *args, **kwargs)
+
+    def update(self, reference, *args, **kwargs):
+        return self._stage(self._target.update, reference, *args, **kwargs)
+
+    def delete(self, reference, *args, **kwargs):
+        return self._stage(self._target.delete, reference, *args, **kwargs)
+
+    def commit(self, *args, **kwargs):
+        self._metrics.record('round_trips')
+        self._metrics.record('writes', self._writes)
+        with self._metrics.span('datastore_write'):
+            return self._target.commit(*args, **kwargs)
+
+
+class InstrumentedClient(_Instrumented):
+    """Data-store client wrapper that counts reads, writes and round trips."""
+
+    def collection(self, *args, **kwargs):
+        return InstrumentedCollection(self._target.collection(*args, **kwargs), self._metrics)
+
+    def document(self, *args, **kwargs):
+        return InstrumentedDocument(self._target.document(*args, **kwargs), self._metrics)
+
+    def batch(self, *args, **kwargs):
+        return InstrumentedBatch(self._target.batch(*args, **kwargs), self._metrics)
+
+    def get_all(self, references, *args, **kwargs):
+        references = [_unwrap(reference) for reference in references]
+        return self._timed_stream(self._target.get_all(references, *args, **kwargs), 'datastore_get')
+
+
+def create_metrics():
+    slow_ms = os.getenv('SLOW_REQUEST_MS')
+    return Metrics(slow_request_seconds=float(slow_ms) / 1000 if slow_ms else None)
@@ -0,0 +1,147 @@
+import base64
+import json
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+class InvalidPageRequest(ValueError):
+    pass
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'$dt': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and '$dt' in value:
+        return datetime.fromisoformat(value['$dt'])
+    return value
+
+
+def encode_cursor(order_value, doc_id):
+    payload = json.dumps([_encode_value(order_value), doc_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        order_value, doc_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return _decode_value(order_value), doc_id
+    except (ValueError, TypeError) as e:
+        raise InvalidPageRequest('Invalid cursor') from e
+
+
+def encode_watermark(moment):
+    payload = json.dumps(_encode_value(moment))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_watermark(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        moment = _decode_value(json.loads(base64.urlsafe_b64decode(padded.encode('ascii'))))
+    except (ValueError, TypeError) as e:
+        raise InvalidPageRequest('Invalid sync token') from e
+    if not isinstance(moment, datetime):
+        raise InvalidPageRequest('Invalid sync token')
+    return moment
+
+
+def parse_limit(value):
+    # Fără `limit` se păstrează comportamentul vechi: toate documentele
+    if value is None or value == '':
+        return None
+    try:
+        limit = int(value)
+    except ValueError as e:
+        raise InvalidPageRequest('limit must be an integer') from e
+    if limit < 1:
+        raise InvalidPageRequest('limit must be positive')
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def parse_fields(value):
+    if not value:
+        return None
+    return [field.strip() for field in value.split(',') if field.strip()]
+
+
+def ordered_query(query, order_field, direction, cursor=None, fields=None):
+    query = query.order_by(order_field, direction=direction).order_by('__name__', direction=direction)
+    if fields is not None:
+        # Câmpul de ordonare e necesar pentru cursor, chiar dacă nu a fost cerut
+        selected = [field for field in fields if field != 'id']
+        if order_field not in selected:
+            selected.append(order_field)
+        query = query.select(selected)
+    if cursor:
+        order_value, doc_id = decode_cursor(cursor)
+        query = query.start_after({order_field: order_value, '__name__': doc_id})
+    return query
+
+
+def snapshot_to_dict(snapshot, fields=None, order_field=None):
+    data = snapshot.to_dict()
+    if fields is not None and order_field not in fields:
+        data.pop(order_field, None)
+    data['id'] = snapshot.id
+    return data
+
+
+def iter_documents(query, order_field, fields=None):
+    for snapshot in query.stream():
+        yield snapshot_to_dict(snapshot, fields, order_field)
+
+
+async def iter_documents_async(query, order_field, fields=None):
+    async for snapshot in query.stream():
+        yield snapshot_to_dict(snapshot, fields, order_field)
+
+
+def paginate(query, order_field, direction, limit=None, cursor=None, fields=None):
+    query = ordered_query(query, order_field, direction, cursor=cursor, fields=fields)
+    if limit is not None:
+        # Se citește un document în plus pentru a ști dacă există o pagină următoare
+        query = query.limit(limit + 1)
+
+    items = []
+    last_snapshot = None
+    has_more = False
+    for snapshot in query.stream():
+        if limit is not None and len(items) == limit:
+            has_more = True
+            break
+        items.append(snapshot_to_dict(snapshot, fields, order_field))
+        last_snapshot = snapshot
+
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor(last_snapshot.get(order_field), last_snapshot.id)
+    return items, next_cursor
+
+
+async def paginate_async(query, order_field, direction, limit=None, cursor=None, fields=None):
+    # Aceeași paginare ca `paginate`, peste iteratorul clientului Firestore asincron
+    query = ordered_query(query, order_field, direction, cursor=cursor, fields=fields)
+    if limit is not None:
+        query = query.limit(limit + 1)
+
+    items = []
+    last_snapshot = None
+    has_more = False
+    async for snapshot in query.stream():
+        if limit is not None and len(items) == limit:
+            has_more = True
+            break
+        items.append(snapshot_to_dict(snapshot, fields, order_field))
+        last_snapshot = snapshot
+
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor(last_snapshot.get(order_field), last_snapshot.id)
+    return items, next_cursor
@@ -0,0 +1,194 @@
+import asyncio
+import itertools
+import json
+import os
+import queue
+import threading
+from collections import defaultdict
+
+try:
+    import redis
+except ImportError:  # backend-ul Redis este opțional
+    redis = None
+
+HEARTBEAT_SECONDS = 15
+
+
+def format_sse(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, separators=(",", ":"), default=str)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+class Subscription:
+    def __init__(self, user_id, queue_size):
+        self.user_id = user_id
+        self.messages = queue.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def offer(self, message):
+        try:
+            self.messages.put_nowait(message)
+        except queue.Full:
+            # Clientul nu mai ține pasul: conexiunea se închide, iar la reconectare face sync
+            self.close()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            try:
+                self.messages.put_nowait(None)
+            except queue.Full:
+                pass
+
+    def stream(self, heartbeat=HEARTBEAT_SECONDS):
+        while not self.closed:
+            try:
+                message = self.messages.get(timeout=heartbeat)
+            except queue.Empty:
+                # Comentariul SSE ține conexiunea deschisă și detectează clienții plecați
+                yield ': keep-alive\n\n'
+                continue
+            if message is None:
+                break
+            yield message
+
+
+class AsyncSubscription(Subscription):
+    """Subscription read from an asyncio event loop; messages may be offered from any thread."""
+
+    def __init__(self, user_id, queue_size, loop):
+        self.user_id = user_id
+        self.queue_size = queue_size
+        self.loop = loop
+        self.messages = asyncio.Queue()
+        self.closed = False
+
+    def _put(self, message):
+        try:
+            self.loop.call_soon_threadsafe(self.messages.put_nowait, message)
+        except RuntimeError:
+            # Bucla s-a oprit deja; conexiunea nu mai există
+            self.closed = True
+
+    def offer(self, message):
+        if self.messages.qsize() >= self.queue_size:
+            self.close()
+        else:
+            self._put(message)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._put(None)
+
+    async def stream(self, heartbeat=HEARTBEAT_SECONDS):
+        while not self.closed:
+            try:
+                message = await asyncio.wait_for(self.messages.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            if message is None:
+                break
+            yield message
+
+
+class PushHub:
+    """Fan-out of change events to the open streams of each user in this process.
+
+    With a broker, `publish` goes through it and every process delivers the messages
+    it receives to its own subscribers, so a write reaches the user on any worker.
+    """
+
+    def __init__(self, broker=None, queue_size=100):
+        self.broker = broker
+        self.queue_size = queue_size
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.published = 0
+        self.dropped = 0
+        if broker is not None:
+            broker.listen(self.deliver)
+
+    def subscribe(self, user_id, loop=None):
+        # Cu `loop`, abonamentul e citit cu `async for` din bucla respectivă (modul ASGI)
+        if loop is None:
+            subscription = Subscription(user_id, self.queue_size)
+        else:
+            subscription = AsyncSubscription(user_id, self.queue_size, loop)
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscription.close()
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def publish(self, user_id, event, data):
+        self.published += 1
+        if self.broker is not None:
+            self.broker.publish(user_id, event, data)
+        else:
+            self.deliver(user_id, event, data)
+
+    def deliver(self, user_id, event, data):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        if not subscriptions:
+            return
+        message = format_sse(event, data, next(self._ids))
+        for subscription in subscriptions:
+            subscription.offer(message)
+            if subscription.closed:
+                self.dropped += 1
+                self.unsubscribe(subscription)
+
+    def stats(self):
+        with self._lock:
+            connections = sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+            users = len(self._subscriptions)
+        return {
+            'connections': connections,
+            'users': users,
+            'published': self.published,
+            'dropped': self.dropped
+        }
+
+
+class RedisPushBroker:
+    def __init__(self, url, channel='momentum:push'):
+        if redis is None:
+            raise RuntimeError('The redis package is required for the Redis push broker')
+        self._client = redis.Redis.from_url(url)
+        self.channel = channel
+
+    def publish(self, user_id, event, data):
+        message = json.dumps({'userId': user_id, 'event': event, 'data': data}, default=str)
+        self._client.publish(self.channel, message)
+
+    def listen(self, deliver):
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+
+        def handle(message):
+            payload = json.loads(message['data'])
+            deliver(payload['userId'], payload['event'], payload['data'])
+
+        pubsub.subscribe(**{self.channel: handle})
+        pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+
+def create_push_hub():
+    broker = None
+    if os.getenv('PUSH_BACKEND') == 'redis':
+        broker = RedisPushBroker(os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+    return PushHub(broker, queue_size=int(os.getenv('PUSH_QUEUE_SIZE', 100)))
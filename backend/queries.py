@@ -0,0 +1,94 @@
+from google.cloud.firestore import Query
+
+from calendar_index import INDEX_FIELD as EVENT_INDEX_FIELD, expand_event, first_group, occurrences, query_buckets
+from pagination import ordered_query, parse_fields, parse_limit
+from reminders import parse_datetime
+
+# Ordinea listelor; Firestore omite din rezultate documentele în care câmpul lipsește cu totul
+LIST_ORDER = {
+    'tasks': ('dueDate', Query.DESCENDING),
+    'events': ('startDate', Query.ASCENDING),
+    'notes': ('createdAt', Query.DESCENDING)
+}
+
+
+class ListRequest:
+    """Query parameters of a list route, shared by the Flask routes and the ASGI handlers in `asgi.py`."""
+
+    def __init__(self, datastore, collection, user_id, args):
+        self.order_field, self.direction = LIST_ORDER[collection]
+        self.query = datastore.repository(collection).for_user(user_id)
+        self.limit = parse_limit(args.get('limit'))
+        self.fields = parse_fields(args.get('fields'))
+        self.cursor = args.get('cursor')
+
+    def stream_query(self):
+        # NDJSON: documentele sunt trimise pe măsură ce sunt citite, fără o pagină în plus
+        query = ordered_query(self.query, self.order_field, self.direction, cursor=self.cursor, fields=self.fields)
+        if self.limit is not None:
+            query = query.limit(self.limit)
+        return query
+
+    def page_args(self):
+        # Argumentele pentru `paginate` și `paginate_async`
+        return (self.query, self.order_field, self.direction), {
+            'limit': self.limit,
+            'cursor': self.cursor,
+            'fields': self.fields
+        }
+
+    def response(self, documents, next_cursor):
+        response = {
+            'status': 'success',
+            'data': documents
+        }
+        if self.limit is not None:
+            response['nextCursor'] = next_cursor
+        return response
+
+
+def indexed_event_queries(datastore, user_id, window_start, window_end):
+    # Doar evenimentele din lunile ferestrei, plus seriile recurente și evenimentele foarte lungi.
+    # Un eveniment poate apărea în mai multe grupuri; e păstrat doar în primul.
+    groups = query_buckets(window_start, window_end)
+    return [
+        (datastore.events.for_user(user_id).where(EVENT_INDEX_FIELD, 'array_contains_any', buckets),
+         lambda event_data, position=position: first_group(event_data, groups, position))
+        for position, buckets in enumerate(groups)
+    ]
+
+
+def expand_events(events, window_start, window_end):
+    found = []
+    for event_id, event_data in events:
+        found.extend(expand_event(event_id, event_data, window_start, window_end))
+    found.sort(key=lambda occurrence: occurrence[0])
+    return [event for _, event in found]
+
+
+def export_query(datastore, collection, user_id):
+    # Câmpul de ordonare e și cel după care se aplică fereastra from/to
+    order_field, direction = LIST_ORDER[collection]
+    return ordered_query(datastore.repository(collection).for_user(user_id), order_field, direction), order_field
+
+
+def export_event(event_id, event_data, window):
+    # Seriile recurente intră în export dacă au cel puțin o apariție în fereastră
+    if not occurrences(event_data, *window, limit=1):
+        return None
+    event_data.pop(EVENT_INDEX_FIELD, None)
+    return {**event_data, 'id': event_id}
+
+
+def export_document(document, order_field, window):
+    if not in_export_window(document.get(order_field), window):
+        return None
+    document.pop(EVENT_INDEX_FIELD, None)
+    return document
+
+
+def in_export_window(value, window):
+    if window is None:
+        return True
+    moment = parse_datetime(value)
+    return moment is not None and window[0] <= moment < window[1]
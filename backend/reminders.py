@@ -0,0 +1,209 @@
+import heapq
+import itertools
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+# Momentele de notificare pentru evenimente și task-uri: (secunde înainte de start sau termen, canale permise)
+EVENT_LEAD_TIMES = (
+    (3600, ('email', 'push')),
+    (600, ('push',))
+)
+
+DEFAULT_TIMEZONE = ZoneInfo(os.getenv('REMINDER_TIMEZONE', 'Europe/Bucharest'))
+
+
+def parse_datetime(value, tz=DEFAULT_TIMEZONE):
+    # Datele din `datetime-local` nu au fus orar: sunt interpretate în fusul aplicației
+    if isinstance(value, datetime):
+        moment = value
+    elif isinstance(value, str) and value:
+        try:
+            moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    else:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=tz)
+    return moment.astimezone(timezone.utc)
+
+
+def lead_time_reminders(source, source_id, document, start):
+    notifications = document.get('notifications') or {}
+    if start is None:
+        return []
+    reminders = []
+    for lead, allowed in EVENT_LEAD_TIMES:
+        channels = [channel for channel in allowed if notifications.get(channel)]
+        if channels:
+            reminders.append({
+                'key': f"{source}_{source_id}_{lead}_{int(start.timestamp())}",
+                'dueAt': start - timedelta(seconds=lead),
+                'userId': document.get('userId'),
+                'source': source,
+                'sourceId': source_id,
+                'title': document.get('title', ''),
+                'description': document.get('description', ''),
+                'startsAt': start,
+                'leadSeconds': lead,
+                'channels': channels
+            })
+    return reminders
+
+
+def event_reminders(event_id, event):
+    return lead_time_reminders('events', event_id, event, parse_datetime(event.get('startDate')))
+
+
+def task_reminders(task_id, task):
+    # Aceleași momente ca la evenimente, față de termenul limită; task-urile finalizate nu mai au reminder-e
+    if task.get('completed', False):
+        return []
+    return lead_time_reminders('tasks', task_id, task, parse_datetime(task.get('dueDate')))
+
+
+def reminder_reminders(reminder_id, reminder):
+    due = parse_datetime(reminder.get('reminderDate'))
+    if due is None or reminder.get('status', 'active') != 'active':
+        return []
+    return [{
+        'key': f"reminders_{reminder_id}_{int(due.timestamp())}",
+        'dueAt': due,
+        'userId': reminder.get('userId'),
+        'source': 'reminders',
+        'sourceId': reminder_id,
+        'title': reminder.get('title', ''),
+        'description': reminder.get('description', ''),
+        'startsAt': due,
+        'leadSeconds': 0,
+        'channels': ['push']
+    }]
+
+
+class ReminderEngine:
+    """Time-ordered index of upcoming reminders; each one is dispatched once when it falls due.
+
+    `dispatch(reminder)` must return False when the reminder was already delivered
+    (for example by another worker), which is how delivery stays exactly-once.
+    `loader(engine)` is called every `refill_interval` to pull reminders entering the horizon.
+    """
+
+    def __init__(self, dispatch, loader=None, horizon=timedelta(hours=48), grace=timedelta(minutes=5),
+                 refill_interval=timedelta(hours=1)):
+        self.dispatch = dispatch
+        self.loader = loader
+        self.horizon = horizon
+        self.grace = grace
+        self.refill_interval = refill_interval
+        self._next_refill = None
+        self._heap = []
+        self._by_source = {}
+        self._live = {}
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        self.fired = 0
+        self.skipped = 0
+
+    def _within_horizon(self, reminder, now):
+        return now - self.grace <= reminder['dueAt'] <= now + self.horizon
+
+    def schedule(self, source, source_id, reminders, now=None):
+        now = now or datetime.now(timezone.utc)
+        with self._condition:
+            # Versiunile vechi rămân în heap, dar sunt ignorate la scoatere
+            for key in self._by_source.pop((source, source_id), ()):
+                self._live.pop(key, None)
+            keys = []
+            for reminder in reminders:
+                if not reminder.get('userId') or not self._within_horizon(reminder, now):
+                    continue
+                sequence = next(self._counter)
+                heapq.heappush(self._heap, (reminder['dueAt'], sequence, reminder))
+                self._live[reminder['key']] = sequence
+                keys.append(reminder['key'])
+            if keys:
+                self._by_source[(source, source_id)] = keys
+            self._condition.notify()
+
+    def cancel(self, source, source_id):
+        self.schedule(source, source_id, [])
+
+    def schedule_event(self, event_id, event):
+        self.schedule('events', event_id, event_reminders(event_id, event))
+
+    def schedule_task(self, task_id, task):
+        self.schedule('tasks', task_id, task_reminders(task_id, task))
+
+    def schedule_reminder(self, reminder_id, reminder):
+        self.schedule('reminders', reminder_id, reminder_reminders(reminder_id, reminder))
+
+    def __len__(self):
+        return len(self._live)
+
+    def pop_due(self, now=None):
+        now = now or datetime.now(timezone.utc)
+        due = []
+        with self._condition:
+            while self._heap and self._heap[0][0] <= now:
+                _, sequence, reminder = heapq.heappop(self._heap)
+                if self._live.get(reminder['key']) != sequence:
+                    continue
+                del self._live[reminder['key']]
+                keys = self._by_source.get((reminder['source'], reminder['sourceId']), [])
+                if reminder['key'] in keys:
+                    keys.remove(reminder['key'])
+                due.append(reminder)
+        return due
+
+    def run_pending(self, now=None):
+        for reminder in self.pop_due(now):
+            try:
+                if self.dispatch(reminder):
+                    self.fired += 1
+                else:
+                    self.skipped += 1
+            except Exception as e:
+                print(f"Error dispatching reminder {reminder['key']}: {str(e)}")
+
+    def refill(self):
+        # Încarcă periodic reminder-urile care intră în orizont (și pe cele scrise de alte procese)
+        self._next_refill = datetime.now(timezone.utc) + self.refill_interval
+        if self.loader is not None:
+            try:
+                self.loader(self)
+            except Exception as e:
+                print(f"Error loading reminders: {str(e)}")
+
+    def _loop(self):
+        while True:
+            if self._next_refill is None or datetime.now(timezone.utc) >= self._next_refill:
+                self.refill()
+            with self._condition:
+                if self._stopped:
+                    return
+                timeout = 60
+                if self._heap:
+                    timeout = max(0, min(timeout, (self._heap[0][0] - datetime.now(timezone.utc)).total_seconds()))
+                self._condition.wait(timeout)
+            self.run_pending()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name='reminders', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+    def stats(self):
+        return {
+            'pending': len(self._live),
+            'fired': self.fired,
+            'skipped': self.skipped
+        }
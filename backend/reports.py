@@ -0,0 +1,314 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+
+from google.api_core.exceptions import NotFound
+
+from cache import TTLCache
+
+
+def report_hash(report_data):
+    payload = json.dumps(report_data, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def build_report_templates():
+    styles = getSampleStyleSheet()
+    table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 14),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 12),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+    return MappingProxyType({
+        'title': styles['Heading1'],
+        'heading': styles['Heading2'],
+        'normal': styles['Normal'],
+        'table': table_style,
+        'table_col_widths': (4*inch, 2*inch)
+    })
+
+
+# Stilurile sunt construite o singură dată și doar citite la randare,
+# deci pot fi folosite în paralel de toate thread-urile din coadă
+REPORT_TEMPLATES = build_report_templates()
+
+
+def build_report_pdf(report_data, templates=REPORT_TEMPLATES):
+    # Create a buffer for the PDF
+    buffer = BytesIO()
+    
+    # Create the PDF document
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        rightMargin=72,
+        leftMargin=72,
+        topMargin=72,
+        bottomMargin=72
+    )
+
+    # Get styles
+    title_style = templates['title']
+    heading_style = templates['heading']
+    normal_style = templates['normal']
+
+    # Create the story (content) for the PDF
+    story = []
+
+    # Add title
+    story.append(Paragraph('Analytics Report', title_style))
+    story.append(Spacer(1, 12))
+    story.append(Paragraph(f'Generated on: {report_data["generatedAt"]}', normal_style))
+    story.append(Spacer(1, 24))
+
+    # Add Statistics Section
+    story.append(Paragraph('Statistics Overview', heading_style))
+    story.append(Spacer(1, 12))
+
+    # Create statistics table data
+    stats_data = [
+        ['Metric', 'Value'],
+        ['Total Tasks', str(report_data['stats']['totalTasks'])],
+        ['Completed Tasks', str(report_data['stats']['completedTasks'])],
+        ['Pending Tasks', str(report_data['stats']['pendingTasks'])],
+        ['Productivity Score', f"{report_data['stats']['productivityScore']}%"],
+        ['Current Month Events', str(report_data['stats']['monthTotalEvents'])],
+        ['Past Events', str(report_data['stats']['monthPastEvents'])]
+    ]
+
+    # Create and style the statistics table
+    stats_table = Table(stats_data, colWidths=templates['table_col_widths'])
+    stats_table.setStyle(templates['table'])
+    story.append(stats_table)
+    story.append(Spacer(1, 24))
+
+    # Add Progress Data Section
+    if report_data['progressData']:
+        story.append(Paragraph('Task Completion Progress', heading_style))
+        story.append(Spacer(1, 12))
+        
+        progress_data = [['Date', 'Completion Rate']]
+        for item in report_data['progressData']:
+            progress_data.append([item['label'], f"{item['value']}%"])
+
+        progress_table = Table(progress_data, colWidths=templates['table_col_widths'])
+        progress_table.setStyle(templates['table'])
+        story.append(progress_table)
+        story.append(Spacer(1, 24))
+
+    # Add Recent Activity Section
+    if report_data['recentActivity']:
+        story.append(Paragraph('Recent Activity', heading_style))
+        story.append(Spacer(1, 12))
+        
+        for activity in report_data['recentActivity']:
+            activity_text = f"{activity['description']} - {activity['time']}"
+            story.append(Paragraph(activity_text, normal_style))
+            story.append(Spacer(1, 6))
+
+    # Build the PDF document
+    doc.build(story)
+
+    return buffer.getvalue()
+
+
+def timed_build_report_pdf(report_data):
+    # Durata e măsurată în worker, fără așteptarea în coadă; funcție de modul, ca să meargă și în procese
+    started = time.perf_counter()
+    pdf = build_report_pdf(report_data)
+    return pdf, time.perf_counter() - started
+
+
+# PDF-urile sunt împărțite în bucăți sub limita de 1 MiB a unui document Firestore
+REPORT_CHUNK_BYTES = 900 * 1024
+
+
+class ReportJobQueue:
+    """Renders reports in a worker pool and stores jobs and finished PDFs in Firestore, keyed by content hash."""
+
+    def __init__(self, db, max_workers=2, use_processes=False, cache_size=128, job_ttl=3600, render_timeout=300,
+                 jobs_collection='report_jobs', files_collection='report_files', metrics=None):
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self._executor = executor_class(max_workers=max_workers)
+        self.db = db
+        self.jobs_collection = jobs_collection
+        self.files_collection = files_collection
+        # Copie locală a PDF-urilor citite din Firestore; conținutul unui hash nu se schimbă
+        self._results = TTLCache(maxsize=cache_size)
+        # Randările pornite de acest proces: hash -> (future, id-urile job-urilor care îl așteaptă)
+        self._in_flight = {}
+        # RLock: add_done_callback rulează imediat dacă future-ul e deja gata
+        self._lock = threading.RLock()
+        self.job_ttl = job_ttl
+        self.render_timeout = render_timeout
+        self.metrics = metrics
+
+    def _job_ref(self, job_id):
+        return self.db.collection(self.jobs_collection).document(job_id)
+
+    def _file_ref(self, content_hash):
+        return self.db.collection(self.files_collection).document(content_hash)
+
+    def _expires_at(self):
+        # Câmp pentru politica TTL din Firestore, care șterge job-urile și fișierele vechi
+        return datetime.now(timezone.utc) + timedelta(seconds=self.job_ttl)
+
+    def _file_ready(self, content_hash):
+        if self._results.get(content_hash) is not None:
+            return True
+        snapshot = self._file_ref(content_hash).get(field_paths=['expiresAt'])
+        return snapshot.exists and snapshot.get('expiresAt') > datetime.now(timezone.utc)
+
+    def _extend(self, content_hash, expires_at):
+        # False dacă politica TTL a șters deja fișierul; raportul trebuie randat din nou
+        try:
+            self._file_ref(content_hash).update({'expiresAt': expires_at})
+        except NotFound:
+            self._results.pop(content_hash)
+            return False
+        pdf = self._results.get(content_hash)
+        if pdf is not None:
+            self._results.set(content_hash, pdf, expires_at=expires_at.timestamp())
+        return True
+
+    def submit(self, user_id, report_data):
+        content_hash = report_hash(report_data)
+        job = {
+            'id': uuid.uuid4().hex,
+            'userId': user_id,
+            'hash': content_hash,
+            'status': 'queued',
+            'createdAt': time.time(),
+            'finishedAt': None,
+            'error': None,
+            'expiresAt': self._expires_at()
+        }
+        if self._file_ready(content_hash) and self._extend(content_hash, job['expiresAt']):
+            # Același conținut a fost deja generat, de oricare worker: nu se mai randează
+            job['status'] = 'done'
+            job['finishedAt'] = job['createdAt']
+            self._job_ref(job['id']).set(job)
+            return job
+
+        self._job_ref(job['id']).set(job)
+        with self._lock:
+            pending = self._in_flight.get(content_hash)
+            if pending is None:
+                future = self._executor.submit(timed_build_report_pdf, report_data)
+                pending = self._in_flight[content_hash] = (future, [])
+                pending[1].append(job['id'])
+                future.add_done_callback(lambda f, h=content_hash: self._finish(h, f))
+            else:
+                pending[1].append(job['id'])
+        return job
+
+    def _finish(self, content_hash, future):
+        error = future.exception()
+        if error is None:
+            try:
+                pdf, seconds = future.result()
+                if self.metrics is not None:
+                    # Callback-ul rulează în afara cererii, deci timpul apare sub ruta `background`
+                    self.metrics.add_time('pdf', seconds)
+                self._store(content_hash, pdf)
+            except Exception as e:
+                error = e
+        # Scos din lucru abia după salvare, ca o cerere identică să găsească fișierul
+        with self._lock:
+            _, job_ids = self._in_flight.pop(content_hash)
+        update = {
+            'status': 'failed' if error else 'done',
+            'error': str(error) if error else None,
+            'finishedAt': time.time()
+        }
+        for job_id in job_ids:
+            try:
+                self._job_ref(job_id).update(update)
+            except Exception as e:
+                print(f"Error updating report job {job_id}: {str(e)}")
+
+    def _store(self, content_hash, pdf):
+        chunks = [pdf[offset:offset + REPORT_CHUNK_BYTES] for offset in range(0, len(pdf), REPORT_CHUNK_BYTES)]
+        file_ref = self._file_ref(content_hash)
+        for index, chunk in enumerate(chunks):
+            file_ref.collection('chunks').document(str(index)).set({'data': chunk})
+        # Antetul e scris ultimul, deci un fișier cu antet este complet
+        expires_at = self._expires_at()
+        file_ref.set({'size': len(pdf), 'chunks': len(chunks), 'expiresAt': expires_at})
+        # Copia locală expiră odată cu fișierul din Firestore
+        self._results.set(content_hash, pdf, expires_at=expires_at.timestamp())
+
+    def get(self, job_id):
+        snapshot = self._job_ref(job_id).get()
+        if not snapshot.exists:
+            return None
+        job = snapshot.to_dict()
+        if job['createdAt'] + self.job_ttl < time.time():
+            return None
+        if job['status'] in ('queued', 'running'):
+            with self._lock:
+                pending = self._in_flight.get(job['hash'])
+            if pending is not None:
+                if pending[0].running():
+                    job['status'] = 'running'
+            elif job['createdAt'] + self.render_timeout < time.time():
+                # Worker-ul care randa raportul s-a oprit înainte să-l salveze
+                job['status'] = 'failed'
+                job['error'] = 'Report rendering was interrupted, please generate it again'
+        return job
+
+    def result(self, job):
+        pdf = self._results.get(job['hash'])
+        if pdf is not None:
+            return pdf
+        file_ref = self._file_ref(job['hash'])
+        header = file_ref.get()
+        if not header.exists or header.get('expiresAt') <= datetime.now(timezone.utc):
+            return None
+        chunks = {chunk.id: chunk.get('data') for chunk in file_ref.collection('chunks').stream()}
+        try:
+            pdf = b''.join(chunks[str(index)] for index in range(header.get('chunks')))
+        except KeyError:
+            return None
+        self._results.set(job['hash'], pdf, expires_at=header.get('expiresAt').timestamp())
+        return pdf
+
+    def render(self, user_id, report_data, timeout=None):
+        job = self.submit(user_id, report_data)
+        with self._lock:
+            pending = self._in_flight.get(job['hash'])
+        if pending is not None:
+            pending[0].result(timeout=timeout)
+        return self.result(job)
+
+
+def create_report_queue(db, metrics=None):
+    return ReportJobQueue(
+        db,
+        metrics=metrics,
+        max_workers=int(os.getenv('REPORT_WORKERS', 2)),
+        use_processes=os.getenv('REPORT_EXECUTOR') == 'process',
+        cache_size=int(os.getenv('REPORT_CACHE_SIZE', 128)),
+        job_ttl=int(os.getenv('REPORT_JOB_TTL', 3600))
+    )
@@ -0,0 +1,122 @@
+import hashlib
+import os
+import threading
+import time
+
+from cache import TTLCache
+
+try:
+    import redis
+except ImportError:  # backend-ul Redis este opțional
+    redis = None
+
+
+class InMemoryCacheBackend:
+    def __init__(self, maxsize=2048):
+        self._cache = TTLCache(maxsize=maxsize)
+        # Contoarele nu sunt supuse evacuării LRU
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value, ttl=None):
+        self._cache.set(key, value, expires_at=time.time() + ttl if ttl else None)
+
+    def delete(self, key):
+        self._cache.pop(key)
+
+    def get_counter(self, key):
+        return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+
+class RedisCacheBackend:
+    def __init__(self, url):
+        if redis is None:
+            raise RuntimeError('The redis package is required for the Redis cache backend')
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        value = self._client.get(key)
+        if value is None:
+            return None
+        header, _, body = value.partition(b'\n')
+        etag, _, modified = header.decode('ascii').partition(';')
+        entry = {'etag': etag, 'body': body}
+        if modified:
+            entry['modified'] = float(modified)
+        return entry
+
+    def set(self, key, value, ttl=None):
+        # Antetul are forma `etag` sau `etag;modified`, urmat de corp pe rândul următor
+        header = value['etag'] if 'modified' not in value else f"{value['etag']};{value['modified']}"
+        self._client.set(key, header.encode('ascii') + b'\n' + value['body'], ex=ttl)
+
+    def delete(self, key):
+        self._client.delete(key)
+
+    def get_counter(self, key):
+        return int(self._client.get(key) or 0)
+
+    def incr(self, key):
+        return self._client.incr(key)
+
+
+def create_cache_backend():
+    if os.getenv('CACHE_BACKEND') == 'redis':
+        return RedisCacheBackend(os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+    return InMemoryCacheBackend(maxsize=int(os.getenv('CACHE_SIZE', 2048)))
+
+
+class ResponseCache:
+    """Per-user cache for serialized responses, invalidated by bumping a user generation."""
+
+    def __init__(self, namespace, backend, ttl=300):
+        self.namespace = namespace
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def key(self, user_id, variant):
+        # Cheia include generația curentă, deci o invalidare face inaccesibile intrările vechi
+        generation = self.backend.get_counter(f'{self.namespace}:{user_id}:gen')
+        return f'{self.namespace}:{user_id}:{generation}:{variant}'
+
+    def get(self, key):
+        entry = self.backend.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def set(self, key, body, modified=None):
+        entry = {
+            'etag': hashlib.sha1(body).hexdigest(),
+            'body': body
+        }
+        if modified is not None:
+            entry['modified'] = modified
+        self.backend.set(key, entry, ttl=self.ttl)
+        return entry
+
+    def invalidate(self, user_id):
+        self.invalidations += 1
+        self.backend.incr(f'{self.namespace}:{user_id}:gen')
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hitRate': round(self.hits / lookups, 4) if lookups else 0
+        }
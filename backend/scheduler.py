@@ -0,0 +1,240 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition, NotFound
+
+_FIELD_RANGES = (
+    ('minute', 0, 59),
+    ('hour', 0, 23),
+    ('day', 1, 31),
+    ('month', 1, 12),
+    ('weekday', 0, 6)
+)
+
+
+def _parse_field(expression, low, high, name):
+    values = set()
+    # 7 înseamnă tot duminică, ca în cron (deci și `5-7` este vineri-duminică)
+    limit = 7 if name == 'weekday' else high
+    for part in expression.split(','):
+        value_range, _, step = part.partition('/')
+        step = int(step) if step else 1
+        if value_range == '*':
+            start, end = low, high
+        elif '-' in value_range:
+            start, end = (int(value) for value in value_range.split('-', 1))
+        else:
+            start = end = int(value_range)
+            if step > 1:
+                end = high
+        if start < low or end > limit or start > end or step < 1:
+            raise ValueError(f'Invalid {name} field in cron spec: {expression}')
+        values.update(value % 7 if name == 'weekday' else value for value in range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronSpec:
+    """Five-field cron expression: minute hour day-of-month month day-of-week (0 = Sunday)."""
+
+    def __init__(self, spec):
+        fields = spec.split()
+        if len(fields) != 5:
+            raise ValueError(f'Cron spec must have 5 fields: {spec}')
+        self.spec = spec
+        parsed = [_parse_field(field, low, high, name) for field, (name, low, high) in zip(fields, _FIELD_RANGES)]
+        self.minutes, self.hours, self.days, self.months, self.weekdays = parsed
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+
+    def _day_matches(self, moment):
+        day_match = moment.day in self.days
+        # Python: luni = 0; cron: duminică = 0
+        weekday_match = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._any_day:
+            return weekday_match
+        if self._any_weekday:
+            return day_match
+        return day_match or weekday_match
+
+    def next_after(self, moment):
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year = candidate.year + (candidate.month == 12)
+                month = candidate.month % 12 + 1
+                candidate = candidate.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+        raise ValueError(f'Cron spec never matches: {self.spec}')
+
+
+def _utc(moment):
+    return moment.astimezone(timezone.utc)
+
+
+class FirestoreLeaseStore:
+    """Leases in Firestore: only the instance that claims a scheduled slot runs the job."""
+
+    def __init__(self, db, collection='scheduler_leases'):
+        self.db = db
+        self.collection = collection
+
+    def _ref(self, job_name):
+        return self.db.collection(self.collection).document(job_name)
+
+    def acquire(self, job_name, scheduled_for, owner, ttl):
+        ref = self._ref(job_name)
+        now = datetime.now(timezone.utc)
+        lease = {
+            'owner': owner,
+            'leaseUntil': now + timedelta(seconds=ttl),
+            'scheduledFor': _utc(scheduled_for)
+        }
+        snapshot = ref.get()
+        if not snapshot.exists:
+            try:
+                ref.create(lease)
+                return True
+            except AlreadyExists:
+                return False
+
+        current = snapshot.to_dict()
+        if current.get('scheduledFor') and current['scheduledFor'] >= lease['scheduledFor']:
+            # Rularea pentru acest moment a fost deja preluată de altă instanță
+            return False
+        if current.get('leaseUntil') and current['leaseUntil'] > now:
+            return False
+        try:
+            # Scrierea reușește doar dacă documentul nu s-a schimbat între timp
+            ref.update(lease, option=self.db.write_option(last_update_time=snapshot.update_time))
+            return True
+        except (FailedPrecondition, NotFound):
+            return False
+
+    def release(self, job_name, owner, run):
+        ref = self._ref(job_name)
+        snapshot = ref.get()
+        if not snapshot.exists or snapshot.to_dict().get('owner') != owner:
+            return
+        ref.update({
+            'leaseUntil': datetime.now(timezone.utc),
+            'lastRun': run
+        })
+
+    def last_runs(self):
+        runs = {}
+        for snapshot in self.db.collection(self.collection).stream():
+            runs[snapshot.id] = snapshot.to_dict().get('lastRun')
+        return runs
+
+
+class Job:
+    def __init__(self, name, spec, func, lease_ttl):
+        self.name = name
+        self.cron = CronSpec(spec)
+        self.func = func
+        self.lease_ttl = lease_ttl
+        self.next_run = None
+        self.last_run = None
+
+
+class Scheduler:
+    """Runs registered jobs on cron specs; a lease makes each run happen on a single instance."""
+
+    def __init__(self, lease_store, owner=None, poll_interval=30):
+        self.lease_store = lease_store
+        self.owner = owner or f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}'
+        self.poll_interval = poll_interval
+        self.jobs = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def register(self, name, spec, func, lease_ttl=3600):
+        job = Job(name, spec, func, lease_ttl)
+        job.next_run = job.cron.next_after(datetime.now())
+        self.jobs[name] = job
+        return job
+
+    def job(self, name, spec, lease_ttl=3600):
+        def decorator(func):
+            self.register(name, spec, func, lease_ttl=lease_ttl)
+            return func
+        return decorator
+
+    def run_job(self, job, scheduled_for):
+        if not self.lease_store.acquire(job.name, scheduled_for, self.owner, job.lease_ttl):
+            return False
+        started = time.monotonic()
+        run = {
+            'scheduledFor': _utc(scheduled_for),
+            'startedAt': datetime.now(timezone.utc),
+            'runBy': self.owner,
+            'status': 'success',
+            'error': None
+        }
+        try:
+            job.func()
+        except Exception as e:
+            run['status'] = 'error'
+            run['error'] = str(e)
+            print(f"Scheduled job {job.name} failed: {str(e)}")
+        run['durationSeconds'] = round(time.monotonic() - started, 3)
+        run['finishedAt'] = datetime.now(timezone.utc)
+        job.last_run = run
+        self.lease_store.release(job.name, self.owner, run)
+        return True
+
+    def run_pending(self, now=None):
+        now = now or datetime.now()
+        for job in self.jobs.values():
+            if job.next_run <= now:
+                scheduled_for = job.next_run
+                job.next_run = job.cron.next_after(now)
+                self.run_job(job, scheduled_for)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_pending()
+            except Exception as e:
+                print(f"Scheduler error: {str(e)}")
+            next_due = min((job.next_run for job in self.jobs.values()), default=None)
+            wait = self.poll_interval
+            if next_due is not None:
+                wait = max(0, min(wait, (next_due - datetime.now()).total_seconds()))
+            self._stop.wait(wait)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name='scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self):
+        shared_runs = self.lease_store.last_runs()
+        jobs = []
+        for job in self.jobs.values():
+            last_run = shared_runs.get(job.name) or job.last_run
+            jobs.append({
+                'name': job.name,
+                'spec': job.cron.spec,
+                'nextRun': job.next_run.isoformat(),
+                'lastRun': last_run
+            })
+        return jobs
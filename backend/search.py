@@ -0,0 +1,250 @@
+import bisect
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+from google.api_core.exceptions import FailedPrecondition, NotFound
+from google.cloud.firestore import Increment
+
+from cache import TTLCache
+
+# Schimbă versiunea când se schimbă tokenizarea, ca indexurile persistate să fie reconstruite
+INDEX_VERSION = 2
+
+FIELD_WEIGHTS = {'title': 3, 'category': 2, 'content': 1}
+SEARCH_FIELDS = tuple(FIELD_WEIGHTS)
+MAX_TERMS_PER_NOTE = 256
+MAX_PREFIX_EXPANSIONS = 50
+# O potrivire doar pe prefix contează mai puțin decât cuvântul întreg
+PREFIX_PENALTY = 0.7
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Limita Firestore de operații într-un batch
+WRITE_BATCH_LIMIT = 500
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def fold(text):
+    # „Ședință”, „Sedinta” și „şedinţă” (cu sedilă) devin toate „sedinta”
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text):
+    return _TOKEN.findall(fold(text)) if isinstance(text, str) else []
+
+
+def note_terms(note):
+    weights = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        for token in tokenize(note.get(field)):
+            weights[token] += weight
+    return dict(weights.most_common(MAX_TERMS_PER_NOTE))
+
+
+class UserIndex:
+    """Inverted index over one user's notes, with BM25 ranking and prefix matching."""
+
+    def __init__(self, notes=None):
+        self.lock = threading.Lock()
+        self.notes = {}
+        self.lengths = {}
+        self.postings = {}
+        self.vocabulary = []
+        self.total_length = 0
+        for note_id, terms in (notes or {}).items():
+            self.add(note_id, terms)
+
+    def add(self, note_id, terms):
+        self.remove(note_id)
+        self.notes[note_id] = terms
+        self.lengths[note_id] = sum(terms.values())
+        self.total_length += self.lengths[note_id]
+        for term, weight in terms.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                bisect.insort(self.vocabulary, term)
+            postings[note_id] = weight
+
+    def remove(self, note_id):
+        terms = self.notes.pop(note_id, None)
+        if terms is None:
+            return
+        self.total_length -= self.lengths.pop(note_id)
+        for term in terms:
+            postings = self.postings[term]
+            del postings[note_id]
+            if not postings:
+                del self.postings[term]
+                del self.vocabulary[bisect.bisect_left(self.vocabulary, term)]
+
+    def _expand(self, token):
+        start = bisect.bisect_left(self.vocabulary, token)
+        for term in self.vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(token):
+                break
+            yield term
+
+    def search(self, tokens, limit):
+        if not self.notes:
+            return []
+        average_length = max(self.total_length / len(self.notes), 1)
+        scores = None
+        for token in dict.fromkeys(tokens):
+            # Pentru fiecare cuvânt din căutare contează cel mai bun termen potrivit din notă
+            best = {}
+            for term in self._expand(token):
+                postings = self.postings[term]
+                idf = math.log(1 + (len(self.notes) - len(postings) + 0.5) / (len(postings) + 0.5))
+                factor = idf * (1 if term == token else PREFIX_PENALTY)
+                for note_id, weight in postings.items():
+                    norm = 1 - BM25_B + BM25_B * self.lengths[note_id] / average_length
+                    score = factor * weight * (BM25_K1 + 1) / (weight + BM25_K1 * norm)
+                    if score > best.get(note_id, 0):
+                        best[note_id] = score
+            # Toate cuvintele din căutare trebuie să apară în notă
+            if scores is None:
+                scores = best
+            else:
+                scores = {note_id: score + best[note_id] for note_id, score in scores.items() if note_id in best}
+            if not scores:
+                return []
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+
+class _LoadedIndex:
+    def __init__(self, index, update_time):
+        self.index = index
+        self.update_time = update_time
+
+
+class NoteSearchIndex:
+    """Per-user note indexes persisted under `search_index/<userId>`.
+
+    Each note's terms live in their own `notes/<noteId>` document, so an index grows
+    without reaching the document size limit. Every write bumps the header document,
+    and the inverted form is kept in memory and reloaded only when the header's
+    update_time changes.
+    """
+
+    def __init__(self, db, cache_size=1024, collection='search_index', notes_collection='notes'):
+        self.db = db
+        self.collection = collection
+        self.notes_collection = notes_collection
+        self._cache = TTLCache(maxsize=cache_size)
+        self.loads = 0
+        self.builds = 0
+
+    def _ref(self, user_id):
+        return self.db.collection(self.collection).document(user_id)
+
+    def _shards(self, user_id):
+        return self._ref(user_id).collection('notes')
+
+    def _write_in_batches(self, writes):
+        for start in range(0, len(writes), WRITE_BATCH_LIMIT):
+            batch = self.db.batch()
+            for write in writes[start:start + WRITE_BATCH_LIMIT]:
+                write(batch)
+            batch.commit()
+
+    def _build(self, user_id):
+        # Primul acces: indexul se construiește o singură dată din notele existente
+        ref = self._ref(user_id)
+        ref.set({'version': INDEX_VERSION, 'revision': 0})
+        shards = self._shards(user_id)
+        writes = [lambda batch, shard=shard.reference: batch.delete(shard) for shard in shards.select([]).stream()]
+        notes = self.db.collection(self.notes_collection).where('userId', '==', user_id).select(list(SEARCH_FIELDS)).stream()
+        writes += [lambda batch, shard=shards.document(note.id), terms=note_terms(note.to_dict()): batch.set(shard, {'terms': terms})
+                   for note in notes]
+        self._write_in_batches(writes)
+        # Workerii care au încărcat un index parțial între timp îl reîncarcă
+        ref.update({'revision': Increment(1)})
+        self.builds += 1
+
+    def _load(self, user_id):
+        ref = self._ref(user_id)
+        cached = self._cache.get(user_id)
+        probe = ref.get(field_paths=['version'])
+        if cached is not None and probe.exists and cached.update_time == probe.update_time:
+            return cached
+        if not probe.exists or (probe.to_dict() or {}).get('version') != INDEX_VERSION:
+            self._build(user_id)
+        # Antetul se citește înaintea notelor: o scriere concurentă produce cel mult o reîncărcare în plus
+        header = ref.get(field_paths=['revision'])
+        notes = {shard.id: (shard.to_dict() or {}).get('terms', {}) for shard in self._shards(user_id).stream()}
+        loaded = _LoadedIndex(UserIndex(notes), header.update_time)
+        self.loads += 1
+        self._cache.set(user_id, loaded)
+        return loaded
+
+    def search(self, user_id, query, limit=20):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        loaded = self._load(user_id)
+        with loaded.index.lock:
+            return loaded.index.search(tokens, limit)
+
+    def _commit(self, user_id, entries, cached):
+        ref = self._ref(user_id)
+        shards = self._shards(user_id)
+        batch = self.db.batch()
+        for note_id, entry in entries:
+            if entry is None:
+                batch.delete(shards.document(note_id))
+            else:
+                batch.set(shards.document(note_id), {'terms': entry})
+        # Copia locală rămâne valabilă doar dacă nimeni altcineva n-a scris între timp
+        option = self.db.write_option(last_update_time=cached.update_time) if cached is not None else None
+        batch.update(ref, {'revision': Increment(1)}, option=option)
+        try:
+            results = batch.commit()
+        except FailedPrecondition:
+            self._cache.pop(user_id)
+            return self._commit(user_id, entries, None)
+        if cached is not None:
+            with cached.index.lock:
+                for note_id, entry in entries:
+                    if entry is None:
+                        cached.index.remove(note_id)
+                    else:
+                        cached.index.add(note_id, entry)
+                cached.update_time = results[-1].update_time
+        return cached
+
+    def apply(self, user_id, changes):
+        """Persist `{noteId: note or None}`; None removes the note from the index."""
+        entries = [(note_id, None if note is None else note_terms(note)) for note_id, note in changes.items()]
+        cached = self._cache.get(user_id)
+        try:
+            # Antetul ocupă o operație din fiecare batch
+            for start in range(0, len(entries), WRITE_BATCH_LIMIT - 1):
+                cached = self._commit(user_id, entries[start:start + WRITE_BATCH_LIMIT - 1], cached)
+        except NotFound:
+            # Utilizatorul n-a căutat încă; indexul va fi construit cu nota inclusă
+            self._cache.pop(user_id)
+        except Exception:
+            self.invalidate(user_id)
+            raise
+
+    def invalidate(self, user_id):
+        # Fără antet, următoarea căutare reconstruiește indexul din notele salvate
+        self._cache.pop(user_id)
+        self._ref(user_id).delete()
+
+    def stats(self):
+        return {
+            'cachedUsers': len(self._cache),
+            'loads': self.loads,
+            'builds': self.builds
+        }
+
+
+def create_note_search_index(db):
+    return NoteSearchIndex(db, cache_size=int(os.getenv('SEARCH_INDEX_CACHE_SIZE', 1024)))
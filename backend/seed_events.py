@@ -1,17 +1,13 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
 from datetime import datetime, timedelta
-import pytz
+from zoneinfo import ZoneInfo
 import random
 
-# Initialize Firebase Admin
-cred = credentials.Certificate("config/key.json")
-firebase_admin.initialize_app(cred)
+from google.cloud.firestore import SERVER_TIMESTAMP
 
-db = firestore.client()
+from calendar_index import INDEX_FIELD, index_buckets
 
 # Timezone pentru România
-tz = pytz.timezone('Europe/Bucharest')
+tz = ZoneInfo('Europe/Bucharest')
 
 # User ID specificat
 USER_ID = "dKOMIQHilZeyMPED7VPvOY5yNuV2"
@@ -38,66 +34,72 @@ locatii = [
     "Hub Innovation", "Sala Training", "Meeting Room 2"
 ]
 
-# Generare evenimente
-events = []
-current_date = datetime.now(tz)
-
-for i in range(20):
-    # Calculăm o dată aleatorie în următoarele 30 de zile
-    random_days = random.randint(0, 30)
-    random_hour = random.randint(9, 17)
-    event_date = current_date + timedelta(days=random_days)
-    event_date = event_date.replace(hour=random_hour, minute=0)
-    
-    # Alegem tipul de eveniment și detaliile corespunzătoare
-    event_type = random.choice(['meeting', 'event', 'reminder', 'birthday'])
-    
-    if event_type == 'meeting':
-        title = random.choice(titluri_intalniri)
-        duration = random.choice([1, 1.5, 2])  # ore
-        category = "meeting"
-    elif event_type == 'event':
-        title = random.choice(titluri_evenimente)
-        duration = random.choice([4, 6, 8])  # ore
-        category = "event"
-    elif event_type == 'reminder':
-        title = random.choice(titluri_reminder)
-        duration = 1  # ore
-        category = "reminder"
-    else:
-        title = f"Zi de naștere {random.choice(['Alex', 'Maria', 'Andrei', 'Elena', 'Radu'])}"
-        duration = 24  # ore
-        category = "birthday"
-    
-    end_date = event_date + timedelta(hours=duration)
-    location = random.choice(locatii) if event_type != 'birthday' else ""
+def generate_events(user_id=USER_ID, count=20, rng=random, now=None):
+    # Generare evenimente în următoarele 30 de zile
+    events = []
+    current_date = now or datetime.now(tz)
     
-    event = {
-        "title": title,
-        "description": f"Locație: {location}" if location else "Eveniment important",
-        "startDate": event_date.isoformat(),
-        "endDate": end_date.isoformat(),
-        "category": category,
-        "recurrence": "weekly" if random.random() < 0.3 else "",
-        "notifications": {
-            "email": random.choice([True, False]),
-            "push": random.choice([True, False])
-        },
-        "userId": USER_ID,
-        "createdAt": firestore.SERVER_TIMESTAMP,
-        "updatedAt": firestore.SERVER_TIMESTAMP
-    }
-    events.append(event)
+    for i in range(count):
+        # Calculăm o dată aleatorie în următoarele 30 de zile
+        random_days = rng.randint(0, 30)
+        random_hour = rng.randint(9, 17)
+        event_date = current_date + timedelta(days=random_days)
+        event_date = event_date.replace(hour=random_hour, minute=0, second=0, microsecond=0)
+        
+        # Alegem tipul de eveniment și detaliile corespunzătoare
+        event_type = rng.choice(['meeting', 'event', 'reminder', 'birthday'])
+        
+        if event_type == 'meeting':
+            title = rng.choice(titluri_intalniri)
+            duration = rng.choice([1, 1.5, 2])  # ore
+            category = "meeting"
+        elif event_type == 'event':
+            title = rng.choice(titluri_evenimente)
+            duration = rng.choice([4, 6, 8])  # ore
+            category = "event"
+        elif event_type == 'reminder':
+            title = rng.choice(titluri_reminder)
+            duration = 1  # ore
+            category = "reminder"
+        else:
+            title = f"Zi de naștere {rng.choice(['Alex', 'Maria', 'Andrei', 'Elena', 'Radu'])}"
+            duration = 24  # ore
+            category = "birthday"
+        
+        end_date = event_date + timedelta(hours=duration)
+        location = rng.choice(locatii) if event_type != 'birthday' else ""
+        
+        events.append({
+            "title": title,
+            "description": f"Locație: {location}" if location else "Eveniment important",
+            "startDate": event_date.isoformat(),
+            "endDate": end_date.isoformat(),
+            "category": category,
+            "recurrence": "weekly" if rng.random() < 0.3 else "",
+            "notifications": {
+                "email": rng.choice([True, False]),
+                "push": rng.choice([True, False])
+            },
+            "userId": user_id,
+            "createdAt": SERVER_TIMESTAMP,
+            "updatedAt": SERVER_TIMESTAMP
+        })
+        # Lunile atinse de eveniment, pentru /api/events?from=&to=
+        events[-1][INDEX_FIELD] = index_buckets(events[-1])
+    return events
 
-def seed_events():
+def seed_events(db, events):
     events_ref = db.collection('events')
     
-    # Adaugă fiecare eveniment în Firestore
-    for event in events:
-        event_ref = events_ref.document()
-        event_ref.set(event)
-        print(f"Adăugat eveniment: {event['title']}")
+    # Evenimentele se scriu în batch-uri de cel mult 500 de operații
+    for start in range(0, len(events), 500):
+        batch = db.batch()
+        for event in events[start:start + 500]:
+            batch.set(events_ref.document(), event)
+        batch.commit()
+    print(f"Adăugate {len(events)} evenimente")
 
 if __name__ == '__main__':
-    seed_events()
-    print("Evenimentele au fost adăugate cu succes!") 
\ No newline at end of file
+    from datastore import create_client
+    seed_events(create_client('firestore'), generate_events())
+    print("Evenimentele au fost adăugate cu succes!")
@@ -1,20 +1,8 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
-from datetime import datetime
-import pytz
-
-# Initialize Firebase Admin
-cred = credentials.Certificate("config/key.json")
-firebase_admin.initialize_app(cred)
-
-db = firestore.client()
+from google.cloud.firestore import SERVER_TIMESTAMP
 
 # User ID specificat
 USER_ID = "dKOMIQHilZeyMPED7VPvOY5yNuV2"
 
-# Timezone pentru România
-tz = pytz.timezone('Europe/Bucharest')
-
 # Lista de notițe pentru seed
 notes = [
     {
@@ -250,21 +238,33 @@ Keywords de research:
     }
 ]
 
-def seed_notes():
+def generate_notes(user_id=USER_ID, count=None):
+    # Fără `count` se întorc notițele de mai sus; altfel se repetă, numerotate
+    count = len(notes) if count is None else count
+    generated = []
+    for index in range(count):
+        note = notes[index % len(notes)]
+        round_number = index // len(notes)
+        generated.append({
+            **note,
+            "title": note["title"] if round_number == 0 else f"{note['title']} ({round_number + 1})",
+            "userId": user_id,
+            "createdAt": SERVER_TIMESTAMP,
+            "updatedAt": SERVER_TIMESTAMP
+        })
+    return generated
+
+def seed_notes(db, notes_data):
     notes_ref = db.collection('notes')
     
-    # Adaugă fiecare notiță în Firestore
-    for note in notes:
-        note_data = {
-            **note,
-            "userId": USER_ID,
-            "createdAt": firestore.SERVER_TIMESTAMP,
-            "updatedAt": firestore.SERVER_TIMESTAMP
-        }
-        note_ref = notes_ref.document()
-        note_ref.set(note_data)
-        print(f"Adăugat notița: {note['title']}")
+    # Notițele se scriu în batch-uri de cel mult 500 de operații
+    for start in range(0, len(notes_data), 500):
+        batch = db.batch()
+        for note in notes_data[start:start + 500]:
+            batch.set(notes_ref.document(), note)
+        batch.commit()
+    print(f"Adăugate {len(notes_data)} notițe")
 
 if __name__ == '__main__':
-    seed_notes()
-    print("Notițele au fost adăugate cu succes!") 
\ No newline at end of file
+    from datastore import create_client
+    seed_notes(create_client('firestore'), generate_notes())
@@ -0,0 +1,74 @@
+import base64
+from datetime import date, datetime, timezone
+from functools import lru_cache
+
+from flask.json import JSONEncoder
+from google.cloud.firestore_v1 import DocumentReference, GeoPoint
+from google.cloud.firestore_v1.transforms import Sentinel
+
+from memory_store import MemoryDocumentReference
+
+try:
+    import orjson
+except ImportError:  # orjson este opțional; fără el se folosește encoder-ul standard
+    orjson = None
+
+REFERENCE_TYPES = (DocumentReference, MemoryDocumentReference)
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+@lru_cache(maxsize=4096)
+def _http_date_prefix(ordinal):
+    value = date.fromordinal(ordinal)
+    return f'{WEEKDAYS[value.weekday()]}, {value.day:02d} {MONTHS[value.month - 1]} {value.year:04d} '
+
+
+def http_date(value):
+    # Același format ca werkzeug.http.http_date; partea de dată e memorată pe zi
+    if not isinstance(value, datetime):
+        return _http_date_prefix(value.toordinal()) + '00:00:00 GMT'
+    if value.tzinfo is not None and value.tzinfo is not timezone.utc and value.utcoffset():
+        value = value.astimezone(timezone.utc)
+    return _http_date_prefix(value.toordinal()) + '%02d:%02d:%02d GMT' % (value.hour, value.minute, value.second)
+
+
+def firestore_default(o):
+    # Tipurile Firestore care pot apărea în documente; datele calendaristice rămân la Flask
+    if isinstance(o, REFERENCE_TYPES):
+        return o.path
+    if isinstance(o, GeoPoint):
+        return {'latitude': o.latitude, 'longitude': o.longitude}
+    if isinstance(o, Sentinel):
+        # SERVER_TIMESTAMP și celelalte valori încă necalculate de server
+        return None
+    if isinstance(o, (bytes, bytearray)):
+        return base64.b64encode(o).decode('ascii')
+    raise TypeError
+
+
+class FastJSONEncoder(JSONEncoder):
+    """Flask JSON encoder that serializes compact output with orjson when it is installed.
+
+    Datetimes (including `DatetimeWithNanoseconds`) keep Flask's HTTP-date format.
+    Indented output and values orjson rejects go through the standard encoder.
+    """
+
+    def default(self, o):
+        if isinstance(o, date):
+            return http_date(o)
+        try:
+            return firestore_default(o)
+        except TypeError:
+            return super().default(o)
+
+    def encode(self, o):
+        if orjson is not None and self.indent is None:
+            option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            try:
+                return orjson.dumps(o, default=self.default, option=option).decode('utf-8')
+            except TypeError:
+                pass
+        return super().encode(o)
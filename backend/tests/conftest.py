@@ -0,0 +1,50 @@
+import os
+import sys
+import uuid
+
+import pytest
+
+# Aplicația își citește configurația la import: testele rulează pe backend-ul din memorie,
+# fără scheduler, reminder-e în fundal sau SMTP
+os.environ['DATA_BACKEND'] = 'memory'
+os.environ['SCHEDULER_ENABLED'] = '0'
+os.environ['REMINDERS_ENABLED'] = '0'
+os.environ['ADMIN_UIDS'] = 'admin-user'
+for name in ('SMTP_HOST', 'METRICS_TOKEN', 'CACHE_BACKEND', 'PUSH_BACKEND'):
+    os.environ.pop(name, None)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module  # noqa: E402
+from datastore import issue_local_token  # noqa: E402
+
+
+def auth_headers(user_id):
+    return {'Authorization': f'Bearer {issue_local_token(user_id)}'}
+
+
+@pytest.fixture(autouse=True)
+def empty_store():
+    # Cache-urile sunt pe utilizator, iar fiecare test are utilizatorul lui, deci ajunge golirea datelor
+    app_module.db.reset()
+    yield
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def user_id():
+    return f'user-{uuid.uuid4().hex[:12]}'
+
+
+@pytest.fixture
+def headers(user_id):
+    return auth_headers(user_id)
+
+
+@pytest.fixture
+def db():
+    return app_module.db
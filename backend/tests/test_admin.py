@@ -0,0 +1,17 @@
+import pytest
+
+import app as app_module
+from conftest import auth_headers
+
+
+@pytest.mark.parametrize('path', ['/api/cache/stats', '/api/stream/stats', '/api/scheduler/status'])
+def test_process_stats_are_admin_only(client, headers, path):
+    response = client.get(path, headers=headers)
+    assert response.status_code == 403
+    assert response.get_json()['message'] == 'Admin access required'
+    assert client.get(path, headers=auth_headers('admin-user')).status_code == 200
+
+
+def test_admin_claim_grants_access(monkeypatch, client):
+    monkeypatch.setattr(app_module, 'verify_token', lambda token: {'uid': 'claimed', 'admin': True})
+    assert client.get('/api/cache/stats', headers={'Authorization': 'Bearer any'}).status_code == 200
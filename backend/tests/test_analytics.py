@@ -0,0 +1,35 @@
+import app as app_module
+
+
+def test_analytics_uses_daily_rollups(client, headers):
+    ids = [client.post('/api/tasks', json={'title': f't{index}'}, headers=headers).get_json()['taskId']
+           for index in range(4)]
+    for task_id in ids[:3]:
+        client.put(f'/api/tasks/{task_id}/toggle', headers=headers)
+    stats = client.get('/api/analytics?timeRange=week', headers=headers).get_json()['data']['stats']
+    assert stats == {'totalTasks': 4, 'completedTasks': 3, 'pendingTasks': 1, 'productivityScore': 75}
+
+
+def test_reconcile_repairs_drifted_rollups(client, headers, db, user_id):
+    client.post('/api/tasks', json={'title': 'a'}, headers=headers)
+    client.get('/api/analytics', headers=headers)
+    rollup = next(iter(db.collection('analytics_rollups').where('userId', '==', user_id).stream()))
+    rollup.reference.update({'total': 10})
+
+    app_module.reconcile_daily_rollups()
+    assert rollup.reference.get().to_dict()['total'] == 1
+
+
+def test_analytics_answers_304_until_a_task_changes(client, headers):
+    client.post('/api/tasks', json={'title': 'a'}, headers=headers)
+    first = client.get('/api/analytics?timeRange=month', headers=headers)
+    assert first.status_code == 200
+    assert first.headers['Cache-Control'] == 'private, no-cache'
+    etag = first.headers['ETag']
+
+    assert client.get('/api/analytics?timeRange=month', headers={**headers, 'If-None-Match': etag}).status_code == 304
+
+    client.post('/api/tasks', json={'title': 'b'}, headers=headers)
+    changed = client.get('/api/analytics?timeRange=month', headers={**headers, 'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.get_json()['data']['stats']['totalTasks'] == 2
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+pytest.importorskip('starlette')
+pytest.importorskip('a2wsgi')
+pytest.importorskip('httpx')
+
+from starlette.testclient import TestClient  # noqa: E402
+
+import asgi  # noqa: E402
+
+
+@pytest.fixture
+def asgi_client():
+    with TestClient(asgi.app) as client:
+        yield client
+
+
+def test_task_list_matches_the_flask_route(client, asgi_client, headers):
+    for index in range(3):
+        client.post('/api/tasks', json={'title': f't{index}'}, headers=headers)
+    expected = client.get('/api/tasks?limit=2', headers=headers).get_json()
+    response = asgi_client.get('/api/tasks?limit=2', headers=headers)
+    assert response.status_code == 200
+    assert response.json() == expected
+
+
+def test_task_list_streams_ndjson(client, asgi_client, headers):
+    for index in range(3):
+        client.post('/api/tasks', json={'title': f't{index}'}, headers=headers)
+    response = asgi_client.get('/api/tasks?format=ndjson', headers=headers)
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    titles = [json.loads(line)['title'] for line in response.text.splitlines()]
+    assert sorted(titles) == ['t0', 't1', 't2']
+
+
+def test_event_window_expands_recurring_series(client, asgi_client, headers):
+    client.post('/api/events', json={'title': 'weekly', 'startDate': '2026-10-05T09:00', 'recurrence': 'weekly'},
+                headers=headers)
+    window = '/api/events?from=2026-10-10&to=2026-10-20'
+    expected = client.get(window, headers=headers).get_json()
+    response = asgi_client.get(window, headers=headers)
+    assert response.json() == expected
+    assert [event['startDate'] for event in response.json()['data']] == ['2026-10-12T09:00', '2026-10-19T09:00']
+
+
+def test_writes_fall_through_to_flask(asgi_client, headers):
+    response = asgi_client.post('/api/tasks', json={'title': 'x'}, headers=headers)
+    assert response.status_code == 200
+    assert asgi_client.get('/api/tasks', headers=headers).json()['data'][0]['title'] == 'x'
+
+
+def test_token_is_required(asgi_client):
+    response = asgi_client.get('/api/tasks')
+    assert (response.status_code, response.json()['message']) == (401, 'No token provided')
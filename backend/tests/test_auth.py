@@ -0,0 +1,35 @@
+import app as app_module
+from cache import TTLCache
+
+
+def test_missing_and_malformed_tokens(client):
+    assert client.get('/api/tasks').get_json()['message'] == 'No token provided'
+    assert client.get('/api/tasks', headers={'Authorization': 'Token abc'}).status_code == 401
+    assert client.get('/api/tasks', headers={'Authorization': 'Bearer forged:0:sig'}).status_code == 401
+
+
+def test_verified_tokens_are_cached(monkeypatch, client, headers):
+    calls = []
+    verify = app_module.verify_id_token
+
+    def counting_verify(token):
+        calls.append(token)
+        return verify(token)
+
+    monkeypatch.setattr(app_module, 'verify_id_token', counting_verify)
+    for _ in range(3):
+        assert client.get('/api/tasks', headers=headers).status_code == 200
+    assert len(calls) == 1
+
+
+def test_token_cache_entries_expire_with_the_token():
+    now = [1000.0]
+    cache = TTLCache(maxsize=2, clock=lambda: now[0])
+    cache.set('a', 'user-a', expires_at=1060)
+    cache.set('b', 'user-b')
+    assert cache.get('a') == 'user-a'
+    now[0] = 1060
+    assert cache.get('a') is None
+    cache.set('c', 'user-c')
+    cache.set('d', 'user-d')
+    assert cache.get('b') is None and cache.evictions == 1
@@ -0,0 +1,62 @@
+import app as app_module
+from conftest import auth_headers
+
+
+def batch(client, headers, operations):
+    return client.post('/api/batch', json={'operations': operations}, headers=headers)
+
+
+def test_mixed_batch_reports_each_operation(client, headers, user_id, db):
+    task_id = client.post('/api/tasks', json={'title': 'existing'}, headers=headers).get_json()['taskId']
+    foreign_id = client.post('/api/tasks', json={'title': 'foreign'}, headers=auth_headers('other')).get_json()['taskId']
+
+    body = batch(client, headers, [
+        {'op': 'create', 'collection': 'tasks', 'data': {'title': 'new'}},
+        {'op': 'update', 'collection': 'tasks', 'id': task_id, 'data': {'title': 'renamed'}},
+        {'op': 'delete', 'collection': 'tasks', 'id': foreign_id},
+        {'op': 'delete', 'collection': 'tasks', 'id': 'missing'},
+        {'op': 'rename', 'collection': 'tasks', 'id': task_id}
+    ]).get_json()
+
+    assert body['status'] == 'success'
+    assert (body['succeeded'], body['failed']) == (2, 3)
+    assert [result['status'] for result in body['results']] == ['success', 'success', 'error', 'error', 'error']
+    assert [result.get('code') for result in body['results'][2:]] == [403, 404, 400]
+
+    created = db.collection('tasks').document(body['results'][0]['id']).get().to_dict()
+    assert created['userId'] == user_id and created['title'] == 'new'
+    assert db.collection('tasks').document(task_id).get().to_dict()['title'] == 'renamed'
+    assert db.collection('tasks').document(foreign_id).get().exists
+
+
+def test_batch_updates_dashboard_counters(client, headers):
+    # Contoarele sunt inițializate înainte de batch, ca să fie actualizate incremental
+    client.get('/api/dashboard/overview', headers=headers)
+    task_id = client.post('/api/tasks', json={'title': 'a'}, headers=headers).get_json()['taskId']
+    batch(client, headers, [
+        {'op': 'update', 'collection': 'tasks', 'id': task_id, 'data': {'completed': True}},
+        {'op': 'create', 'collection': 'tasks', 'data': {'title': 'b', 'status': 'in-progress'}}
+    ])
+    stats = client.get('/api/dashboard/overview', headers=headers).get_json()['data']['stats']
+    assert stats == {'completedTasks': 1, 'inProgressTasks': 1, 'upcomingTasks': 0}
+
+
+def test_batch_delete_writes_tombstones(client, headers, db):
+    note_id = client.post('/api/notes', json={'title': 'x'}, headers=headers).get_json()['noteId']
+    batch(client, headers, [{'op': 'delete', 'collection': 'notes', 'id': note_id}])
+    assert not db.collection('notes').document(note_id).get().exists
+    assert db.collection('tombstones').document(f'notes_{note_id}').get().exists
+
+
+def test_large_batch_is_split_into_firestore_batches(client, headers, db):
+    operations = [{'op': 'create', 'collection': 'notes', 'data': {'title': f'n{index}'}} for index in range(300)]
+    operations += [{'op': 'create', 'collection': 'tasks', 'data': {'title': f't{index}'}} for index in range(200)]
+    body = batch(client, headers, operations).get_json()
+    assert body['succeeded'] == 500
+    assert len(list(db.collection('notes').stream())) == 300
+
+
+def test_batch_limits(client, headers):
+    assert batch(client, headers, []).status_code == 400
+    too_many = [{'op': 'create', 'collection': 'notes', 'data': {}}] * (app_module.BATCH_MAX_OPERATIONS + 1)
+    assert batch(client, headers, too_many).status_code == 400
@@ -0,0 +1,57 @@
+from urllib.parse import urlparse
+
+import app as app_module
+
+
+def feed_path(client, headers, user_id):
+    app_module.users.create(user_id, {'email': f'{user_id}@example.com'})
+    url = client.post('/api/calendar/feed', headers=headers).get_json()['url']
+    return urlparse(url).path
+
+
+def test_calendar_feed_answers_304_until_an_event_changes(client, headers, user_id):
+    path = feed_path(client, headers, user_id)
+    client.post('/api/events', json={'title': 'Meeting', 'startDate': '2026-10-20T10:00:00Z'}, headers=headers)
+
+    first = client.get(path)
+    assert first.status_code == 200
+    assert first.mimetype == 'text/calendar'
+    assert 'SUMMARY:Meeting' in first.get_data(as_text=True)
+    etag = first.headers['ETag']
+
+    assert client.get(path, headers={'If-None-Match': etag}).status_code == 304
+    assert client.get(path, headers={'If-Modified-Since': first.headers['Last-Modified']}).status_code == 304
+
+    client.post('/api/events', json={'title': 'Lunch', 'startDate': '2026-10-21T10:00:00Z'}, headers=headers)
+    changed = client.get(path, headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert 'SUMMARY:Lunch' in changed.get_data(as_text=True)
+
+
+def test_calendar_feed_rejects_old_and_disabled_secrets(client, headers, user_id):
+    old_path = feed_path(client, headers, user_id)
+    new_path = urlparse(client.post('/api/calendar/feed', headers=headers).get_json()['url']).path
+    assert client.get(old_path).status_code == 404
+    assert client.get(new_path).status_code == 200
+    client.delete('/api/calendar/feed', headers=headers)
+    assert client.get(new_path).status_code == 404
+
+
+def test_calendar_feed_sees_a_secret_rotated_on_another_worker(client, headers, user_id, db):
+    feed_path(client, headers, user_id)
+    # Alt worker scrie secretul direct în Firestore; cache-ul local are încă valoarea veche
+    db.collection('users').document(user_id).update({'calendarFeedSecret': 'rotated-elsewhere'})
+    assert client.get(f'/api/calendar/feed/{user_id}.rotated-elsewhere.ics').status_code == 200
+
+
+def test_wrong_secrets_do_not_evict_or_reread_the_profile(client, headers, user_id):
+    path = feed_path(client, headers, user_id)
+    client.delete('/api/calendar/feed', headers=headers)
+    misses = app_module.users.misses
+    for _ in range(5):
+        assert client.get(path).status_code == 404
+    for index in range(5):
+        assert client.get(f'/api/calendar/feed/{user_id}.bogus{index}.ics').status_code == 404
+    # O singură recitire pe interval; profilul rămâne în cache
+    assert app_module.users.misses == misses + 1
+    assert app_module.users.store.get(user_id) is not None
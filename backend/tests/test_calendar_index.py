@@ -0,0 +1,87 @@
+from datetime import datetime, timezone
+
+from calendar_index import (INDEX_FIELD, LONG_BUCKET, RECURRING_BUCKET, expand_event, first_group, index_buckets,
+                            occurrences, query_buckets)
+from reminders import DEFAULT_TIMEZONE
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def local_starts(event, window_start, window_end):
+    return [start.astimezone(DEFAULT_TIMEZONE).strftime('%Y-%m-%d %H:%M')
+            for start, _ in occurrences(event, window_start, window_end)]
+
+
+def test_daily_series_keeps_local_time_across_dst():
+    # În București ora de vară se încheie pe 25 octombrie 2026
+    event = {'startDate': '2026-10-20T09:00', 'endDate': '2026-10-20T10:00', 'recurrence': 'daily'}
+    starts = occurrences(event, utc(2026, 10, 24), utc(2026, 10, 27))
+    assert [start.strftime('%H:%M') for start, _ in starts] == ['09:00', '09:00', '09:00']
+    assert [start.astimezone(timezone.utc).hour for start, _ in starts] == [6, 7, 7]
+
+
+def test_weekly_series_across_spring_forward():
+    event = {'startDate': '2026-03-22T08:30', 'endDate': '2026-03-22T09:00', 'recurrence': 'weekly'}
+    assert local_starts(event, utc(2026, 3, 21), utc(2026, 4, 6)) == [
+        '2026-03-22 08:30', '2026-03-29 08:30', '2026-04-05 08:30'
+    ]
+
+
+def test_monthly_series_skips_months_without_the_day():
+    # Ca în RFC 5545: o serie din 31 ianuarie nu are apariții în februarie sau aprilie
+    event = {'startDate': '2026-01-31T12:00', 'endDate': '2026-01-31T13:00', 'recurrence': 'monthly'}
+    assert local_starts(event, utc(2026, 1, 1), utc(2026, 6, 1)) == [
+        '2026-01-31 12:00', '2026-03-31 12:00', '2026-05-31 12:00'
+    ]
+
+
+def test_yearly_series_on_leap_day():
+    event = {'startDate': '2024-02-29T10:00', 'recurrence': 'yearly'}
+    assert local_starts(event, utc(2024, 1, 1), utc(2033, 1, 1)) == [
+        '2024-02-29 10:00', '2028-02-29 10:00', '2032-02-29 10:00'
+    ]
+
+
+def test_long_series_jumps_to_the_window():
+    event = {'startDate': '2000-01-01T07:00', 'recurrence': 'daily'}
+    assert local_starts(event, utc(2026, 10, 1, 12), utc(2026, 10, 3, 12)) == ['2026-10-02 07:00', '2026-10-03 07:00']
+
+
+def test_event_overlapping_window_start_is_included():
+    event = {'startDate': '2026-10-01T22:00:00Z', 'endDate': '2026-10-02T02:00:00Z'}
+    assert len(occurrences(event, utc(2026, 10, 2), utc(2026, 10, 3))) == 1
+    assert occurrences(event, utc(2026, 10, 3), utc(2026, 10, 4)) == []
+
+
+def test_expanded_occurrences_keep_the_stored_format():
+    event = {'startDate': '2026-10-05T10:00', 'endDate': '2026-10-05T11:00', 'recurrence': 'weekly', INDEX_FIELD: ['x']}
+    expanded = [item for _, item in expand_event('e1', event, utc(2026, 10, 10), utc(2026, 10, 20))]
+    assert [item['startDate'] for item in expanded] == ['2026-10-12T10:00', '2026-10-19T10:00']
+    assert expanded[0]['occurrenceId'] == 'e1_20261012T1000'
+    assert expanded[0]['seriesStartDate'] == '2026-10-05T10:00'
+    assert INDEX_FIELD not in expanded[0]
+
+
+def test_index_buckets():
+    assert index_buckets({'startDate': '2026-10-30T10:00', 'endDate': '2026-11-02T10:00'}) == ['2026-10', '2026-11']
+    assert index_buckets({'startDate': '2026-10-30T10:00', 'recurrence': 'weekly'}) == [RECURRING_BUCKET]
+    assert index_buckets({'startDate': '2020-01-01T10:00', 'endDate': '2026-01-01T10:00'}) == [LONG_BUCKET]
+    assert index_buckets({}) == []
+
+
+def test_query_groups_emit_each_event_once():
+    groups = query_buckets(utc(2026, 1, 1), utc(2026, 12, 31))
+    assert all(len(group) <= 10 for group in groups)
+    event = {INDEX_FIELD: ['2026-08', '2026-09']}
+    matches = [position for position, group in enumerate(groups)
+               if set(group) & set(event[INDEX_FIELD]) and first_group(event, groups, position)]
+    assert len(matches) == 1
+
+
+def test_events_route_lists_the_window(client, headers):
+    client.post('/api/events', json={'title': 'inside', 'startDate': '2026-10-15T10:00:00Z'}, headers=headers)
+    client.post('/api/events', json={'title': 'outside', 'startDate': '2026-12-15T10:00:00Z'}, headers=headers)
+    body = client.get('/api/events?from=2026-10-01T00:00:00Z&to=2026-11-01T00:00:00Z', headers=headers).get_json()
+    assert [event['title'] for event in body['data']] == ['inside']
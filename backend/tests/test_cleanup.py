@@ -0,0 +1,31 @@
+import pytest
+
+import app as app_module
+
+
+def test_clean_completed_tasks_removes_only_completed_tasks(client, headers, user_id, db):
+    ids = []
+    for index in range(3):
+        ids.append(client.post('/api/tasks', json={'title': f'task {index}'}, headers=headers).get_json()['taskId'])
+    client.put(f'/api/tasks/{ids[0]}/toggle', headers=headers)
+
+    result = app_module.clean_completed_tasks()
+
+    assert result['deleted'] == 1
+    remaining = {task['id'] for task in client.get('/api/tasks', headers=headers).get_json()['data']}
+    assert remaining == set(ids[1:])
+    assert db.collection('tombstones').document(f'tasks_{ids[0]}').get().exists
+    assert db.collection('jobs').document('clean_completed_tasks').get().to_dict()['status'] == 'completed'
+
+
+def test_clean_completed_tasks_reraises_and_keeps_checkpoint(monkeypatch, client, headers, db):
+    task_id = client.post('/api/tasks', json={'title': 'done'}, headers=headers).get_json()['taskId']
+    client.put(f'/api/tasks/{task_id}/toggle', headers=headers)
+
+    def broken_page(tasks):
+        raise RuntimeError('write failed')
+
+    monkeypatch.setattr(app_module, 'delete_completed_page', broken_page)
+    with pytest.raises(RuntimeError):
+        app_module.clean_completed_tasks()
+    assert db.collection('jobs').document('clean_completed_tasks').get().to_dict()['status'] == 'running'
@@ -0,0 +1,36 @@
+import app as app_module
+
+
+def test_dashboard_counters_follow_task_writes(client, headers, db, user_id):
+    first = client.post('/api/tasks', json={'title': 'a'}, headers=headers).get_json()['taskId']
+    client.post('/api/tasks', json={'title': 'b', 'status': 'in-progress'}, headers=headers)
+
+    stats = client.get('/api/dashboard/overview', headers=headers).get_json()['data']['stats']
+    assert stats == {'completedTasks': 0, 'inProgressTasks': 1, 'upcomingTasks': 1}
+    assert db.collection('user_stats').document(user_id).get().to_dict()['countersReady'] is True
+
+    client.put(f'/api/tasks/{first}/toggle', headers=headers)
+    stats = client.get('/api/dashboard/overview', headers=headers).get_json()['data']['stats']
+    assert stats == {'completedTasks': 1, 'inProgressTasks': 1, 'upcomingTasks': 0}
+
+    client.delete(f'/api/tasks/{first}', headers=headers)
+    stats = client.get('/api/dashboard/overview', headers=headers).get_json()['data']['stats']
+    assert stats == {'completedTasks': 0, 'inProgressTasks': 1, 'upcomingTasks': 0}
+
+
+def test_reconcile_repairs_drifted_counters(client, headers, db, user_id):
+    client.post('/api/tasks', json={'title': 'a'}, headers=headers)
+    client.get('/api/dashboard/overview', headers=headers)
+    # Un increment pierdut sau aplicat de două ori lasă contoarele greșite
+    db.collection('user_stats').document(user_id).update({'upcomingTasks': 3, 'completedTasks': -1})
+
+    app_module.reconcile_task_counters()
+    stats = client.get('/api/dashboard/overview', headers=headers).get_json()['data']['stats']
+    assert stats == {'completedTasks': 0, 'inProgressTasks': 0, 'upcomingTasks': 1}
+
+
+def test_counters_written_before_the_first_dashboard_read_are_recomputed(client, headers, db, user_id):
+    client.post('/api/tasks', json={'title': 'a'}, headers=headers)
+    assert db.collection('user_stats').document(user_id).get().to_dict().get('countersReady') is None
+    stats = client.get('/api/dashboard/overview', headers=headers).get_json()['data']['stats']
+    assert stats == {'completedTasks': 0, 'inProgressTasks': 0, 'upcomingTasks': 1}
@@ -0,0 +1,101 @@
+import pytest
+
+import app as app_module
+from conftest import auth_headers
+from documents import ConcurrentModification, DocumentNotFound, DocumentVersionCache, NotOwner, OwnedDocuments
+
+
+@pytest.fixture
+def owned(db):
+    return OwnedDocuments(db, DocumentVersionCache())
+
+
+def test_update_with_cached_version_skips_the_read(owned, db):
+    ref = owned.create('tasks', {'userId': 'u1', 'title': 'a'})
+    before, after = owned.update('tasks', ref.id, 'u1', {'title': 'b'})
+    assert before['title'] == 'a' and after['title'] == 'b'
+    assert owned.cache.retries == 0
+    assert db.collection('tasks').document(ref.id).get().to_dict()['title'] == 'b'
+
+
+def test_stale_cached_version_retries_once_with_a_fresh_read(owned, db):
+    ref = owned.create('tasks', {'userId': 'u1', 'title': 'a'})
+    # Alt proces modifică documentul: precondiția pe versiunea din cache eșuează
+    db.collection('tasks').document(ref.id).update({'title': 'changed elsewhere'})
+    before, after = owned.update('tasks', ref.id, 'u1', {'done': True})
+    assert before['title'] == 'changed elsewhere'
+    assert after == {**before, 'done': True}
+    assert owned.cache.retries == 1
+
+
+def test_update_cannot_change_the_owner(owned, db):
+    ref = owned.create('tasks', {'userId': 'u1', 'title': 'a'})
+    owned.update('tasks', ref.id, 'u1', {'userId': 'u2', 'title': 'b'})
+    assert db.collection('tasks').document(ref.id).get().to_dict()['userId'] == 'u1'
+
+
+def test_ownership_errors(owned):
+    ref = owned.create('tasks', {'userId': 'u1'})
+    with pytest.raises(NotOwner):
+        owned.update('tasks', ref.id, 'u2', {'title': 'x'})
+    with pytest.raises(NotOwner):
+        owned.delete('tasks', ref.id, 'u2')
+    with pytest.raises(DocumentNotFound):
+        owned.delete('tasks', 'missing', 'u1')
+
+
+def test_delete_of_a_document_changed_twice_is_a_conflict(monkeypatch, owned, db):
+    ref = owned.create('tasks', {'userId': 'u1'})
+    attempts = owned._attempts
+
+    def racing_attempts(doc_ref, user_id):
+        # Fiecare încercare găsește documentul deja modificat de altcineva
+        for attempt in attempts(doc_ref, user_id):
+            db.collection('tasks').document(ref.id).update({'touched': True})
+            yield attempt
+
+    monkeypatch.setattr(owned, '_attempts', racing_attempts)
+    with pytest.raises(ConcurrentModification):
+        owned.delete('tasks', ref.id, 'u1')
+    assert db.collection('tasks').document(ref.id).get().exists
+
+
+@pytest.mark.parametrize('collection, create_path, id_field, label', [
+    ('tasks', '/api/tasks', 'taskId', 'Task'),
+    ('notes', '/api/notes', 'noteId', 'Note'),
+    ('events', '/api/events', 'eventId', 'Event')
+])
+def test_delete_routes_check_ownership(client, headers, collection, create_path, id_field, label):
+    body = {'title': 'x', 'startDate': '2026-10-20T10:00:00Z'} if collection == 'events' else {'title': 'x'}
+    doc_id = client.post(create_path, json=body, headers=headers).get_json()[id_field]
+
+    other = client.delete(f'{create_path}/{doc_id}', headers=auth_headers('someone-else'))
+    assert other.status_code == 403
+    assert other.get_json()['message'] == 'Unauthorized'
+
+    missing = client.delete(f'{create_path}/does-not-exist', headers=headers)
+    assert missing.status_code == 404
+    assert missing.get_json()['message'] == f'{label} not found'
+
+    assert client.delete(f'{create_path}/{doc_id}', headers=headers).status_code == 200
+    assert client.delete(f'{create_path}/{doc_id}', headers=headers).status_code == 404
+
+
+def test_update_routes_check_ownership(client, headers):
+    task_id = client.post('/api/tasks', json={'title': 'x'}, headers=headers).get_json()['taskId']
+    assert client.put(f'/api/tasks/{task_id}', json={'title': 'y'}, headers=auth_headers('intruder')).status_code == 403
+    assert client.put('/api/tasks/missing', json={'title': 'y'}, headers=headers).status_code == 404
+    assert client.put(f'/api/tasks/{task_id}', json={'title': 'y'}, headers=headers).status_code == 200
+
+
+def test_completed_task_cannot_be_toggled_back(client, headers):
+    task_id = client.post('/api/tasks', json={'title': 'x'}, headers=headers).get_json()['taskId']
+    assert client.put(f'/api/tasks/{task_id}/toggle', headers=headers).status_code == 200
+    assert client.put(f'/api/tasks/{task_id}/toggle', headers=headers).status_code == 400
+
+
+def test_routes_use_the_shared_document_cache(client, headers):
+    task_id = client.post('/api/tasks', json={'title': 'x'}, headers=headers).get_json()['taskId']
+    assert app_module.owned_documents.cache.get(f'tasks/{task_id}') is not None
+    client.delete(f'/api/tasks/{task_id}', headers=headers)
+    assert app_module.owned_documents.cache.get(f'tasks/{task_id}') is None
@@ -0,0 +1,107 @@
+import gzip
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+from exports import ChunkEncoder, ics_escape, ics_line, render_export, vtimezone_lines
+from queries import in_export_window
+
+
+def unfold(text):
+    return text.replace('\r\n ', '')
+
+
+def test_ics_lines_fold_at_75_octets_without_splitting_characters():
+    line = 'SUMMARY:' + 'Ședință de planificare ' * 10
+    folded = ics_line(line)
+    physical = folded.split('\r\n')[:-1]
+    assert all(len(part.encode('utf-8')) <= 75 for part in physical)
+    assert all(part.startswith(' ') for part in physical[1:])
+    assert unfold(folded) == line + '\r\n'
+
+
+def test_short_ics_lines_are_unchanged():
+    assert ics_line('BEGIN:VEVENT') == 'BEGIN:VEVENT\r\n'
+
+
+def test_ics_escape():
+    assert ics_escape('a,b;c\\d\ne') == 'a\\,b\\;c\\\\d\\ne'
+
+
+def test_vtimezone_for_bucharest():
+    lines = vtimezone_lines(ZoneInfo('Europe/Bucharest'), 2026)
+    text = '\n'.join(lines)
+    assert lines[0] == 'BEGIN:VTIMEZONE' and lines[-1] == 'END:VTIMEZONE'
+    assert 'TZID:Europe/Bucharest' in lines
+    assert 'RRULE:FREQ=YEARLY;BYMONTH=3;BYDAY=-1SU' in text
+    assert 'RRULE:FREQ=YEARLY;BYMONTH=10;BYDAY=-1SU' in text
+    assert 'DTSTART:19700329T030000' in text
+    assert 'DTSTART:19701025T040000' in text
+
+
+def test_vtimezone_for_zone_without_dst():
+    lines = vtimezone_lines(ZoneInfo('Asia/Tokyo'), 2026)
+    assert 'TZOFFSETFROM:+0900' in lines and 'TZOFFSETTO:+0900' in lines
+    assert not any(line.startswith('RRULE') for line in lines)
+
+
+def test_recurring_event_uses_tzid_and_defined_timezone():
+    stamp = datetime(2026, 10, 18, tzinfo=timezone.utc)
+    events = [{'id': 'e1', 'title': 'Standup', 'startDate': '2026-10-19T09:00', 'endDate': '2026-10-19T09:15',
+               'recurrence': 'weekly'}]
+    text = ''.join(render_export('events', 'ics', events, stamp=stamp))
+    assert 'DTSTART;TZID=Europe/Bucharest:20261019T090000' in text
+    assert 'RRULE:FREQ=WEEKLY' in text
+    assert 'BEGIN:VTIMEZONE' in text
+    assert 'DTSTAMP:20261018T000000Z' in text
+
+
+def test_chunk_encoder_gzip_round_trip():
+    encoder = ChunkEncoder(compress=True, size=16)
+    data = b''.join(encoder.feed(f'line {index}\n') for index in range(100)) + encoder.close()
+    assert gzip.decompress(data).decode('utf-8') == ''.join(f'line {index}\n' for index in range(100))
+
+
+def test_csv_export_includes_tasks_without_due_date(client, headers):
+    client.post('/api/tasks', json={'title': 'dated', 'dueDate': '2026-10-20'}, headers=headers)
+    client.post('/api/tasks', json={'title': 'undated'}, headers=headers)
+    response = client.get('/api/export/tasks?format=csv', headers=headers)
+    assert response.status_code == 200
+    assert response.headers['Content-Disposition'] == 'attachment; filename="tasks.csv"'
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines[0].startswith('Title,')
+    assert [line.split(',')[0] for line in lines[1:]] == ['dated', 'undated']
+
+
+def test_gzip_export(client, headers):
+    client.post('/api/notes', json={'title': 'Idei', 'content': 'text'}, headers=headers)
+    response = client.get('/api/export/notes?format=md', headers={**headers, 'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.data).decode('utf-8').startswith('# Idei')
+
+
+def test_windowed_event_export_includes_recurring_series(client, headers):
+    client.post('/api/events', json={'title': 'weekly', 'startDate': '2026-01-05T10:00',
+                                     'endDate': '2026-01-05T11:00', 'recurrence': 'weekly'}, headers=headers)
+    client.post('/api/events', json={'title': 'outside', 'startDate': '2026-01-05T10:00',
+                                     'endDate': '2026-01-05T11:00'}, headers=headers)
+    response = client.get('/api/export/events?format=csv&from=2026-10-01T00:00:00Z&to=2026-11-01T00:00:00Z',
+                          headers=headers)
+    rows = response.get_data(as_text=True).splitlines()[1:]
+    assert [row.split(',')[0] for row in rows] == ['weekly']
+
+
+def test_unknown_export_format(client, headers):
+    assert client.get('/api/export/tasks?format=ics', headers=headers).status_code == 400
+    assert client.get('/api/export/goals', headers=headers).status_code == 404
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_export_window_is_half_open():
+    window = (utc(2026, 10, 1), utc(2026, 11, 1))
+    assert in_export_window('2026-10-01T00:00:00Z', window)
+    assert not in_export_window('2026-11-01T00:00:00Z', window)
+    assert not in_export_window(None, window)
+    assert in_export_window(None, None)
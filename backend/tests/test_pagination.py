@@ -0,0 +1,86 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from pagination import MAX_PAGE_SIZE, InvalidPageRequest, decode_cursor, encode_cursor, parse_fields, parse_limit
+
+
+def test_cursor_round_trips_strings_and_datetimes():
+    moment = datetime(2026, 3, 29, 1, 30, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor('2026-10-01', 'doc-1')) == ('2026-10-01', 'doc-1')
+    assert decode_cursor(encode_cursor(moment, 'doc-2')) == (moment, 'doc-2')
+    assert decode_cursor(encode_cursor(None, 'doc-3')) == (None, 'doc-3')
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor('ă?&/+' * 5, 'id')
+    assert '=' not in cursor and '+' not in cursor and '/' not in cursor
+
+
+@pytest.mark.parametrize('cursor', ['not-base64!', 'e30', ''])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidPageRequest):
+        decode_cursor(cursor)
+
+
+def test_parse_limit_and_fields():
+    assert parse_limit(None) is None
+    assert parse_limit('10') == 10
+    with pytest.raises(ValueError):
+        parse_limit('0')
+    assert parse_limit('100000') == MAX_PAGE_SIZE
+    assert parse_fields('title, dueDate,,') == ['title', 'dueDate']
+    assert parse_fields(None) is None
+
+
+def create_tasks(client, headers, count):
+    for index in range(count):
+        response = client.post('/api/tasks', json={
+            'title': f'task {index}',
+            'dueDate': f'2026-10-{index + 1:02d}T10:00:00Z'
+        }, headers=headers)
+        assert response.status_code == 200
+
+
+def test_pages_cover_every_task_once(client, headers):
+    create_tasks(client, headers, 7)
+    # Task-ul fără termen rămâne în listă, la final
+    client.post('/api/tasks', json={'title': 'no due date'}, headers=headers)
+
+    titles, cursor = [], None
+    while True:
+        url = '/api/tasks?limit=3' + (f'&cursor={cursor}' if cursor else '')
+        body = client.get(url, headers=headers).get_json()
+        titles += [task['title'] for task in body['data']]
+        cursor = body['nextCursor']
+        if cursor is None:
+            break
+
+    assert titles == [f'task {index}' for index in reversed(range(7))] + ['no due date']
+
+
+def test_fields_projection_keeps_id(client, headers):
+    create_tasks(client, headers, 2)
+    body = client.get('/api/tasks?limit=5&fields=title', headers=headers).get_json()
+    assert all(set(task) == {'id', 'title'} for task in body['data'])
+
+
+def test_bad_cursor_is_a_client_error(client, headers):
+    assert client.get('/api/tasks?limit=2&cursor=garbage', headers=headers).status_code == 400
+
+
+def test_legacy_documents_without_order_field_are_listed(client, headers, user_id, db):
+    # Documentele create înainte de câmpul de ordonare primesc `null` la prima listare
+    db.collection('notes').document('legacy').set({'userId': user_id, 'title': 'old note'})
+    body = client.get('/api/notes', headers=headers).get_json()
+    assert [note['id'] for note in body['data']] == ['legacy']
+    assert db.collection('notes').document('legacy').get().to_dict()['createdAt'] is None
+
+
+def test_ndjson_streams_one_document_per_line(client, headers):
+    create_tasks(client, headers, 3)
+    response = client.get('/api/tasks?format=ndjson', headers=headers)
+    assert response.mimetype == 'application/x-ndjson'
+    lines = response.get_data(as_text=True).splitlines()
+    assert [json.loads(line)['title'] for line in lines] == ['task 2', 'task 1', 'task 0']
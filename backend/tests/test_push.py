@@ -0,0 +1,67 @@
+import json
+
+import app as app_module
+from push import PushHub, format_sse
+
+
+def read(subscription):
+    return subscription.messages.get_nowait()
+
+
+def test_sse_format():
+    assert format_sse('change', {'ids': ['a']}, 3) == 'id: 3\nevent: change\ndata: {"ids":["a"]}\n\n'
+
+
+def test_messages_reach_only_the_users_streams():
+    hub = PushHub()
+    first, second, other = hub.subscribe('u1'), hub.subscribe('u1'), hub.subscribe('u2')
+    hub.publish('u1', 'change', {'collection': 'tasks'})
+    assert read(first) == read(second)
+    assert other.messages.empty()
+    assert hub.stats() == {'connections': 3, 'users': 2, 'published': 1, 'dropped': 0}
+
+    hub.unsubscribe(first)
+    hub.unsubscribe(second)
+    assert hub.stats()['users'] == 1
+
+
+def test_slow_subscriber_is_dropped():
+    hub = PushHub(queue_size=2)
+    slow = hub.subscribe('u1')
+    for index in range(3):
+        hub.publish('u1', 'change', {'index': index})
+    assert slow.closed
+    assert hub.stats()['dropped'] == 1 and hub.stats()['connections'] == 0
+    # Fluxul se încheie, iar clientul recuperează prin sync la reconectare
+    assert list(slow.stream(heartbeat=0.01)) == []
+
+
+class LoopbackBroker:
+    def __init__(self):
+        self.hubs = []
+
+    def listen(self, deliver):
+        self.hubs.append(deliver)
+
+    def publish(self, user_id, event, data):
+        for deliver in self.hubs:
+            deliver(user_id, event, data)
+
+
+def test_broker_delivers_to_streams_on_every_worker():
+    broker = LoopbackBroker()
+    first, second = PushHub(broker), PushHub(broker)
+    subscription = second.subscribe('u1')
+    first.publish('u1', 'change', {'collection': 'notes'})
+    assert 'event: change' in read(subscription)
+
+
+def test_writes_are_published(client, headers, user_id):
+    subscription = app_module.push_hub.subscribe(user_id)
+    try:
+        note_id = client.post('/api/notes', json={'title': 'x'}, headers=headers).get_json()['noteId']
+        message = read(subscription)
+    finally:
+        app_module.push_hub.unsubscribe(subscription)
+    data = json.loads(message.split('data: ', 1)[1])
+    assert data == {'collection': 'notes', 'action': 'upserted', 'ids': [note_id]}
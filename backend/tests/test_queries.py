@@ -0,0 +1,34 @@
+from datetime import datetime, timezone
+
+import pytest
+
+import app as app_module
+from pagination import InvalidPageRequest
+from queries import ListRequest, expand_events
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_list_request_parses_arguments(user_id):
+    request = ListRequest(app_module.datastore, 'tasks', user_id, {'limit': '20', 'fields': 'title, dueDate'})
+    args, kwargs = request.page_args()
+    assert args[1:] == ('dueDate', 'DESCENDING')
+    assert kwargs == {'limit': 20, 'cursor': None, 'fields': ['title', 'dueDate']}
+    assert request.response([], 'abc') == {'status': 'success', 'data': [], 'nextCursor': 'abc'}
+    assert 'nextCursor' not in ListRequest(app_module.datastore, 'tasks', user_id, {}).response([], None)
+
+
+def test_list_request_rejects_bad_limits(user_id):
+    with pytest.raises(InvalidPageRequest):
+        ListRequest(app_module.datastore, 'notes', user_id, {'limit': 'many'})
+
+
+def test_expanded_events_are_sorted_across_series():
+    events = [
+        ('weekly', {'startDate': '2026-10-05T09:00', 'recurrence': 'weekly'}),
+        ('single', {'startDate': '2026-10-13T08:00'})
+    ]
+    expanded = expand_events(events, utc(2026, 10, 10), utc(2026, 10, 20))
+    assert [event['startDate'] for event in expanded] == ['2026-10-12T09:00', '2026-10-13T08:00', '2026-10-19T09:00']
@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import app as app_module
+from reminders import ReminderEngine, event_reminders, parse_datetime, reminder_reminders, task_reminders
+
+
+class FakeMailer:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, to, subject, html):
+        self.sent.append((to, subject))
+
+
+@pytest.fixture
+def mailer(monkeypatch):
+    fake = FakeMailer()
+    monkeypatch.setattr(app_module, 'mailer', fake)
+    return fake
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_local_dates_use_the_app_timezone():
+    assert parse_datetime('2026-07-01T12:00') == utc(2026, 7, 1, 9)
+    assert parse_datetime('2026-12-01T12:00') == utc(2026, 12, 1, 10)
+    assert parse_datetime('2026-12-01T12:00:00Z') == utc(2026, 12, 1, 12)
+    assert parse_datetime('not a date') is None
+
+
+def test_event_reminders_follow_enabled_channels():
+    event = {'userId': 'u1', 'title': 'Demo', 'startDate': '2026-12-01T12:00:00Z',
+             'notifications': {'email': True, 'push': False}}
+    reminders = event_reminders('e1', event)
+    assert [(reminder['leadSeconds'], reminder['channels']) for reminder in reminders] == [(3600, ['email'])]
+    assert reminders[0]['dueAt'] == utc(2026, 12, 1, 11)
+    assert reminder_reminders('r1', {'reminderDate': '2026-12-01T12:00:00Z', 'status': 'done'}) == []
+
+
+def test_engine_pops_each_reminder_once_and_ignores_replaced_versions():
+    now = utc(2026, 12, 1, 10)
+    engine = ReminderEngine(lambda reminder: True)
+    event = {'userId': 'u1', 'startDate': '2026-12-01T12:00:00Z', 'notifications': {'push': True}}
+    engine.schedule('events', 'e1', event_reminders('e1', event), now=now)
+    # Evenimentul e mutat: reminder-ele vechi nu mai sunt livrate
+    moved = {**event, 'startDate': '2026-12-01T13:00:00Z'}
+    engine.schedule('events', 'e1', event_reminders('e1', moved), now=now)
+    assert len(engine) == 2
+
+    assert engine.pop_due(utc(2026, 12, 1, 11, 30)) == []
+    due = engine.pop_due(utc(2026, 12, 1, 12, 0))
+    assert [reminder['leadSeconds'] for reminder in due] == [3600]
+    assert engine.pop_due(utc(2026, 12, 1, 12, 0)) == []
+
+    engine.cancel('events', 'e1')
+    assert engine.pop_due(utc(2026, 12, 2)) == []
+
+
+def test_reminders_outside_the_horizon_are_not_held():
+    now = utc(2026, 12, 1)
+    engine = ReminderEngine(lambda reminder: True, horizon=timedelta(hours=48))
+    engine.schedule('events', 'far', event_reminders('far', {
+        'userId': 'u1', 'startDate': '2026-12-10T12:00:00Z', 'notifications': {'push': True}
+    }), now=now)
+    engine.schedule('events', 'near', event_reminders('near', {
+        'userId': 'u1', 'startDate': '2026-12-02T12:00:00Z', 'notifications': {'push': True}
+    }), now=now)
+    assert len(engine) == 2
+
+
+def event_email_reminder(client, headers, user_id):
+    start = (datetime.now(timezone.utc) + timedelta(hours=2)).strftime('%Y-%m-%dT%H:%M:%SZ')
+    body = {'title': 'Demo', 'startDate': start, 'notifications': {'email': True, 'push': True}}
+    event_id = client.post('/api/events', json=body, headers=headers).get_json()['eventId']
+    return event_id, event_reminders(event_id, {**body, 'userId': user_id})[0]
+
+
+def test_reminder_is_delivered_once_with_one_email(client, headers, user_id, mailer):
+    app_module.users.create(user_id, {'email': 'ana@example.com'})
+    _, reminder = event_email_reminder(client, headers, user_id)
+
+    assert app_module.deliver_reminder(reminder) is True
+    # Alt worker încearcă aceeași livrare: notificarea există deja
+    assert app_module.deliver_reminder(reminder) is False
+
+    assert mailer.sent == [('ana@example.com', 'Reminder: Demo începe în curând')]
+    notifications = client.get('/api/notifications', headers=headers).get_json()['data']
+    assert [notification['id'] for notification in notifications] == [reminder['key']]
+
+
+def test_email_respects_the_user_setting(client, headers, user_id, mailer):
+    app_module.users.create(user_id, {'email': 'ana@example.com', 'settings': {'emailNotifications': False}})
+    _, reminder = event_email_reminder(client, headers, user_id)
+    assert app_module.deliver_reminder(reminder) is True
+    assert mailer.sent == []
+
+
+def test_stale_reminders_are_not_delivered(client, headers, user_id, mailer):
+    event_id, reminder = event_email_reminder(client, headers, user_id)
+    later = (datetime.now(timezone.utc) + timedelta(hours=5)).strftime('%Y-%m-%dT%H:%M:%SZ')
+    client.put(f'/api/events/{event_id}', json={'startDate': later}, headers=headers)
+    assert app_module.deliver_reminder(reminder) is False
+
+    client.delete(f'/api/events/{event_id}', headers=headers)
+    assert app_module.deliver_reminder(reminder) is False
+
+
+def test_task_reminders_follow_the_due_date():
+    task = {'userId': 'u1', 'title': 'Raport', 'dueDate': '2026-12-01T12:00:00Z',
+            'notifications': {'email': True, 'push': True}}
+    reminders = task_reminders('t1', task)
+    assert [(reminder['leadSeconds'], reminder['channels']) for reminder in reminders] == [
+        (3600, ['email', 'push']), (600, ['push'])
+    ]
+    assert reminders[0]['source'] == 'tasks'
+    assert task_reminders('t1', {**task, 'completed': True}) == []
+
+
+def test_task_reminder_stops_once_the_task_is_completed(client, headers, user_id, mailer):
+    app_module.users.create(user_id, {'email': 'ana@example.com'})
+    due = (datetime.now(timezone.utc) + timedelta(hours=2)).strftime('%Y-%m-%dT%H:%M:%SZ')
+    body = {'title': 'Raport', 'dueDate': due, 'notifications': {'email': True, 'push': True}}
+    task_id = client.post('/api/tasks', json=body, headers=headers).get_json()['taskId']
+    first, second = task_reminders(task_id, {**body, 'userId': user_id})
+
+    assert app_module.deliver_reminder(first) is True
+    assert mailer.sent == [('ana@example.com', 'Reminder: termenul pentru Raport se apropie')]
+
+    client.put(f'/api/tasks/{task_id}/toggle', headers=headers)
+    assert app_module.deliver_reminder(second) is False
@@ -0,0 +1,145 @@
+import time
+
+import pytest
+
+import reports
+from cache import TTLCache
+from conftest import auth_headers
+from metrics import Metrics
+from reports import ReportJobQueue
+
+
+REPORT_DATA = {
+    'generatedAt': '18.10.2026',
+    'stats': {'totalTasks': 4, 'completedTasks': 3, 'pendingTasks': 1, 'productivityScore': 75,
+              'monthTotalEvents': 2, 'monthPastEvents': 1},
+    'progressData': [{'label': 'Lun', 'value': 50}],
+    'recentActivity': [{'description': 'Task finalizat', 'time': 'acum 1 oră'}]
+}
+
+
+def wait_for(queue, job_id, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job['status'] in ('done', 'failed'):
+            return job
+        time.sleep(0.02)
+    raise AssertionError('report job did not finish')
+
+
+def test_job_rendered_on_one_worker_is_served_by_another(monkeypatch, db):
+    # Bucăți mici, ca fișierul să fie împărțit în mai multe documente
+    monkeypatch.setattr(reports, 'REPORT_CHUNK_BYTES', 1024)
+    first, second = ReportJobQueue(db), ReportJobQueue(db)
+
+    job = first.submit('u1', REPORT_DATA)
+    assert wait_for(second, job['id'])['status'] == 'done'
+    pdf = second.result(second.get(job['id']))
+    assert pdf.startswith(b'%PDF')
+    header = db.collection('report_files').document(job['hash']).get().to_dict()
+    assert header['size'] == len(pdf) and header['chunks'] > 1
+
+
+def test_identical_reports_are_rendered_once(monkeypatch, db):
+    renders = []
+    build = reports.build_report_pdf
+
+    def counting_build(report_data):
+        renders.append(report_data)
+        return build(report_data)
+
+    monkeypatch.setattr(reports, 'build_report_pdf', counting_build)
+    first, second = ReportJobQueue(db), ReportJobQueue(db)
+    wait_for(first, first.submit('u1', REPORT_DATA)['id'])
+    again = second.submit('u2', REPORT_DATA)
+    assert again['status'] == 'done'
+    assert len(renders) == 1
+
+
+def test_failed_render_marks_the_job(monkeypatch, db):
+    def broken_build(report_data):
+        raise ValueError('bad report')
+
+    monkeypatch.setattr(reports, 'build_report_pdf', broken_build)
+    queue = ReportJobQueue(db)
+    job = wait_for(queue, queue.submit('u1', REPORT_DATA)['id'])
+    assert (job['status'], job['error']) == ('failed', 'bad report')
+
+
+def test_job_abandoned_by_a_stopped_worker_fails(db):
+    queue = ReportJobQueue(db, render_timeout=60)
+    db.collection('report_jobs').document('orphan').set({
+        'id': 'orphan', 'userId': 'u1', 'hash': 'h', 'status': 'queued',
+        'createdAt': time.time() - 120, 'finishedAt': None, 'error': None
+    })
+    assert queue.get('orphan')['status'] == 'failed'
+
+
+def test_report_routes(client, headers):
+    response = client.post('/api/reports', json={'reportData': REPORT_DATA}, headers=headers)
+    assert response.status_code == 202
+    job_id = response.get_json()['jobId']
+
+    for _ in range(500):
+        status = client.get(f'/api/reports/{job_id}', headers=headers).get_json()['jobStatus']
+        if status == 'done':
+            break
+        time.sleep(0.02)
+    download = client.get(f'/api/reports/{job_id}/download', headers=headers)
+    assert download.status_code == 200
+    assert download.mimetype == 'application/pdf'
+
+    # Job-ul altui utilizator nu este vizibil
+    assert client.get(f'/api/reports/{job_id}', headers=auth_headers('other')).status_code == 404
+    assert client.get(f'/api/reports/{job_id}/download', headers=auth_headers('other')).status_code == 404
+
+
+@pytest.mark.parametrize('body', [{}, {'reportData': None}])
+def test_report_data_is_required(client, headers, body):
+    assert client.post('/api/reports', json=body, headers=headers).status_code == 400
+
+
+def test_report_is_rendered_again_after_its_file_expires(db):
+    queue = ReportJobQueue(db)
+    first = wait_for(queue, queue.submit('u1', REPORT_DATA)['id'])
+    # Politica TTL din Firestore a șters fișierul, dar copia locală există încă
+    db.collection('report_files').document(first['hash']).delete()
+
+    again = queue.submit('u1', REPORT_DATA)
+    assert again['status'] == 'queued'
+    assert queue.result(wait_for(queue, again['id'])).startswith(b'%PDF')
+
+
+def test_cached_pdf_expires_with_the_file(db):
+    now = [time.time()]
+    queue = ReportJobQueue(db, job_ttl=60)
+    queue._results = TTLCache(clock=lambda: now[0])
+    job = wait_for(queue, queue.submit('u1', REPORT_DATA)['id'])
+    assert queue._results.get(job['hash']) is not None
+    now[0] += 61
+    assert queue._results.get(job['hash']) is None
+
+
+def test_generate_route_survives_an_expired_file(client, headers, db):
+    assert client.post('/api/reports/generate', json={'reportData': REPORT_DATA}, headers=headers).status_code == 200
+    for report_file in db.collection('report_files').stream():
+        report_file.reference.delete()
+    response = client.post('/api/reports/generate', json={'reportData': REPORT_DATA}, headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/pdf'
+
+
+def test_process_pool_renders_reports(db):
+    # Executorul implicit sub gunicorn + gevent
+    queue = ReportJobQueue(db, use_processes=True)
+    job = wait_for(queue, queue.submit('u1', REPORT_DATA)['id'], timeout=30)
+    assert queue.result(job).startswith(b'%PDF')
+
+
+def test_queued_render_is_timed_under_background(db):
+    metrics = Metrics()
+    queue = ReportJobQueue(db, metrics=metrics)
+    job = wait_for(queue, queue.submit('u1', REPORT_DATA)['id'])
+    assert job['status'] == 'done'
+    assert 'momentum_span_duration_seconds_count{route="background",span="pdf"} 1' in metrics.render()
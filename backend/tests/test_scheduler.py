@@ -0,0 +1,72 @@
+from datetime import datetime
+
+import pytest
+
+from scheduler import CronSpec, FirestoreLeaseStore, Scheduler
+
+
+def test_weekly_cleanup_spec_runs_sunday_night():
+    spec = CronSpec('59 23 * * 0')
+    # 18 octombrie 2026 este duminică
+    assert spec.next_after(datetime(2026, 10, 14, 12, 0)) == datetime(2026, 10, 18, 23, 59)
+    assert spec.next_after(datetime(2026, 10, 18, 23, 59)) == datetime(2026, 10, 25, 23, 59)
+
+
+def test_steps_ranges_and_lists():
+    spec = CronSpec('*/15 9-17 * * 1-5')
+    assert spec.minutes == {0, 15, 30, 45}
+    assert spec.hours == set(range(9, 18))
+    assert spec.weekdays == {1, 2, 3, 4, 5}
+    # Sâmbătă seara sare direct la luni dimineața
+    assert spec.next_after(datetime(2026, 10, 17, 18, 0)) == datetime(2026, 10, 19, 9, 0)
+
+
+def test_sunday_can_be_written_as_seven():
+    assert CronSpec('0 0 * * 7').weekdays == {0}
+    assert CronSpec('0 0 * * 5-7').weekdays == {5, 6, 0}
+
+
+def test_day_of_month_or_weekday_like_cron():
+    # Când ambele câmpuri sunt restrânse, e suficient să se potrivească unul dintre ele
+    spec = CronSpec('0 0 13 * 5')
+    assert spec.next_after(datetime(2026, 10, 1)) == datetime(2026, 10, 2)
+
+
+def test_month_end_and_leap_day():
+    assert CronSpec('0 0 31 * *').next_after(datetime(2026, 4, 1)) == datetime(2026, 5, 31)
+    assert CronSpec('0 0 29 2 *').next_after(datetime(2026, 3, 1)) == datetime(2028, 2, 29)
+
+
+@pytest.mark.parametrize('spec', ['* * * *', '60 * * * *', '* 24 * * *', '5-1 * * * *', '*/0 * * * *'])
+def test_invalid_specs_are_rejected(spec):
+    with pytest.raises(ValueError):
+        CronSpec(spec)
+
+
+def test_lease_lets_a_single_instance_run_each_slot(db):
+    runs = []
+    first = Scheduler(FirestoreLeaseStore(db), owner='first')
+    second = Scheduler(FirestoreLeaseStore(db), owner='second')
+    for scheduler in (first, second):
+        scheduler.register('job', '0 * * * *', lambda: runs.append(1))
+
+    slot = datetime(2026, 10, 18, 10, 0)
+    assert first.run_job(first.jobs['job'], slot) is True
+    assert second.run_job(second.jobs['job'], slot) is False
+    assert len(runs) == 1
+    # Slotul următor poate fi preluat de oricine, după ce lease-ul a fost eliberat
+    assert second.run_job(second.jobs['job'], datetime(2026, 10, 18, 11, 0)) is True
+    assert len(runs) == 2
+
+
+def test_failed_job_is_recorded_in_last_run(db):
+    scheduler = Scheduler(FirestoreLeaseStore(db), owner='solo')
+
+    def fail():
+        raise RuntimeError('boom')
+
+    scheduler.register('failing', '0 * * * *', fail)
+    scheduler.run_job(scheduler.jobs['failing'], datetime(2026, 10, 18, 10, 0))
+    last_run = FirestoreLeaseStore(db).last_runs()['failing']
+    assert last_run['status'] == 'error'
+    assert last_run['error'] == 'boom'
@@ -0,0 +1,116 @@
+import pytest
+
+import app as app_module
+from search import NoteSearchIndex, UserIndex, fold, note_terms, tokenize
+
+
+def test_fold_ignores_diacritics_and_cedillas():
+    assert fold('Ședință') == fold('şedinţă') == 'sedinta'
+    assert tokenize('Plan: Ședință, 10:30!') == ['plan', 'sedinta', '10', '30']
+
+
+def test_title_weighs_more_than_content():
+    terms = note_terms({'title': 'buget', 'category': 'work', 'content': 'buget anual'})
+    assert terms == {'buget': 4, 'work': 2, 'anual': 1}
+
+
+def test_bm25_prefers_title_matches_and_short_notes():
+    index = UserIndex({
+        'title': note_terms({'title': 'Buget 2026', 'content': 'cheltuieli'}),
+        'content': note_terms({'title': 'Note', 'content': 'buget pentru vacanta'}),
+        'long-content': note_terms({'title': 'Jurnal', 'content': 'buget ' + 'altceva ' * 40}),
+        'unrelated': note_terms({'title': 'Cumparaturi', 'content': 'lapte'})
+    })
+    assert [note_id for note_id, _ in index.search(['buget'], 10)] == ['title', 'content', 'long-content']
+
+
+def test_whole_words_rank_above_prefix_matches():
+    index = UserIndex({
+        'prefix': note_terms({'title': 'Bugetare'}),
+        'exact': note_terms({'title': 'Buget'})
+    })
+    ranked = index.search(['buget'], 10)
+    assert [note_id for note_id, _ in ranked] == ['exact', 'prefix']
+    assert ranked[1][1] == pytest.approx(ranked[0][1] * 0.7)
+
+
+def test_every_query_word_must_match():
+    index = UserIndex({
+        'a': note_terms({'title': 'buget vacanta'}),
+        'b': note_terms({'title': 'buget firma'})
+    })
+    assert [note_id for note_id, _ in index.search(['buget', 'vac'], 10)] == ['a']
+    assert index.search(['buget', 'masina'], 10) == []
+
+
+def test_remove_drops_unused_terms():
+    index = UserIndex({'a': {'unic': 1}, 'b': {'comun': 1}})
+    index.remove('a')
+    assert 'unic' not in index.vocabulary
+    assert index.search(['unic'], 10) == []
+
+
+def test_search_route_follows_note_writes(client, headers):
+    response = client.post('/api/notes', json={'title': 'Ședință buget', 'content': 'plan'}, headers=headers)
+    note_id = response.get_json()['noteId']
+    client.post('/api/notes', json={'title': 'Cumpărături', 'content': 'lapte'}, headers=headers)
+
+    body = client.get('/api/notes/search?q=sedinta', headers=headers).get_json()
+    assert [note['id'] for note in body['data']] == [note_id]
+
+    client.put(f'/api/notes/{note_id}', json={'title': 'Retrospectivă', 'content': 'plan'}, headers=headers)
+    assert client.get('/api/notes/search?q=sedinta', headers=headers).get_json()['data'] == []
+    assert len(client.get('/api/notes/search?q=retro', headers=headers).get_json()['data']) == 1
+
+    client.delete(f'/api/notes/{note_id}', headers=headers)
+    assert client.get('/api/notes/search?q=retro', headers=headers).get_json()['data'] == []
+
+
+def test_search_requires_a_query(client, headers):
+    assert client.get('/api/notes/search?q=', headers=headers).status_code == 400
+
+
+def test_index_is_sharded_per_note(db, user_id):
+    for index in range(3):
+        db.collection('notes').document(f'n{index}').set({'userId': user_id, 'title': f'nota {index}'})
+    search_index = NoteSearchIndex(db)
+    assert len(search_index.search(user_id, 'nota', 10)) == 3
+    shards = list(db.collection('search_index').document(user_id).collection('notes').stream())
+    assert sorted(shard.id for shard in shards) == ['n0', 'n1', 'n2']
+
+
+def test_other_worker_reloads_after_a_write(db, user_id):
+    db.collection('notes').document('n1').set({'userId': user_id, 'title': 'alfa'})
+    first, second = NoteSearchIndex(db), NoteSearchIndex(db)
+    assert len(second.search(user_id, 'alfa', 10)) == 1
+
+    first.apply(user_id, {'n2': {'title': 'alfa beta'}})
+    assert [note_id for note_id, _ in second.search(user_id, 'beta', 10)] == ['n2']
+
+
+def test_failed_index_write_forces_a_rebuild(monkeypatch, db, user_id):
+    db.collection('notes').document('n1').set({'userId': user_id, 'title': 'alfa'})
+    search_index = NoteSearchIndex(db)
+    search_index.search(user_id, 'alfa', 10)
+
+    def failing_commit(*args, **kwargs):
+        raise RuntimeError('write failed')
+
+    monkeypatch.setattr(search_index, '_commit', failing_commit)
+    with pytest.raises(RuntimeError):
+        search_index.apply(user_id, {'n2': {'title': 'gama'}})
+    monkeypatch.undo()
+
+    # Nota a fost salvată, deși indexul nu; reconstrucția o include
+    db.collection('notes').document('n2').set({'userId': user_id, 'title': 'gama'})
+    assert not db.collection('search_index').document(user_id).get().exists
+    assert [note_id for note_id, _ in search_index.search(user_id, 'gama', 10)] == ['n2']
+    assert search_index.builds == 2
+
+
+def test_search_drops_notes_deleted_elsewhere(client, headers, user_id, db):
+    note_id = client.post('/api/notes', json={'title': 'temporar'}, headers=headers).get_json()['noteId']
+    client.get('/api/notes/search?q=temporar', headers=headers)
+    db.collection('notes').document(note_id).delete()
+    assert client.get('/api/notes/search?q=temporar', headers=headers).get_json()['data'] == []
+    assert app_module.note_search.search(user_id, 'temporar', 10) == []
@@ -0,0 +1,45 @@
+import json
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from google.cloud.firestore import SERVER_TIMESTAMP
+from werkzeug.http import http_date as werkzeug_http_date
+
+import app as app_module
+from memory_store import MemoryClient
+from serialization import http_date
+
+
+@pytest.mark.parametrize('value', [
+    datetime(2026, 10, 18, 23, 59, 1, tzinfo=timezone.utc),
+    datetime(2026, 10, 19, 1, 30, tzinfo=timezone(timedelta(hours=3))),
+    datetime(2024, 2, 29, 12, 0),
+    date(2026, 1, 1)
+])
+def test_http_date_matches_werkzeug(value):
+    assert http_date(value) == werkzeug_http_date(value)
+
+
+def test_firestore_values_are_serialized():
+    ref = MemoryClient().collection('tasks').document('t1')
+    payload = {
+        'ref': ref,
+        'pending': SERVER_TIMESTAMP,
+        'blob': b'\x00\x01',
+        'when': datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc),
+        'nested': [{'count': 1}]
+    }
+    with app_module.app.app_context():
+        body = json.loads(app_module.app.json_encoder().encode(payload))
+    assert body == {
+        'ref': 'tasks/t1',
+        'pending': None,
+        'blob': 'AAE=',
+        'when': 'Sun, 18 Oct 2026 12:00:00 GMT',
+        'nested': [{'count': 1}]
+    }
+
+
+def test_unknown_types_still_fail():
+    with app_module.app.app_context(), pytest.raises(TypeError):
+        app_module.app.json_encoder().encode({'value': object()})
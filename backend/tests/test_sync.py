@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import app as app_module
+from conftest import auth_headers
+from pagination import InvalidPageRequest, decode_watermark, encode_watermark
+
+
+def test_watermark_requires_a_datetime():
+    moment = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    assert decode_watermark(encode_watermark(moment)) == moment
+    with pytest.raises(InvalidPageRequest):
+        decode_watermark(encode_watermark('2026-01-01'))
+
+
+def sync(client, headers, **params):
+    response = client.get('/api/sync', query_string=params, headers=headers)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_first_sync_returns_everything(client, headers):
+    client.post('/api/tasks', json={'title': 'a'}, headers=headers)
+    client.post('/api/notes', json={'title': 'b'}, headers=headers)
+    body = sync(client, headers)
+    assert body['reset'] is True
+    assert [task['title'] for task in body['data']['tasks']['upserted']] == ['a']
+    assert [note['title'] for note in body['data']['notes']['upserted']] == ['b']
+    assert body['nextToken']
+
+
+def test_incremental_sync_returns_changes_and_tombstones(client, headers, db):
+    kept = client.post('/api/tasks', json={'title': 'kept'}, headers=headers).get_json()['taskId']
+    removed = client.post('/api/tasks', json={'title': 'removed'}, headers=headers).get_json()['taskId']
+    token = sync(client, headers)['nextToken']
+
+    client.put(f'/api/tasks/{kept}', json={'title': 'kept v2'}, headers=headers)
+    client.delete(f'/api/tasks/{removed}', headers=headers)
+    body = sync(client, headers, since=token, collections='tasks')
+
+    assert body['reset'] is False
+    assert list(body['data']) == ['tasks']
+    assert [task['title'] for task in body['data']['tasks']['upserted']] == ['kept v2']
+    assert body['data']['tasks']['deleted'] == [removed]
+    assert db.collection('tombstones').document(f'tasks_{removed}').get().to_dict()['docId'] == removed
+
+    # Token-ul nou nu mai întoarce aceleași modificări
+    again = sync(client, headers, since=body['nextToken'], collections='tasks')
+    assert again['data']['tasks'] == {'upserted': [], 'deleted': []}
+
+
+def test_tombstones_of_other_users_are_not_synced(client, headers):
+    other = auth_headers('other-user')
+    token = sync(client, headers)['nextToken']
+    note_id = client.post('/api/notes', json={'title': 'x'}, headers=other).get_json()['noteId']
+    client.delete(f'/api/notes/{note_id}', headers=other)
+    assert sync(client, headers, since=token)['data']['notes']['deleted'] == []
+
+
+def test_token_older_than_tombstone_retention_resets(client, headers):
+    old = datetime.now(timezone.utc) - timedelta(days=app_module.TOMBSTONE_RETENTION_DAYS + 1)
+    assert sync(client, headers, since=encode_watermark(old))['reset'] is True
+
+
+def test_unknown_collection_is_rejected(client, headers):
+    assert client.get('/api/sync?collections=users', headers=headers).status_code == 400
+
+
+def test_purge_keeps_recent_tombstones(client, headers, db):
+    task_id = client.post('/api/tasks', json={'title': 'x'}, headers=headers).get_json()['taskId']
+    client.delete(f'/api/tasks/{task_id}', headers=headers)
+    db.collection('tombstones').document('tasks_old').set({
+        'userId': 'u', 'collection': 'tasks', 'docId': 'old',
+        'deletedAt': datetime.now(timezone.utc) - timedelta(days=app_module.TOMBSTONE_RETENTION_DAYS + 1)
+    })
+    app_module.purge_tombstones()
+    assert not db.collection('tombstones').document('tasks_old').get().exists
+    assert db.collection('tombstones').document(f'tasks_{task_id}').get().exists
+
+
+def test_token_is_the_read_time_so_later_commits_are_not_skipped(client, headers, user_id, db):
+    token = sync(client, headers)['nextToken']
+    # Un document cu timestamp după momentul citirii nu mută token-ul peste scrierile care urmează
+    ahead = datetime.now(timezone.utc) + timedelta(minutes=5)
+    db.collection('tasks').document('ahead').set({'userId': user_id, 'title': 'ahead', 'updatedAt': ahead})
+    body = sync(client, headers, since=token, collections='tasks')
+    assert body['data']['tasks']['upserted'] == []
+    assert decode_watermark(body['nextToken']) < ahead
+
+    task_id = client.post('/api/tasks', json={'title': 'later'}, headers=headers).get_json()['taskId']
+    again = sync(client, headers, since=body['nextToken'], collections='tasks')
+    assert [task['id'] for task in again['data']['tasks']['upserted']] == [task_id]
@@ -0,0 +1,32 @@
+import app as app_module
+from users import CachedUserRepository, FirestoreUserRepository, InMemoryProfileStore
+
+
+def test_profile_writes_update_the_cached_copy(db):
+    repository = CachedUserRepository(FirestoreUserRepository(db), InMemoryProfileStore())
+    repository.create('u1', {'email': 'a@example.com', 'settings': {'theme': 'light'}})
+    assert repository.get('u1')['email'] == 'a@example.com'
+
+    repository.update('u1', {'displayName': 'Ana'})
+    assert repository.get('u1')['displayName'] == 'Ana'
+    assert (repository.hits, repository.misses) == (2, 0)
+
+    # Câmpurile cu cale invalidează copia, care e recitită din Firestore
+    repository.update('u1', {'settings.theme': 'dark'})
+    assert repository.get('u1')['settings'] == {'theme': 'dark'}
+    assert repository.misses == 1
+
+
+def test_verification_sampling_detects_stale_profiles(db):
+    repository = CachedUserRepository(FirestoreUserRepository(db), InMemoryProfileStore(), verify_rate=1.0)
+    repository.create('u1', {'email': 'a@example.com'})
+    db.collection('users').document('u1').update({'email': 'b@example.com'})
+    assert repository.get('u1')['email'] == 'b@example.com'
+    assert repository.stats()['stale'] == 1
+
+
+def test_user_routes(client, headers, user_id):
+    assert client.get('/api/user', headers=headers).status_code == 404
+    app_module.users.create(user_id, {'email': 'a@example.com', 'settings': {'emailNotifications': True}})
+    client.put('/api/user', json={'settings.emailNotifications': False}, headers=headers)
+    assert client.get('/api/user', headers=headers).get_json()['data']['settings'] == {'emailNotifications': False}
@@ -0,0 +1,203 @@
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime
+
+from google.cloud.firestore import SERVER_TIMESTAMP
+
+from cache import TTLCache
+
+try:
+    import redis
+except ImportError:  # backend-ul Redis este opțional
+    redis = None
+
+
+def _resolve_server_timestamps(data, commit_time):
+    return {key: commit_time if value is SERVER_TIMESTAMP else value for key, value in data.items()}
+
+
+class FirestoreUserRepository:
+    def __init__(self, db, collection='users'):
+        self.db = db
+        self.collection = collection
+
+    def _ref(self, user_id):
+        return self.db.collection(self.collection).document(user_id)
+
+    def get(self, user_id):
+        snapshot = self._ref(user_id).get()
+        return snapshot.to_dict() if snapshot.exists else None
+
+    def create(self, user_id, data):
+        result = self._ref(user_id).set(data)
+        return _resolve_server_timestamps(data, result.update_time)
+
+    def update(self, user_id, changes):
+        # Ridică NotFound dacă utilizatorul nu are încă document
+        result = self._ref(user_id).update(changes)
+        return _resolve_server_timestamps(changes, result.update_time)
+
+
+class InMemoryProfileStore:
+    def __init__(self, maxsize=4096):
+        self._cache = TTLCache(maxsize=maxsize)
+
+    def get(self, user_id):
+        return self._cache.get(user_id)
+
+    def set(self, user_id, profile, cached_at, ttl):
+        self._cache.set(user_id, (profile, cached_at), expires_at=cached_at + ttl)
+
+    def delete(self, user_id):
+        self._cache.pop(user_id)
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {'$dt': value.isoformat()}
+    raise TypeError(f'Cannot serialize {type(value).__name__}')
+
+
+def _decode(value):
+    if '$dt' in value:
+        return datetime.fromisoformat(value['$dt'])
+    return value
+
+
+class RedisProfileStore:
+    def __init__(self, url, prefix='users:profile:'):
+        if redis is None:
+            raise RuntimeError('The redis package is required for the Redis profile store')
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, user_id):
+        value = self._client.get(self.prefix + user_id)
+        if value is None:
+            return None
+        entry = json.loads(value, object_hook=_decode)
+        return entry['profile'], entry['cachedAt']
+
+    def set(self, user_id, profile, cached_at, ttl):
+        value = json.dumps({'profile': profile, 'cachedAt': cached_at}, default=_encode)
+        self._client.set(self.prefix + user_id, value, ex=max(1, int(ttl)))
+
+    def delete(self, user_id):
+        self._client.delete(self.prefix + user_id)
+
+
+class CachedUserRepository:
+    """User profiles read through a cache; writes made through it update the cached copy.
+
+    `verify_rate` is the fraction of hits checked against the underlying repository,
+    which measures how often a cached profile was stale (e.g. written by another node).
+    """
+
+    def __init__(self, repository, store, ttl=300, verify_rate=0.0, clock=time.time):
+        self.repository = repository
+        self.store = store
+        self.ttl = ttl
+        self.verify_rate = verify_rate
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.verified = 0
+        self.stale = 0
+        self.hit_age_total = 0.0
+        self.hit_age_max = 0.0
+
+    def _remember(self, user_id, profile):
+        self.store.set(user_id, profile, self.clock(), self.ttl)
+
+    def get(self, user_id):
+        entry = self.store.get(user_id)
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            profile = self.repository.get(user_id)
+            if profile is not None:
+                self._remember(user_id, profile)
+            return profile
+
+        profile, cached_at = entry
+        age = max(0.0, self.clock() - cached_at)
+        with self._lock:
+            self.hits += 1
+            self.hit_age_total += age
+            self.hit_age_max = max(self.hit_age_max, age)
+        if self.verify_rate and random.random() < self.verify_rate:
+            current = self.repository.get(user_id)
+            with self._lock:
+                self.verified += 1
+                if current != profile:
+                    self.stale += 1
+            if current is None:
+                self.store.delete(user_id)
+            elif current != profile:
+                self._remember(user_id, current)
+            return current
+        return profile
+
+    def create(self, user_id, data):
+        profile = self.repository.create(user_id, data)
+        self._remember(user_id, profile)
+        return profile
+
+    def update(self, user_id, changes):
+        try:
+            resolved = self.repository.update(user_id, changes)
+        except Exception:
+            self.store.delete(user_id)
+            raise
+        entry = self.store.get(user_id)
+        if entry is None or any('.' in key for key in changes):
+            # Câmpurile cu cale (`settings.theme`) nu se pot aplica sigur pe copia din cache
+            self.store.delete(user_id)
+        else:
+            self._remember(user_id, {**entry[0], **resolved})
+        return resolved
+
+    def refresh(self, user_id):
+        # Recitește profilul din Firestore și înlocuiește copia din cache, fără s-o golească înainte
+        profile = self.repository.get(user_id)
+        with self._lock:
+            self.misses += 1
+        if profile is None:
+            self.store.delete(user_id)
+        else:
+            self._remember(user_id, profile)
+        return profile
+
+    def invalidate(self, user_id):
+        self.store.delete(user_id)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / lookups, 4) if lookups else 0,
+                'averageHitAgeSeconds': round(self.hit_age_total / self.hits, 3) if self.hits else 0,
+                'maxHitAgeSeconds': round(self.hit_age_max, 3),
+                'verified': self.verified,
+                'stale': self.stale,
+                'staleRate': round(self.stale / self.verified, 4) if self.verified else 0
+            }
+
+
+def create_user_repository(db):
+    if os.getenv('CACHE_BACKEND') == 'redis':
+        store = RedisProfileStore(os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+    else:
+        store = InMemoryProfileStore(maxsize=int(os.getenv('USER_CACHE_SIZE', 4096)))
+    return CachedUserRepository(
+        FirestoreUserRepository(db),
+        store,
+        ttl=int(os.getenv('USER_CACHE_TTL', 300)),
+        verify_rate=float(os.getenv('USER_CACHE_VERIFY_RATE', 0))
+    )
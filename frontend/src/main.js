@@ -4,6 +4,7 @@ import { createApp } from 'vue'
 import App from './App.vue'
 import router from './router'
 import store from './store'
+import notificationService from './services/NotificationService'
 
 // Import Toast Notification
 import Toast from 'vue-toastification'
@@ -60,5 +61,8 @@ store.dispatch('auth/checkAuth')
 store.dispatch('tasks/initTasks')
 store.dispatch('calendar/initEvents')
 
+// Live updates and reminders from the server
+notificationService.start()
+
 // Mount the app
 app.mount('#app')
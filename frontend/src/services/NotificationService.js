@@ -1,144 +1,214 @@
-import { emailService } from './EmailService';
+import store from '@/store';
+
+// Reminder-ele afișate de un tab, comune tuturor tab-urilor prin localStorage
+const SHOWN_REMINDERS_KEY = 'shownReminders';
+const SHOWN_REMINDERS_TTL = 24 * 60 * 60 * 1000;
+
+// Modulul și acțiunea care aduc modificările unei colecții prin /api/sync
+const SYNC_ACTIONS = {
+  tasks: { module: 'tasks', action: 'tasks/fetchTasks' },
+  events: { module: 'calendar', action: 'calendar/fetchEvents' },
+  notes: { module: 'notes', action: 'notes/fetchNotes' }
+};
+
+// Titlul, tipul și iconița notificării pentru fiecare colecție sursă
+const REMINDER_DISPLAY = {
+  events: { heading: 'Eveniment în curând', type: 'event', icons: { '1h': '📅', '10m': '⏰' } },
+  tasks: { heading: 'Task în curând', type: 'task', icons: { '1h': '✓', '10m': '⚡' } },
+  reminders: { heading: 'Reminder', type: 'reminder', icons: { '1h': '📅', '10m': '⏰' } }
+};
 
 class NotificationService {
   constructor() {
-    this.checkInterval = 60000; // Check every minute
-    this.intervalId = null;
+    this.streamUrl = 'http://localhost:5000/api/stream';
+    this.controller = null;
+    this.retryDelay = 1000;
+    this.maxRetryDelay = 30000;
+    this.retryTimer = null;
+    this.syncTimers = {};
+    this.connectedOnce = false;
+    this.unwatchToken = null;
     this.notifiedEvents = new Set();
   }
 
   start() {
-    if (!this.intervalId) {
-      this.intervalId = setInterval(() => this.checkUpcoming(), this.checkInterval);
-      this.checkUpcoming(); // Check immediately on start
+    if (!this.unwatchToken) {
+      // Reconectare la schimbarea utilizatorului, oprire la logout
+      this.unwatchToken = store.watch(
+        state => state.auth.token,
+        () => this.restart()
+      );
+    }
+    if (!this.controller) {
+      this.connect();
     }
   }
 
   stop() {
-    if (this.intervalId) {
-      clearInterval(this.intervalId);
-      this.intervalId = null;
+    if (this.unwatchToken) {
+      this.unwatchToken();
+      this.unwatchToken = null;
     }
+    this.disconnect();
   }
 
-  async checkUpcoming() {
-    const now = new Date();
-    
-    // Get events and tasks from localStorage
-    const events = JSON.parse(localStorage.getItem('events') || '[]');
-    const tasks = JSON.parse(localStorage.getItem('tasks') || '[]');
-    const emailNotificationsEnabled = localStorage.getItem('emailNotifications') !== 'false';
-    const pushNotificationsEnabled = localStorage.getItem('pushNotifications') !== 'false';
+  restart() {
+    this.disconnect();
+    this.connectedOnce = false;
+    this.connect();
+  }
 
-    // Check events
-    events.forEach(async event => {
-      const eventStart = new Date(event.start);
-      const timeUntilStart = eventStart - now;
-
-      // 1 hour notification
-      if (timeUntilStart > 0 && timeUntilStart <= 3600000 && !this.hasBeenNotified(event.id, '1h')) {
-        // Send email notification if enabled
-        if (emailNotificationsEnabled && event.notifications?.email) {
-          try {
-            await emailService.sendEventReminder(event);
-          } catch (error) {
-            console.error('Failed to send email notification:', error);
-          }
-        }
+  disconnect() {
+    clearTimeout(this.retryTimer);
+    this.retryTimer = null;
+    if (this.controller) {
+      this.controller.abort();
+      this.controller = null;
+    }
+  }
 
-        // Send push notification if enabled
-        if (pushNotificationsEnabled && event.notifications?.push && 
-            ("Notification" in window) && Notification.permission === 'granted') {
-          this.showNotification(
-            'Eveniment în curând',
-            {
-              title: event.title,
-              time: '1 oră',
-              type: 'event',
-              description: event.description || '',
-              icon: '📅'
-            },
-            event.id,
-            '1h'
-          );
-        }
+  async connect() {
+    const token = store.getters['auth/token'];
+    if (!token) {
+      return;
+    }
+
+    const controller = new AbortController();
+    this.controller = controller;
+    try {
+      // fetch în loc de EventSource, pentru a trimite header-ul Authorization
+      const response = await fetch(this.streamUrl, {
+        headers: { Authorization: `Bearer ${token}` },
+        signal: controller.signal
+      });
+      if (!response.ok) {
+        throw new Error(`Stream request failed with status ${response.status}`);
       }
 
-      // 10 minutes notification - only push notification
-      if (timeUntilStart > 0 && timeUntilStart <= 600000 && !this.hasBeenNotified(event.id, '10m')) {
-        if (pushNotificationsEnabled && event.notifications?.push &&
-            ("Notification" in window) && Notification.permission === 'granted') {
-          this.showNotification(
-            'Eveniment în curând',
-            {
-              title: event.title,
-              time: '10 minute',
-              type: 'event',
-              description: event.description || '',
-              icon: '⏰'
-            },
-            event.id,
-            '10m'
-          );
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      for (;;) {
+        const { value, done } = await reader.read();
+        if (done) {
+          break;
+        }
+        buffer += decoder.decode(value, { stream: true });
+        let boundary = buffer.indexOf('\n\n');
+        while (boundary !== -1) {
+          this.handleMessage(buffer.slice(0, boundary));
+          buffer = buffer.slice(boundary + 2);
+          boundary = buffer.indexOf('\n\n');
         }
       }
+    } catch (error) {
+      if (controller.signal.aborted) {
+        return;
+      }
+      console.error('Notification stream error:', error);
+    }
+
+    if (this.controller === controller) {
+      this.controller = null;
+      this.scheduleReconnect();
+    }
+  }
+
+  scheduleReconnect() {
+    this.retryTimer = setTimeout(() => this.connect(), this.retryDelay);
+    this.retryDelay = Math.min(this.retryDelay * 2, this.maxRetryDelay);
+  }
+
+  handleMessage(raw) {
+    let event = 'message';
+    const data = [];
+    raw.split('\n').forEach(line => {
+      if (line.startsWith('event:')) {
+        event = line.slice(6).trim();
+      } else if (line.startsWith('data:')) {
+        data.push(line.slice(5).trim());
+      }
     });
+    if (!data.length) {
+      return;
+    }
+    const payload = JSON.parse(data.join('\n'));
 
-    // Check tasks
-    tasks.forEach(async task => {
-      if (task.dueDate) {
-        const taskDue = new Date(task.dueDate);
-        const timeUntilDue = taskDue - now;
-
-        // 1 hour notification
-        if (timeUntilDue > 0 && timeUntilDue <= 3600000 && !this.hasBeenNotified(task.id, '1h')) {
-          // Send email notification if enabled
-          if (emailNotificationsEnabled && task.notifications?.email) {
-            try {
-              await emailService.sendTaskReminder(task);
-            } catch (error) {
-              console.error('Failed to send email notification:', error);
-            }
-          }
-
-          // Send push notification if enabled
-          if (pushNotificationsEnabled && task.notifications?.push &&
-              ("Notification" in window) && Notification.permission === 'granted') {
-            this.showNotification(
-              'Task în curând',
-              {
-                title: task.title,
-                time: '1 oră',
-                type: 'task',
-                description: task.description || '',
-                icon: '✓'
-              },
-              task.id,
-              '1h'
-            );
-          }
-        }
+    if (event === 'ready') {
+      this.retryDelay = 1000;
+      // După o reconectare se recuperează ce s-a scris cât timp stream-ul a fost închis
+      if (this.connectedOnce) {
+        Object.keys(SYNC_ACTIONS).forEach(collection => this.syncCollection(collection, true));
+      }
+      this.connectedOnce = true;
+    } else if (event === 'change') {
+      this.syncCollection(payload.collection);
+    } else if (event === 'reminder') {
+      this.handleReminder(payload);
+    }
+  }
 
-        // 10 minutes notification - only push notification
-        if (timeUntilDue > 0 && timeUntilDue <= 600000 && !this.hasBeenNotified(task.id, '10m')) {
-          if (pushNotificationsEnabled && task.notifications?.push &&
-              ("Notification" in window) && Notification.permission === 'granted') {
-            this.showNotification(
-              'Task în curând',
-              {
-                title: task.title,
-                time: '10 minute',
-                type: 'task',
-                description: task.description || '',
-                icon: '⚡'
-              },
-              task.id,
-              '10m'
-            );
-          }
-        }
+  syncCollection(collection, onlyIfLoaded = false) {
+    const target = SYNC_ACTIONS[collection];
+    if (!target) {
+      return;
+    }
+    if (onlyIfLoaded && !store.state[target.module].syncToken) {
+      return;
+    }
+    // Mai multe schimbări apropiate produc un singur sync
+    clearTimeout(this.syncTimers[collection]);
+    this.syncTimers[collection] = setTimeout(() => {
+      store.dispatch(target.action).catch(error => {
+        console.error(`Failed to sync ${collection}:`, error);
+      });
+    }, 200);
+  }
+
+  handleReminder(reminder) {
+    // Emailul este trimis de server; aici rămâne doar notificarea din browser
+    const pushNotificationsEnabled = localStorage.getItem('pushNotifications') !== 'false';
+    const timing = reminder.leadSeconds >= 3600 ? '1h' : '10m';
+    const display = REMINDER_DISPLAY[reminder.source] || REMINDER_DISPLAY.reminders;
+
+    if (pushNotificationsEnabled && reminder.channels.includes('push') &&
+        ("Notification" in window) && Notification.permission === 'granted' &&
+        !this.hasBeenNotified(reminder.sourceId, timing) && this.claimReminder(reminder.id)) {
+      this.showNotification(
+        display.heading,
+        {
+          title: reminder.title,
+          time: reminder.leadSeconds >= 3600 ? '1 oră' : '10 minute',
+          type: display.type,
+          description: reminder.description || '',
+          icon: display.icons[timing]
+        },
+        reminder.sourceId,
+        timing
+      );
+    }
+  }
+
+  claimReminder(id) {
+    // Fiecare tab deschis primește reminder-ul; doar primul care îl marchează îl afișează
+    const now = Date.now();
+    let shown = {};
+    try {
+      shown = JSON.parse(localStorage.getItem(SHOWN_REMINDERS_KEY)) || {};
+    } catch (error) {
+      shown = {};
+    }
+    if (shown[id]) {
+      return false;
+    }
+    Object.keys(shown).forEach(key => {
+      if (now - shown[key] > SHOWN_REMINDERS_TTL) {
+        delete shown[key];
       }
     });
+    shown[id] = now;
+    localStorage.setItem(SHOWN_REMINDERS_KEY, JSON.stringify(shown));
+    return true;
   }
 
   hasBeenNotified(id, timing) {
@@ -147,9 +217,12 @@ class NotificationService {
   }
 
   showNotification(title, data, id, timing) {
+    const body = data.type === 'reminder'
+      ? `${data.icon} ${data.title}`
+      : `${data.icon} ${data.title}\n${data.type === 'event' ? 'Începe' : 'Termen limită'} în ${data.time}`;
     const options = {
-      body: `${data.icon} ${data.title}\n${data.type === 'event' ? 'Începe' : 'Termen limită'} în ${data.time}`,
-      icon: data.type === 'event' ? '/event-icon.png' : '/task-icon.png',
+      body,
+      icon: data.type === 'task' ? '/task-icon.png' : '/event-icon.png',
       badge: '/badge-icon.png',
       image: data.image,
       vibrate: [200, 100, 200],
@@ -169,11 +242,12 @@ class NotificationService {
       data: {
         id,
         type: data.type,
-        url: data.type === 'event' ? '/events' : '/tasks'
+        url: data.type === 'task' ? '/tasks' : '/events'
       },
       requireInteraction: true,
       silent: false,
-      renotify: true
+      // Același tag nu alertează din nou dacă alt tab a afișat deja notificarea
+      renotify: false
     };
 
     const notification = new Notification(title, options);
@@ -208,4 +282,4 @@ class NotificationService {
 }
 
 export const notificationService = new NotificationService();
-export default notificationService; 
\ No newline at end of file
+export default notificationService;
@@ -2,6 +2,11 @@ import axios from 'axios'
 
 const state = {
   events: [],
+  // Aparițiile din intervalul afișat, cu seriile recurente expandate de server
+  rangeEvents: null,
+  range: null,
+  syncToken: null,
+  syncUser: null,
   loading: false,
   error: null
 }
@@ -10,6 +15,18 @@ const mutations = {
   SET_EVENTS(state, events) {
     state.events = events
   },
+  APPLY_SYNC(state, { upserted, deleted }) {
+    const changed = new Set([...deleted, ...upserted.map(event => event.id)])
+    state.events = [...state.events.filter(event => !changed.has(event.id)), ...upserted]
+  },
+  SET_RANGE_EVENTS(state, { range, events }) {
+    state.range = range
+    state.rangeEvents = events
+  },
+  SET_SYNC_TOKEN(state, { token, user }) {
+    state.syncToken = token
+    state.syncUser = user
+  },
   ADD_EVENT(state, event) {
     state.events.push(event)
   },
@@ -42,16 +59,60 @@ const actions = {
     }
   },
 
-  async fetchEvents({ commit, rootGetters }) {
+  async fetchEventRange({ commit, rootGetters }, range) {
+    const token = rootGetters['auth/token']
+    const response = await axios.get('http://localhost:5000/api/events', {
+      params: { from: range.from, to: range.to },
+      headers: {
+        Authorization: `Bearer ${token}`
+      }
+    })
+    commit('SET_RANGE_EVENTS', { range, events: response.data.data })
+  },
+
+  // Adresa feed-ului .ics la care se pot abona alte aplicații de calendar
+  async calendarFeed({ rootGetters }, method = 'get') {
+    const token = rootGetters['auth/token']
+    const response = await axios({
+      method,
+      url: 'http://localhost:5000/api/calendar/feed',
+      headers: {
+        Authorization: `Bearer ${token}`
+      }
+    })
+    return response.data.url || null
+  },
+
+  async refreshEventRange({ dispatch, state }) {
+    if (state.range) {
+      await dispatch('fetchEventRange', state.range)
+    }
+  },
+
+  async fetchEvents({ commit, dispatch, state, rootGetters }) {
     commit('SET_LOADING', true)
     try {
       const token = rootGetters['auth/token']
-      const response = await axios.get('http://localhost:5000/api/events', {
+      const user = rootGetters['auth/currentUser']?.uid || null
+      // Doar modificările de la ultima sincronizare; prima cerere aduce tot
+      const params = { collections: 'events' }
+      if (state.syncToken && state.syncUser === user) {
+        params.since = state.syncToken
+      }
+      const response = await axios.get('http://localhost:5000/api/sync', {
+        params,
         headers: {
           Authorization: `Bearer ${token}`
         }
       })
-      commit('SET_EVENTS', response.data.data || [])
+      const changes = response.data.data.events
+      if (response.data.reset) {
+        commit('SET_EVENTS', changes.upserted)
+      } else {
+        commit('APPLY_SYNC', changes)
+      }
+      commit('SET_SYNC_TOKEN', { token: response.data.nextToken, user })
+      await dispatch('refreshEventRange')
     } catch (error) {
       commit('SET_ERROR', error.message)
       throw error
@@ -60,7 +121,7 @@ const actions = {
     }
   },
 
-  async addEvent({ commit, rootGetters }, eventData) {
+  async addEvent({ commit, dispatch, rootGetters }, eventData) {
     try {
       const token = rootGetters['auth/token']
       const response = await axios.post('http://localhost:5000/api/events', eventData, {
@@ -73,6 +134,7 @@ const actions = {
         id: response.data.eventId
       }
       commit('ADD_EVENT', newEvent)
+      await dispatch('refreshEventRange')
       return newEvent
     } catch (error) {
       commit('SET_ERROR', error.message)
@@ -80,7 +142,7 @@ const actions = {
     }
   },
 
-  async updateEvent({ commit, rootGetters }, eventData) {
+  async updateEvent({ commit, dispatch, rootGetters }, eventData) {
     try {
       const token = rootGetters['auth/token']
       await axios.put(`http://localhost:5000/api/events/${eventData.id}`, eventData, {
@@ -89,13 +151,14 @@ const actions = {
         }
       })
       commit('UPDATE_EVENT', eventData)
+      await dispatch('refreshEventRange')
     } catch (error) {
       commit('SET_ERROR', error.message)
       throw error
     }
   },
 
-  async deleteEvent({ commit, rootGetters }, eventId) {
+  async deleteEvent({ commit, dispatch, rootGetters }, eventId) {
     try {
       const token = rootGetters['auth/token']
       await axios.delete(`http://localhost:5000/api/events/${eventId}`, {
@@ -104,6 +167,7 @@ const actions = {
         }
       })
       commit('DELETE_EVENT', eventId)
+      await dispatch('refreshEventRange')
     } catch (error) {
       commit('SET_ERROR', error.message)
       throw error
@@ -115,7 +179,10 @@ const getters = {
   allEvents: state => state.events,
   eventsForDay: state => date => {
     const targetDate = new Date(date)
-    return state.events.filter(event => {
+    const inRange = state.range && state.rangeEvents &&
+      targetDate >= new Date(`${state.range.from}T00:00`) && targetDate < new Date(`${state.range.to}T00:00`)
+    const events = inRange ? state.rangeEvents : state.events
+    return events.filter(event => {
       const eventDate = new Date(event.startDate)
       return eventDate.getFullYear() === targetDate.getFullYear() &&
              eventDate.getMonth() === targetDate.getMonth() &&
@@ -2,6 +2,8 @@ import axios from 'axios'
 
 const state = {
   notes: [],
+  syncToken: null,
+  syncUser: null,
   loading: false,
   error: null
 }
@@ -10,6 +12,14 @@ const mutations = {
   SET_NOTES(state, notes) {
     state.notes = notes
   },
+  APPLY_SYNC(state, { upserted, deleted }) {
+    const changed = new Set([...deleted, ...upserted.map(note => note.id)])
+    state.notes = [...state.notes.filter(note => !changed.has(note.id)), ...upserted]
+  },
+  SET_SYNC_TOKEN(state, { token, user }) {
+    state.syncToken = token
+    state.syncUser = user
+  },
   ADD_NOTE(state, note) {
     state.notes.unshift(note)
   },
@@ -31,16 +41,29 @@ const mutations = {
 }
 
 const actions = {
-  async fetchNotes({ commit, rootGetters }) {
+  async fetchNotes({ commit, state, rootGetters }) {
     commit('SET_LOADING', true)
     try {
       const token = rootGetters['auth/token']
-      const response = await axios.get('http://localhost:5000/api/notes', {
+      const user = rootGetters['auth/currentUser']?.uid || null
+      // Doar modificările de la ultima sincronizare; prima cerere aduce tot
+      const params = { collections: 'notes' }
+      if (state.syncToken && state.syncUser === user) {
+        params.since = state.syncToken
+      }
+      const response = await axios.get('http://localhost:5000/api/sync', {
+        params,
         headers: {
           Authorization: `Bearer ${token}`
         }
       })
-      commit('SET_NOTES', response.data.data || [])
+      const changes = response.data.data.notes
+      if (response.data.reset) {
+        commit('SET_NOTES', changes.upserted)
+      } else {
+        commit('APPLY_SYNC', changes)
+      }
+      commit('SET_SYNC_TOKEN', { token: response.data.nextToken, user })
     } catch (error) {
       commit('SET_ERROR', error.message)
       throw error
@@ -49,6 +72,18 @@ const actions = {
     }
   },
 
+  async searchNotes({ rootGetters }, query) {
+    const token = rootGetters['auth/token']
+    // Căutarea rulează pe server, pe indexul notițelor utilizatorului
+    const response = await axios.get('http://localhost:5000/api/notes/search', {
+      params: { q: query },
+      headers: {
+        Authorization: `Bearer ${token}`
+      }
+    })
+    return response.data.data
+  },
+
   async addNote({ commit, rootGetters }, noteData) {
     try {
       const token = rootGetters['auth/token']
@@ -2,6 +2,8 @@ import axios from 'axios'
 
 const state = {
   list: [],
+  syncToken: null,
+  syncUser: null,
   loading: false,
   error: null
 }
@@ -10,6 +12,14 @@ const mutations = {
   SET_TASKS(state, tasks) {
     state.list = tasks
   },
+  APPLY_SYNC(state, { upserted, deleted }) {
+    const changed = new Set([...deleted, ...upserted.map(task => task.id)])
+    state.list = [...state.list.filter(task => !changed.has(task.id)), ...upserted]
+  },
+  SET_SYNC_TOKEN(state, { token, user }) {
+    state.syncToken = token
+    state.syncUser = user
+  },
   ADD_TASK(state, task) {
     state.list.push(task)
   },
@@ -42,16 +52,29 @@ const actions = {
     }
   },
 
-  async fetchTasks({ commit, rootGetters }) {
+  async fetchTasks({ commit, state, rootGetters }) {
     commit('SET_LOADING', true)
     try {
       const token = rootGetters['auth/token']
-      const response = await axios.get('http://localhost:5000/api/tasks', {
+      const user = rootGetters['auth/currentUser']?.uid || null
+      // Doar modificările de la ultima sincronizare; prima cerere aduce tot
+      const params = { collections: 'tasks' }
+      if (state.syncToken && state.syncUser === user) {
+        params.since = state.syncToken
+      }
+      const response = await axios.get('http://localhost:5000/api/sync', {
+        params,
         headers: {
           Authorization: `Bearer ${token}`
         }
       })
-      commit('SET_TASKS', response.data.data || [])
+      const changes = response.data.data.tasks
+      if (response.data.reset) {
+        commit('SET_TASKS', changes.upserted)
+      } else {
+        commit('APPLY_SYNC', changes)
+      }
+      commit('SET_SYNC_TOKEN', { token: response.data.nextToken, user })
     } catch (error) {
       commit('SET_ERROR', error.message)
       throw error